@@ -10,15 +10,25 @@ Usage:
   ./embed.py --file input.txt
   echo "text" | ./embed.py --stdin
   ./embed.py "text" --json
+  ./embed.py "text" --cache    # Reuse vectors embedded before
+  ./embed.py --batch snippets.jsonl > vectors.jsonl   # Many texts, batched
+  ./embed.py --batch snippets.jsonl --out-format npy -o vectors.npy
 """
 
 import os
 import sys
 import json
+import array
+import hashlib
+import mmap
+import sqlite3
+import threading
 import urllib.request
 import urllib.error
 import time
 import argparse
+import collections
+from concurrent.futures import ThreadPoolExecutor
 
 
 # Default configuration
@@ -28,6 +38,18 @@ DEFAULT_CONFIG = {
     "default_num_docs": 5,
 }
 
+DEFAULT_MODEL = "thenlper/gte-large"
+
+# On-disk embedding cache (see EmbeddingCache)
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".embed-cache.db")
+DEFAULT_CACHE_MAX_MB = 256
+
+# Batch mode limits: inputs per request, and their total characters
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_BATCH_CHARS = 50000
+# Errors that reject a request's input rather than the request as a whole
+_BAD_INPUT_ERRORS = ("HTTP 400", "HTTP 413", "HTTP 422")
+
 
 def load_config():
     """Load configuration from file or defaults"""
@@ -85,6 +107,166 @@ def parse_telnyx_error(error_body):
         return error_body.strip()
 
 
+class EmbeddingCache:
+    """On-disk cache of embedding vectors keyed by (model, sha256(text))
+
+    Vectors are stored as packed little-endian float32 in a SQLite database,
+    so a 1024-dimension vector takes 4 KB. When stored vectors exceed
+    max_bytes, the least recently used entries are evicted. The stored size
+    is summed once on open and then tracked per put, so a put costs an index
+    lookup rather than a table scan; it is re-summed, picking up writes from
+    other processes, only when the tracked size passes max_bytes. Vectors
+    read back from the cache are rounded to float32 precision.
+
+    Args:
+        path (str): Database file
+        max_bytes (int): Size limit for stored vectors
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_bytes=DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )"""
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._bytes = self._stored_bytes()
+
+    def _stored_bytes(self):
+        """Sum the size of all stored vectors (full scan)"""
+        return self.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    @staticmethod
+    def _text_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _pack(embedding):
+        vector = array.array("f", embedding)
+        if sys.byteorder != "little":
+            vector.byteswap()
+        return vector.tobytes()
+
+    @staticmethod
+    def _unpack(blob):
+        vector = array.array("f")
+        vector.frombytes(blob)
+        if sys.byteorder != "little":
+            vector.byteswap()
+        return vector.tolist()
+
+    def get(self, model, text):
+        """Look up the vector for text, counting a hit or a miss
+
+        Args:
+            model (str): Embedding model name
+            text (str): Embedded text
+
+        Returns:
+            list[float] or None: Cached vector
+        """
+        key = (model, self._text_hash(text))
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT vector FROM embeddings WHERE model = ? AND text_hash = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                (time.time(),) + key,
+            )
+        return self._unpack(row[0])
+
+    def put(self, model, text, embedding):
+        """Store the vector for text, evicting old entries if over the size limit
+
+        Args:
+            model (str): Embedding model name
+            text (str): Embedded text
+            embedding (list[float]): Vector returned by the API
+        """
+        blob = self._pack(embedding)
+        key = (model, self._text_hash(text))
+        with self._lock:
+            old = self.conn.execute(
+                "SELECT LENGTH(vector) FROM embeddings WHERE model = ? AND text_hash = ?", key
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                key + (blob, time.time()),
+            )
+            self._bytes += len(blob) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes (lock held)"""
+        total = self._stored_bytes()
+        self._bytes = total
+        if total <= self.max_bytes:
+            return
+        # Free down to 90% of the limit so eviction doesn't run on every put
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        freed = 0
+        for rowid, size in self.conn.execute(
+            "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        ):
+            if excess <= 0:
+                break
+            victims.append((rowid,))
+            excess -= size
+            freed += size
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany("DELETE FROM embeddings WHERE rowid = ?", victims)
+        self.conn.execute("COMMIT")
+        self.evictions += len(victims)
+        self._bytes = total - freed
+
+    def stats(self):
+        """Hit/miss counters for this process and the cache's current size
+
+        Returns:
+            dict: hits, misses, evictions, entries, bytes
+        """
+        with self._lock:
+            entries, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
 def list_models(timeout=10):
     """List available embedding models from Telnyx API
 
@@ -108,7 +290,7 @@ def list_models(timeout=10):
         return None
 
 
-def embed_text(text, model=None, timeout=30, max_retries=3):
+def embed_text(text, model=None, timeout=30, max_retries=3, cache=None):
     """Generate embedding vector for text using Telnyx AI
 
     Args:
@@ -116,16 +298,44 @@ def embed_text(text, model=None, timeout=30, max_retries=3):
         model (str): Model name (optional — uses API default if not specified)
         timeout (int): Request timeout in seconds
         max_retries (int): Maximum retry attempts
+        cache (EmbeddingCache or None): Serve repeated text from this cache
+            and store new vectors in it
+
+    Returns:
+        dict: Response with embedding vector or error info ("cached" is
+            True when the vector came from the cache)
+    """
+    model = model or DEFAULT_MODEL
+    if cache is not None:
+        embedding = cache.get(model, text)
+        if embedding is not None:
+            return {
+                "data": [{"embedding": embedding, "index": 0, "dimensions": len(embedding)}],
+                "model": model,
+                "cached": True,
+            }
+
+    result = _post_embeddings({"input": text, "model": model}, timeout, max_retries)
+    if cache is not None and result.get("data"):
+        cache.put(model, text, result["data"][0]["embedding"])
+    return result
+
+
+def _post_embeddings(payload_dict, timeout=30, max_retries=3):
+    """POST an embeddings request, retrying server and network errors
+
+    Args:
+        payload_dict (dict): Request body ("input" is a string or a list)
+        timeout (int): Request timeout in seconds
+        max_retries (int): Maximum retry attempts
 
     Returns:
-        dict: Response with embedding vector or error info
+        dict: Normalized response or error info
     """
     api_key = load_credentials()
 
     url = "https://api.telnyx.com/v2/ai/openai/embeddings"
 
-    payload_dict = {"input": text, "model": model or "thenlper/gte-large"}
-
     payload = json.dumps(payload_dict).encode()
 
     headers = {
@@ -233,6 +443,336 @@ def normalize_embedding_response(response_data):
     return response_data
 
 
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+def embed_batch(texts, model=None, timeout=30, max_retries=3, cache=None):
+    """Embed several texts in a single request
+
+    Args:
+        texts (list[str]): Texts to embed
+        model (str): Model name (optional)
+        timeout (int): Request timeout in seconds
+        max_retries (int): Maximum retry attempts
+        cache (EmbeddingCache or None): Texts found here are not sent
+
+    Returns:
+        dict: Normalized response with one "data" item per text, in input
+            order (items served from the cache have "cached": True), or
+            error info
+    """
+    model = model or DEFAULT_MODEL
+    items = [None] * len(texts)
+    missing = []
+    for i, text in enumerate(texts):
+        embedding = cache.get(model, text) if cache is not None else None
+        if embedding is None:
+            missing.append(i)
+        else:
+            items[i] = {"embedding": embedding, "index": i,
+                        "dimensions": len(embedding), "cached": True}
+
+    result = {"model": model}
+    if missing:
+        response = _post_embeddings(
+            {"input": [texts[i] for i in missing], "model": model}, timeout, max_retries
+        )
+        if "error" in response:
+            return response
+        data = sorted(response.get("data", []), key=lambda item: item["index"])
+        if len(data) != len(missing):
+            return {"error": "Expected %d embeddings, got %d" % (len(missing), len(data))}
+        for i, item in zip(missing, data):
+            item["index"] = i
+            items[i] = item
+            if cache is not None:
+                cache.put(model, texts[i], item["embedding"])
+        for field in ("model", "usage"):
+            if field in response:
+                result[field] = response[field]
+
+    result["data"] = items
+    return result
+
+
+def read_batch_input(lines, fmt="auto"):
+    """Parse batch mode input, one text per line
+
+    In JSONL format each line is an object with a "text" field and an
+    optional "id" that is copied to the output. Otherwise each line is the
+    text itself. "auto" picks JSONL when the first non-blank line is a JSON
+    object. Blank lines are skipped.
+
+    Args:
+        lines (iterable[str]): Input lines (a file object works)
+        fmt (str): "auto", "jsonl" or "lines"
+
+    Yields:
+        tuple: (index, id or None, text), index counting non-blank lines
+
+    Raises:
+        ValueError: If a JSONL line is not an object with a string "text"
+    """
+    index = 0
+    for lineno, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if fmt == "auto":
+            fmt = "jsonl" if line.lstrip().startswith("{") else "lines"
+        if fmt == "jsonl":
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError("line %d: invalid JSON: %s" % (lineno, e))
+            if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+                raise ValueError('line %d: expected an object with a "text" string' % lineno)
+            yield index, record.get("id"), record["text"]
+        else:
+            yield index, None, line
+        index += 1
+
+
+def iter_batches(records, max_items=DEFAULT_BATCH_SIZE, max_chars=DEFAULT_BATCH_CHARS):
+    """Group records into batches bounded by count and total text length
+
+    A single text longer than max_chars gets a batch of its own.
+
+    Args:
+        records (iterable[tuple]): (index, id, text) tuples
+        max_items (int): Maximum texts per batch
+        max_chars (int): Maximum total characters per batch
+
+    Yields:
+        list[tuple]: Batches of records, in order
+    """
+    batch = []
+    chars = 0
+    for record in records:
+        size = len(record[2])
+        if batch and (len(batch) >= max_items or chars + size > max_chars):
+            yield batch
+            batch = []
+            chars = 0
+        batch.append(record)
+        chars += size
+    if batch:
+        yield batch
+
+
+def _ordered_map(executor, fn, jobs, window):
+    """Like executor.map, but keeps at most `window` jobs in flight
+
+    Results are yielded in job order, so memory is bounded by the window
+    instead of by how far the workers run ahead of the consumer.
+
+    Args:
+        executor (Executor): Executor to run jobs on
+        fn (callable): Function to call
+        jobs (iterable[tuple]): Positional arguments for each call
+        window (int): Maximum jobs submitted but not yet consumed
+
+    Yields:
+        object: fn(*job) for each job, in order
+    """
+    pending = collections.deque()
+    jobs = iter(jobs)
+    for job in jobs:
+        pending.append(executor.submit(fn, *job))
+        if len(pending) >= window:
+            break
+    while pending:
+        result = pending.popleft().result()
+        job = next(jobs, None)
+        if job is not None:
+            pending.append(executor.submit(fn, *job))
+        yield result
+
+
+def embed_stream(records, model=None, batch_size=DEFAULT_BATCH_SIZE,
+                 batch_chars=DEFAULT_BATCH_CHARS, concurrency=4, timeout=30,
+                 max_retries=3, cache=None):
+    """Embed a stream of texts in concurrent batches
+
+    Input is read lazily and at most 2 x concurrency batches are in flight,
+    so memory stays bounded however long the input is. Results come out in
+    input order. If a batch is rejected for bad input, its texts are retried
+    one at a time; otherwise a failed batch yields an error record for each
+    of its texts. Either way the stream carries on.
+
+    Args:
+        records (iterable[tuple]): (index, id, text) tuples, see read_batch_input
+        model (str): Model name (optional)
+        batch_size (int): Maximum texts per request
+        batch_chars (int): Maximum total characters per request
+        concurrency (int): Requests in flight at once
+        timeout (int): Request timeout in seconds
+        max_retries (int): Maximum retry attempts per request
+        cache (EmbeddingCache or None): Skip texts embedded before
+
+    Yields:
+        dict: {"index", "id", "embedding", "dimensions", "cached"} per text
+            ("id" and "cached" only when set), or {"index", "id", "error"}
+    """
+    def _run(batch):
+        texts = [text for _, _, text in batch]
+        result = embed_batch(texts, model, timeout, max_retries, cache)
+        if "error" not in result:
+            return batch, result["data"]
+        if len(texts) > 1 and result["error"] in _BAD_INPUT_ERRORS:
+            # One bad input fails the whole request: retry the texts one by
+            # one so only the bad ones get an error
+            items = []
+            for text in texts:
+                single = embed_batch([text], model, timeout, max_retries, cache)
+                items.append(single if "error" in single else single["data"][0])
+            return batch, items
+        return batch, [result] * len(batch)
+
+    concurrency = max(1, concurrency)
+    jobs = ((batch,) for batch in iter_batches(records, batch_size, batch_chars))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for batch, items in _ordered_map(executor, _run, jobs, concurrency * 2):
+            for (index, record_id, _), item in zip(batch, items):
+                out = {"index": index}
+                if record_id is not None:
+                    out["id"] = record_id
+                if "error" in item:
+                    out["error"] = item["error"]
+                    if "details" in item:
+                        out["details"] = item["details"]
+                else:
+                    out["embedding"] = item["embedding"]
+                    out["dimensions"] = item["dimensions"]
+                    if item.get("cached"):
+                        out["cached"] = True
+                yield out
+
+
+# ---------------------------------------------------------------------------
+# Binary output
+# ---------------------------------------------------------------------------
+
+# .npy header size: room for any shape, and a multiple of 64 as the format
+# recommends so the data that follows is aligned
+_NPY_HEADER_BYTES = 128
+
+
+class VectorWriter:
+    """Stream embeddings into a float32 matrix file, one row at a time
+
+    "npy" writes a NumPy .npy file (version 1.0, little-endian float32,
+    C order) that numpy.load(path, mmap_mode="r") maps without copying. The
+    header is reserved up front and its shape filled in on close. "f32"
+    writes the bare little-endian float32 rows. Either way a sidecar
+    ``<path>.index.jsonl`` maps each row to its input index and id, and
+    records texts that failed (which get no row).
+
+    Args:
+        path (str): Matrix file to write
+        fmt (str): "npy" or "f32"
+    """
+
+    def __init__(self, path, fmt="npy"):
+        if fmt not in ("npy", "f32"):
+            raise ValueError("Unknown vector format: %s" % fmt)
+        self.path = path
+        self.fmt = fmt
+        self.index_path = path + ".index.jsonl"
+        self.rows = 0
+        self.dimensions = None
+        self._file = open(path, "wb")
+        self._index = open(self.index_path, "w", encoding="utf-8")
+        if fmt == "npy":
+            self._file.write(b"\0" * _NPY_HEADER_BYTES)
+
+    def _npy_header(self):
+        header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, %d), }" % (
+            self.rows, self.dimensions or 0)
+        prefix = b"\x93NUMPY\x01\x00"
+        pad = _NPY_HEADER_BYTES - len(prefix) - 2 - len(header) - 1
+        header = (header + " " * pad + "\n").encode("latin-1")
+        return prefix + len(header).to_bytes(2, "little") + header
+
+    def write(self, record):
+        """Append one embed_stream output record
+
+        Args:
+            record (dict): {"index", "id", "embedding"} or an error record
+
+        Raises:
+            ValueError: If the vector's dimensions differ from earlier rows
+        """
+        entry = {"index": record["index"]}
+        if "id" in record:
+            entry["id"] = record["id"]
+        if "error" in record:
+            entry["error"] = record["error"]
+        else:
+            vector = array.array("f", record["embedding"])
+            if self.dimensions is None:
+                self.dimensions = len(vector)
+            elif len(vector) != self.dimensions:
+                raise ValueError("Row %d has %d dimensions, expected %d" % (
+                    self.rows, len(vector), self.dimensions))
+            if sys.byteorder != "little":
+                vector.byteswap()
+            self._file.write(vector.tobytes())
+            entry["row"] = self.rows
+            self.rows += 1
+        self._index.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        """Finish the header (npy) and close both files"""
+        if self.fmt == "npy":
+            self._file.seek(0)
+            self._file.write(self._npy_header())
+        self._file.close()
+        self._index.close()
+
+
+def read_vectors(path, fmt="npy"):
+    """Memory-map a matrix written by VectorWriter, without copying it
+
+    For use without NumPy; with NumPy, numpy.load(path, mmap_mode="r")
+    reads the .npy file directly.
+
+    Args:
+        path (str): Matrix file
+        fmt (str): "npy" or "f32"
+
+    Returns:
+        tuple: (float32 memoryview of shape (rows, dims), sidecar index
+            entries). The memoryview keeps the file mapped until released.
+
+    Raises:
+        ValueError: On a big-endian host, or a malformed .npy header
+    """
+    if sys.byteorder != "little":
+        raise ValueError("Zero-copy reads need a little-endian host")
+    index = []
+    with open(path + ".index.jsonl", "r", encoding="utf-8") as f:
+        for line in f:
+            index.append(json.loads(line))
+    rows = sum(1 for entry in index if "row" in entry)
+
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return memoryview(b"").cast("f"), index
+        data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    if fmt == "npy":
+        if bytes(data[:6]) != b"\x93NUMPY":
+            raise ValueError("%s is not a .npy file" % path)
+        offset = 10 + int.from_bytes(data[8:10], "little")
+        if "'<f4'" not in bytes(data[10:offset]).decode("latin-1"):
+            raise ValueError("%s is not a little-endian float32 matrix" % path)
+        data = data[offset:]
+    if not rows:
+        return data[:0].cast("f"), index
+    return data.cast("f", (rows, len(data) // 4 // rows)), index
+
+
 def format_embedding(result):
     """Format embedding result for display
 
@@ -276,6 +816,60 @@ def format_embedding(result):
     return "\n".join(lines)
 
 
+def run_batch(args):
+    """Run batch mode from parsed CLI arguments, reporting a summary on stderr"""
+    cache = None
+    if args.cache:
+        cache = EmbeddingCache(args.cache_file, args.cache_max_mb * 1024 * 1024)
+
+    if args.out_format != "jsonl" and not args.output:
+        print("ERROR: --out-format %s needs --output" % args.out_format, file=sys.stderr)
+        sys.exit(1)
+
+    infile = sys.stdin if args.batch == "-" else None
+    outfile = sys.stdout
+    writer = None
+    counts = {"total": 0, "cached": 0, "errors": 0}
+    start = time.time()
+    try:
+        if infile is None:
+            infile = open(args.batch, "r", encoding="utf-8")
+        if args.out_format != "jsonl":
+            writer = VectorWriter(args.output, args.out_format)
+        elif args.output:
+            outfile = open(args.output, "w", encoding="utf-8")
+        records = read_batch_input(infile, args.format)
+        for out in embed_stream(records, args.model, args.batch_size, args.batch_chars,
+                                args.concurrency, args.timeout, cache=cache):
+            if writer is not None:
+                writer.write(out)
+            else:
+                outfile.write(json.dumps(out) + "\n")
+            counts["total"] += 1
+            if out.get("cached"):
+                counts["cached"] += 1
+            if "error" in out:
+                counts["errors"] += 1
+    except (IOError, ValueError) as e:
+        print("ERROR: %s" % e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if infile is not None and infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+        if writer is not None:
+            writer.close()
+        if cache is not None:
+            cache.close()
+
+    print("Embedded %d texts in %.1fs (%d from cache, %d errors)" % (
+        counts["total"], time.time() - start, counts["cached"], counts["errors"]),
+        file=sys.stderr)
+    if counts["errors"]:
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate embedding vectors using Telnyx AI"
@@ -283,10 +877,49 @@ def main():
     parser.add_argument("text", nargs="*", help="Text to embed")
     parser.add_argument("--file", help="Read text from file")
     parser.add_argument("--stdin", action="store_true", help="Read text from stdin")
+    parser.add_argument(
+        "--batch", metavar="FILE",
+        help="Embed every line of FILE ('-' for stdin) and write JSONL results in input order"
+    )
+    parser.add_argument(
+        "--format", choices=["auto", "jsonl", "lines"], default="auto",
+        help='Batch input format: JSONL objects with "text" (and optional "id"), '
+             'or one text per line (default: auto)'
+    )
+    parser.add_argument("--output", "-o", help="Write batch results to this file instead of stdout")
+    parser.add_argument(
+        "--out-format", choices=["jsonl", "npy", "f32"], default="jsonl",
+        help="Batch output: JSONL records, or a float32 matrix (.npy or raw) written to "
+             "--output with a <output>.index.jsonl row index (default: jsonl)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+        help="Maximum texts per request in batch mode (default: %d)" % DEFAULT_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--batch-chars", type=int, default=DEFAULT_BATCH_CHARS,
+        help="Maximum total characters per request in batch mode (default: %d)" % DEFAULT_BATCH_CHARS
+    )
+    parser.add_argument(
+        "--concurrency", "-c", type=int, default=4,
+        help="Batch requests in flight at once (default: 4)"
+    )
     parser.add_argument("--model", "-m", help="Embedding model name (default: thenlper/gte-large)")
     parser.add_argument("--list-models", action="store_true", help="List available embedding models")
     parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
     parser.add_argument("--timeout", "-t", type=int, default=30, help="Request timeout in seconds")
+    parser.add_argument(
+        "--cache", action="store_true",
+        help="Reuse vectors for text embedded before (on-disk cache keyed by model and text)"
+    )
+    parser.add_argument(
+        "--cache-file", default=DEFAULT_CACHE_FILE,
+        help="Cache database path (default: .embed-cache.db next to embed.py)"
+    )
+    parser.add_argument(
+        "--cache-max-mb", type=int, default=DEFAULT_CACHE_MAX_MB,
+        help="Evict least recently used vectors above this size (default: %d)" % DEFAULT_CACHE_MAX_MB
+    )
 
     args = parser.parse_args()
 
@@ -296,10 +929,14 @@ def main():
             sys.exit(1)
         print("\nAvailable models:")
         for m in models:
-            default = " (default)" if m == "thenlper/gte-large" else ""
+            default = " (default)" if m == DEFAULT_MODEL else ""
             print("  %s%s" % (m, default))
         sys.exit(0)
 
+    if args.batch:
+        run_batch(args)
+        return
+
     # Get text from one of the input sources
     text = None
     if args.file:
@@ -323,12 +960,25 @@ def main():
         preview = text[:80] + "..." if len(text) > 80 else text
         print("\nEmbedding: \"%s\"\n" % preview)
 
-    result = embed_text(text, model=args.model, timeout=args.timeout)
+    cache = None
+    if args.cache:
+        cache = EmbeddingCache(args.cache_file, args.cache_max_mb * 1024 * 1024)
+
+    try:
+        result = embed_text(text, model=args.model, timeout=args.timeout, cache=cache)
+    finally:
+        if cache is not None:
+            stats = cache.stats()
+            cache.close()
 
     if args.json:
         print(json.dumps(result, indent=2))
     else:
         print(format_embedding(result))
+        if cache is not None:
+            print("Cache: %s (%d hits, %d misses this run; %d vectors, %.1f MB stored)" % (
+                "hit" if result.get("cached") else "miss", stats["hits"], stats["misses"],
+                stats["entries"], stats["bytes"] / 1e6))
 
 
 if __name__ == "__main__":
@@ -21,14 +21,18 @@ Usage:
 import os
 import sys
 import json
+import base64
 import hashlib
 import hmac
 import datetime
-import urllib.request
-import urllib.error
+import http.client
+import ssl
+import threading
+import time
 import urllib.parse
-import re
+import urllib.request
 import argparse
+import xml.etree.ElementTree as ElementTree
 import mimetypes
 from pathlib import Path
 
@@ -97,31 +101,287 @@ def parse_telnyx_error(error_body):
         return error_body.strip()
 
 
+# ---------------------------------------------------------------------------
+# HTTP connection pool
+# ---------------------------------------------------------------------------
+
+# Errors that mean a kept-alive connection was closed by the server while idle
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of keep-alive HTTPS connections, keyed by host
+
+    Reusing connections avoids a TCP and TLS handshake per request. At most
+    max_per_host connections to a host exist at once; idle connections are
+    closed after idle_timeout seconds, and a request that fails because the
+    server dropped an idle connection is retried once on a fresh one.
+
+    Like urllib, the pool honours HTTPS_PROXY/https_proxy (and NO_PROXY):
+    connections to a proxied host are CONNECT tunnels through the proxy.
+    Only http:// proxy URLs are supported (port 80 unless given).
+    """
+
+    def __init__(self, max_per_host=8, idle_timeout=30.0):
+        self.max_per_host = max(1, max_per_host)
+        self.idle_timeout = idle_timeout
+        self._idle = {}  # host -> list of (connection, last_used)
+        self._slots = {}  # host -> BoundedSemaphore
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+        self._proxies = urllib.request.getproxies()
+
+    def _proxy_for(self, host):
+        """Get the proxy URL to tunnel through for host, or None"""
+        proxy = self._proxies.get("https")
+        if not proxy or urllib.request.proxy_bypass(host.split(":", 1)[0]):
+            return None
+        return proxy
+
+    def _slot(self, host):
+        """Get the semaphore bounding connections to a host"""
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self._slots[host] = slot
+            return slot
+
+    def _checkout(self, host, timeout):
+        """Take an idle connection for host, or open a new one
+
+        Returns:
+            tuple: (connection, reused)
+        """
+        now = time.monotonic()
+        conn = None
+        with self._lock:
+            idle = self._idle.get(host, [])
+            while idle:
+                candidate, last_used = idle.pop()
+                if now - last_used <= self.idle_timeout:
+                    conn = candidate
+                    break
+                candidate.close()
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        return self._connect(host, timeout), False
+
+    def _connect(self, host, timeout):
+        """Open a new HTTPS connection to host, tunnelled through a proxy if set"""
+        proxy = self._proxy_for(host)
+        if proxy is None:
+            return http.client.HTTPSConnection(host, timeout=timeout, context=self._ssl_context)
+
+        if "://" not in proxy:
+            proxy = "http://" + proxy
+        parts = urllib.parse.urlsplit(proxy)
+        if parts.scheme != "http":
+            # The CONNECT request goes to the proxy in plain text; TLS to the
+            # proxy itself is not supported
+            raise OSError("Unsupported proxy %s: only http:// proxies are supported" % proxy)
+        conn = http.client.HTTPSConnection(
+            parts.hostname, parts.port or 80, timeout=timeout, context=self._ssl_context
+        )
+        tunnel_headers = {}
+        if parts.username:
+            credentials = "%s:%s" % (
+                urllib.parse.unquote(parts.username), urllib.parse.unquote(parts.password or "")
+            )
+            tunnel_headers["Proxy-Authorization"] = (
+                "Basic " + base64.b64encode(credentials.encode()).decode()
+            )
+        conn.set_tunnel(host, headers=tunnel_headers)
+        return conn
+
+    def _checkin(self, host, conn):
+        """Return a connection to the idle list"""
+        with self._lock:
+            self._idle.setdefault(host, []).append((conn, time.monotonic()))
+
+    def request(self, method, url, body=None, headers=None, timeout=30):
+        """Send a request over a pooled connection and read the full response
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute https:// URL
+            body (bytes or None): Request body
+            headers (dict): Request headers
+            timeout (int): Socket timeout in seconds
+
+        Returns:
+            tuple[int, bytes]: (status_code, response_body)
+
+        Raises:
+            OSError, http.client.HTTPException: On network failure
+        """
+        parts = urllib.parse.urlsplit(url)
+        host = parts.netloc
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        with self._slot(host):
+            conn, reused = self._checkout(host, timeout)
+            while True:
+                try:
+                    conn.request(method, target, body=body, headers=headers or {})
+                    response = conn.getresponse()
+                    data = response.read()
+                except _STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if not reused:
+                        raise
+                    # Server closed the idle connection; retry once on a new one
+                    conn, reused = self._connect(host, timeout), False
+                    continue
+                except Exception:
+                    conn.close()
+                    raise
+                break
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(host, conn)
+            return response.status, data
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+_http_pool = None
+_http_pool_lock = threading.Lock()
+
+
+def get_http_pool(max_per_host=8):
+    """Get the process-wide connection pool, creating it on first use
+
+    Args:
+        max_per_host (int): Connection limit per host (first call only)
+
+    Returns:
+        HTTPConnectionPool: Shared pool
+    """
+    global _http_pool
+    with _http_pool_lock:
+        if _http_pool is None:
+            _http_pool = HTTPConnectionPool(max_per_host)
+        return _http_pool
+
+
 # ---------------------------------------------------------------------------
 # S3 Client (rewritten from tools/rag/sync.py TelnyxS3Client)
 # ---------------------------------------------------------------------------
 
+def _xml_tag(element):
+    """Get an XML element's tag without its namespace"""
+    return element.tag.rsplit("}", 1)[-1]
+
+
+class SigV4Signer:
+    """AWS SigV4 signer with a cached per-day signing key
+
+    The four-step HMAC key derivation and the credential scope only depend
+    on the date, region and service, so they are computed once per day and
+    reused by every request. Safe to share between threads.
+    """
+
+    ALGORITHM = "AWS4-HMAC-SHA256"
+
+    def __init__(self, access_key, secret_key, region, service="s3"):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+        self._scope_suffix = "/%s/%s/aws4_request" % (region, service)
+        self._cached = None  # (date_stamp, signing_key, credential_scope, credential)
+        self._signed_headers = {}  # tuple of header names -> "a;b;c"
+
+    def _scope(self, date_stamp):
+        """Get (signing_key, credential_scope, credential) for a date stamp"""
+        cached = self._cached
+        if cached is not None and cached[0] == date_stamp:
+            return cached[1], cached[2], cached[3]
+
+        k_date = hmac.new(
+            ("AWS4" + self.secret_key).encode("utf-8"), date_stamp.encode("utf-8"), hashlib.sha256
+        ).digest()
+        k_region = hmac.new(k_date, self.region.encode("utf-8"), hashlib.sha256).digest()
+        k_service = hmac.new(k_region, self.service.encode("utf-8"), hashlib.sha256).digest()
+        signing_key = hmac.new(k_service, b"aws4_request", hashlib.sha256).digest()
+        credential_scope = date_stamp + self._scope_suffix
+        credential = "%s/%s" % (self.access_key, credential_scope)
+        # Single tuple assignment, so concurrent readers never see a mixed state
+        self._cached = (date_stamp, signing_key, credential_scope, credential)
+        return signing_key, credential_scope, credential
+
+    def sign(self, method, path, headers, payload_hash, query=""):
+        """Compute the Authorization header for a request
+
+        Args:
+            method (str): HTTP method
+            path (str): URI-encoded request path
+            headers (dict): Lowercase header names to sign (must include host,
+                x-amz-date and x-amz-content-sha256)
+            payload_hash (str): Hex SHA-256 of the payload
+            query (str): Canonical (sorted, encoded) query string
+
+        Returns:
+            str: Authorization header value
+        """
+        amz_date = headers["x-amz-date"]
+        names = tuple(sorted(headers))
+        signed_headers = self._signed_headers.get(names)
+        if signed_headers is None:
+            signed_headers = ";".join(names)
+            self._signed_headers[names] = signed_headers
+
+        canonical_headers = "".join("%s:%s\n" % (k, headers[k]) for k in names)
+        canonical_request = "%s\n%s\n%s\n%s\n%s\n%s" % (
+            method, path, query, canonical_headers, signed_headers, payload_hash
+        )
+
+        signing_key, credential_scope, credential = self._scope(amz_date[:8])
+        string_to_sign = "%s\n%s\n%s\n%s" % (
+            self.ALGORITHM,
+            amz_date,
+            credential_scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        )
+        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        return "%s Credential=%s, SignedHeaders=%s, Signature=%s" % (
+            self.ALGORITHM, credential, signed_headers, signature
+        )
+
+
 class TelnyxS3Client:
     """S3 client for Telnyx Cloud Storage using AWS SigV4"""
 
-    def __init__(self, api_key, region):
+    def __init__(self, api_key, region, pool=None):
         self.api_key = api_key
         self.region = region
         self.secret_key = "placeholder"  # Telnyx uses API key as access key
+        self.pool = pool or get_http_pool()
+        self.signer = SigV4Signer(api_key, self.secret_key, region)
 
-    def _sign(self, key, msg):
-        """AWS SigV4 signing helper"""
-        return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
-
-    def _get_signature_key(self, date_stamp):
-        """Generate AWS SigV4 signing key"""
-        k_date = self._sign(("AWS4" + self.secret_key).encode("utf-8"), date_stamp)
-        k_region = self._sign(k_date, self.region)
-        k_service = self._sign(k_region, "s3")
-        k_signing = self._sign(k_service, "aws4_request")
-        return k_signing
-
-    def _make_request(self, method, bucket, key, payload=b"", content_type=None, extra_headers=None):
+    def _make_request(self, method, bucket, key, payload=b"", content_type=None, extra_headers=None,
+                      query=None):
         """Make authenticated S3 request"""
         host = (
             "%s.%s.telnyxcloudstorage.com" % (bucket, self.region)
@@ -129,11 +389,14 @@ class TelnyxS3Client:
             else "%s.telnyxcloudstorage.com" % self.region
         )
         path = "/%s" % key if key else "/"
-
-        t = datetime.datetime.now(datetime.timezone.utc)
-        amz_date = t.strftime("%Y%m%dT%H%M%SZ")
-        date_stamp = t.strftime("%Y%m%d")
-
+        canonical_query = ""
+        if query:
+            canonical_query = "&".join(
+                "%s=%s" % (urllib.parse.quote(k, safe="-_.~"), urllib.parse.quote(v, safe="-_.~"))
+                for k, v in sorted(query.items())
+            )
+
+        amz_date = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         payload_hash = hashlib.sha256(payload).hexdigest()
 
         headers = {
@@ -149,33 +412,12 @@ class TelnyxS3Client:
         if extra_headers:
             headers.update(extra_headers)
 
-        canonical_headers = "".join("%s:%s\n" % (k, v) for k, v in sorted(headers.items()))
-        signed_headers = ";".join(sorted(headers.keys()))
-
-        canonical_request = "%s\n%s\n\n%s\n%s\n%s" % (
-            method, path, canonical_headers, signed_headers, payload_hash
-        )
-
-        algorithm = "AWS4-HMAC-SHA256"
-        credential_scope = "%s/%s/s3/aws4_request" % (date_stamp, self.region)
-        string_to_sign = "%s\n%s\n%s\n%s" % (
-            algorithm,
-            amz_date,
-            credential_scope,
-            hashlib.sha256(canonical_request.encode()).hexdigest(),
-        )
-
-        signing_key = self._get_signature_key(date_stamp)
-        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
-
-        auth = "%s Credential=%s/%s, SignedHeaders=%s, Signature=%s" % (
-            algorithm, self.api_key, credential_scope, signed_headers, signature
-        )
-
         request_headers = {
             "x-amz-date": amz_date,
             "x-amz-content-sha256": payload_hash,
-            "Authorization": auth,
+            "Authorization": self.signer.sign(
+                method, path, headers, payload_hash, canonical_query
+            ),
         }
         if content_type:
             request_headers["Content-Type"] = content_type
@@ -185,15 +427,14 @@ class TelnyxS3Client:
             request_headers.update(extra_headers)
 
         url = "https://%s%s" % (host, path)
-        req = urllib.request.Request(
-            url, data=payload if payload else None, headers=request_headers, method=method
-        )
+        if canonical_query:
+            url += "?" + canonical_query
 
         try:
-            with urllib.request.urlopen(req, timeout=30) as response:
-                return response.status, response.read().decode("utf-8", errors="ignore")
-        except urllib.error.HTTPError as e:
-            return e.code, e.read().decode("utf-8", errors="ignore")
+            status, body = self.pool.request(
+                method, url, body=payload if payload else None, headers=request_headers
+            )
+            return status, body.decode("utf-8", errors="ignore")
         except Exception as e:
             return 0, str(e)
 
@@ -216,17 +457,83 @@ class TelnyxS3Client:
         status, body = self._make_request("PUT", bucket, key, data, content_type)
         return status in [200, 204], status, body
 
+    def iter_objects(self, bucket, prefix="", delimiter=None, page_size=1000):
+        """Iterate over objects in a bucket using paginated ListObjectsV2
+
+        Follows continuation tokens and yields each page's entries as soon as
+        the page arrives, so buckets of any size are listed in full without
+        holding the whole listing in memory.
+
+        Args:
+            bucket (str): Bucket name
+            prefix (str): Only list keys starting with this prefix
+            delimiter (str): Group keys sharing a prefix up to this delimiter
+            page_size (int): Keys per request (max 1000)
+
+        Yields:
+            dict: {key, size, etag, last_modified}. With a delimiter, grouped
+                prefixes are yielded as {key, size, etag, last_modified, prefix: True}
+
+        Raises:
+            RuntimeError: If a page request fails or returns invalid XML
+        """
+        token = None
+        while True:
+            query = {"list-type": "2", "max-keys": str(page_size)}
+            if prefix:
+                query["prefix"] = prefix
+            if delimiter:
+                query["delimiter"] = delimiter
+            if token:
+                query["continuation-token"] = token
+
+            status, body = self._make_request("GET", bucket, "", query=query)
+            if status != 200:
+                raise RuntimeError("List failed (HTTP %s): %s" % (status, body[:200]))
+            try:
+                root = ElementTree.fromstring(body)
+            except ElementTree.ParseError as e:
+                raise RuntimeError("List failed (invalid XML): %s" % e)
+
+            truncated = False
+            token = None
+            for el in root:
+                tag = _xml_tag(el)
+                if tag == "Contents":
+                    fields = {_xml_tag(child): child.text or "" for child in el}
+                    yield {
+                        "key": fields.get("Key", ""),
+                        "size": int(fields.get("Size") or 0),
+                        "etag": fields.get("ETag", "").strip('"'),
+                        "last_modified": fields.get("LastModified", ""),
+                    }
+                elif tag == "CommonPrefixes":
+                    fields = {_xml_tag(child): child.text or "" for child in el}
+                    yield {
+                        "key": fields.get("Prefix", ""),
+                        "size": 0,
+                        "etag": "",
+                        "last_modified": "",
+                        "prefix": True,
+                    }
+                elif tag == "IsTruncated":
+                    truncated = (el.text or "").strip().lower() == "true"
+                elif tag == "NextContinuationToken":
+                    token = el.text
+
+            if not truncated or not token:
+                return
+
     def list_objects(self, bucket, prefix=""):
-        """List objects in bucket"""
-        query = "?prefix=%s" % urllib.parse.quote(prefix) if prefix else ""
-        status, body = self._make_request("GET", bucket, "" + query)
+        """List all object keys in bucket
 
-        if status == 200:
-            files = []
-            for match in re.finditer(r"<Key>([^<]+)</Key>", body):
-                files.append(match.group(1))
-            return files
-        return []
+        Returns:
+            list[str]: Object keys, or an empty list if listing fails
+        """
+        try:
+            return [obj["key"] for obj in self.iter_objects(bucket, prefix)]
+        except RuntimeError:
+            return []
 
     def delete_object(self, bucket, key):
         """Delete object from bucket"""
@@ -245,10 +552,7 @@ class TelnyxS3Client:
         host = "%s.telnyxcloudstorage.com" % self.region
         path = "/%s" % bucket
 
-        t = datetime.datetime.now(datetime.timezone.utc)
-        amz_date = t.strftime("%Y%m%dT%H%M%SZ")
-        date_stamp = t.strftime("%Y%m%d")
-
+        amz_date = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         payload = bucket_config.encode()
         payload_hash = hashlib.sha256(payload).hexdigest()
 
@@ -260,45 +564,18 @@ class TelnyxS3Client:
             "content-length": str(len(payload)),
         }
 
-        canonical_headers = "".join("%s:%s\n" % (k, v) for k, v in sorted(headers.items()))
-        signed_headers = ";".join(sorted(headers.keys()))
-
-        canonical_request = "PUT\n%s\n\n%s\n%s\n%s" % (
-            path, canonical_headers, signed_headers, payload_hash
-        )
-
-        algorithm = "AWS4-HMAC-SHA256"
-        credential_scope = "%s/%s/s3/aws4_request" % (date_stamp, self.region)
-        string_to_sign = "%s\n%s\n%s\n%s" % (
-            algorithm,
-            amz_date,
-            credential_scope,
-            hashlib.sha256(canonical_request.encode()).hexdigest(),
-        )
-
-        signing_key = self._get_signature_key(date_stamp)
-        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
-
-        auth = "%s Credential=%s/%s, SignedHeaders=%s, Signature=%s" % (
-            algorithm, self.api_key, credential_scope, signed_headers, signature
-        )
-
         request_headers = {
             "x-amz-date": amz_date,
             "x-amz-content-sha256": payload_hash,
-            "Authorization": auth,
+            "Authorization": self.signer.sign("PUT", path, headers, payload_hash),
             "Content-Type": "application/xml",
             "Content-Length": str(len(payload)),
         }
 
         url = "https://%s%s" % (host, path)
-        req = urllib.request.Request(url, data=payload, headers=request_headers, method="PUT")
 
         try:
-            with urllib.request.urlopen(req, timeout=30) as response:
-                status = response.status
-        except urllib.error.HTTPError as e:
-            status = e.code
+            status, _ = self.pool.request("PUT", url, body=payload, headers=request_headers)
         except Exception:
             status = 0
 
@@ -332,26 +609,48 @@ def make_api_request(method, endpoint, payload=None, timeout=60):
         "User-Agent": "openclaw-telnyx-embeddings/1.0",
     }
 
-    req = urllib.request.Request(url, data=data, headers=headers, method=method)
-
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            body = response.read().decode()
-            try:
-                return response.status, json.loads(body)
-            except json.JSONDecodeError:
-                return response.status, body
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8", errors="ignore")
-        return e.code, error_body
+        status, body = get_http_pool().request(
+            method, url, body=data, headers=headers, timeout=timeout
+        )
     except Exception as e:
         return 0, str(e)
 
+    if status >= 400:
+        return status, body.decode("utf-8", errors="ignore")
+    body = body.decode()
+    try:
+        return status, json.loads(body)
+    except json.JSONDecodeError:
+        return status, body
+
 
 # ---------------------------------------------------------------------------
 # Subcommands
 # ---------------------------------------------------------------------------
 
+# search.py caches results in tools/rag's query cache; changes to a bucket
+# invalidate its entries there
+RAG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rag")
+
+
+def _invalidate_search_cache(bucket):
+    """Drop cached similarity search results for a bucket whose objects changed
+
+    Args:
+        bucket (str): Bucket name
+    """
+    if RAG_DIR not in sys.path:
+        sys.path.append(RAG_DIR)
+    try:
+        from query_cache import invalidate_bucket
+    except ImportError:
+        return
+    if not invalidate_bucket(bucket):
+        print("Warning: could not invalidate cached search results for %s" % bucket,
+              file=sys.stderr)
+
+
 def cmd_upload(args):
     """Upload file(s) to a Telnyx Storage bucket"""
     config = load_config()
@@ -410,6 +709,7 @@ def cmd_upload(args):
     print("\nUploaded: %d | Failed: %d" % (success, failed))
 
     if success > 0:
+        _invalidate_search_cache(bucket)
         print("\nTip: Run './index.py embed --bucket %s' to make files searchable." % bucket)
 
 
@@ -425,6 +725,7 @@ def cmd_embed(args):
     })
 
     if status in [200, 201, 202]:
+        _invalidate_search_cache(bucket)
         print("Embedding triggered successfully.")
         if isinstance(response, dict) and "data" in response:
             task_id = response["data"].get("task_id")
@@ -501,18 +802,28 @@ def cmd_list(args):
     # List S3 objects
     client = TelnyxS3Client(api_key, config["region"])
     prefix = args.prefix or ""
-    files = client.list_objects(bucket, prefix)
 
-    print("\nFiles in '%s'%s (%d):\n" % (
+    print("\nFiles in '%s'%s:\n" % (
         bucket,
         " (prefix: %s)" % prefix if prefix else "",
-        len(files),
     ))
 
-    for f in sorted(files):
-        print("  %s" % f)
+    # Keys arrive in sorted order, one page at a time
+    count = 0
+    try:
+        for obj in client.iter_objects(bucket, prefix, delimiter=args.delimiter):
+            count += 1
+            if obj.get("prefix"):
+                print("  %s" % obj["key"])
+            else:
+                print("  %s (%d bytes)" % (obj["key"], obj["size"]))
+    except RuntimeError as e:
+        print("ERROR: %s" % e, file=sys.stderr)
+        sys.exit(1)
 
-    if not files:
+    if count:
+        print("\n  %d entries" % count)
+    else:
         print("  (empty)")
 
 
@@ -571,6 +882,7 @@ def cmd_delete(args):
     print("\nDeleting '%s' from bucket '%s'" % (key, bucket))
 
     if client.delete_object(bucket, key):
+        _invalidate_search_cache(bucket)
         print("Deleted: %s" % key)
     else:
         print("ERROR: Failed to delete '%s'" % key, file=sys.stderr)
@@ -602,6 +914,8 @@ def main():
     p_list = subparsers.add_parser("list", help="List files in a bucket")
     p_list.add_argument("--bucket", "-b", help="Bucket name")
     p_list.add_argument("--prefix", help="Filter by prefix")
+    p_list.add_argument("--delimiter", "-d",
+                        help="Group keys by this delimiter (e.g., '/' for folders)")
     p_list.add_argument("--embeddings", "-e", action="store_true",
                         help="Show embedding status instead of S3 listing")
 
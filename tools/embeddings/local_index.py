@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Telnyx Embeddings - Local Vector Index
+
+Builds an on-disk index from vectors produced by `embed.py --batch
+--out-format npy|f32` and searches it locally, so a query costs one
+(cacheable) embedding call instead of a similarity-search round trip.
+
+Small corpora are searched by brute force; above --ivf-threshold vectors
+an IVF index (spherical k-means centroids with inverted lists) is built
+and only the nearest lists are scanned. NumPy is used when installed and
+is required to build IVF lists; search works without it, just slower.
+
+Usage:
+  ./local_index.py build --vectors vectors.npy --texts snippets.jsonl
+  ./local_index.py build --vectors vectors.f32 --format f32 --texts snippets.jsonl --out my-index
+  ./local_index.py info
+  ./local_index.py search "how do I port a number?" -n 5
+"""
+
+import os
+import sys
+import json
+import array
+import heapq
+import math
+import argparse
+from operator import mul
+
+try:
+    import numpy as np
+except ImportError:  # Optional: pure-Python search fallback
+    np = None
+
+from embed import DEFAULT_MODEL, EmbeddingCache, VectorWriter, embed_text, read_batch_input, read_vectors
+
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".local-index")
+
+# Corpora with at least this many vectors get an IVF index
+DEFAULT_IVF_THRESHOLD = 20000
+# Lists scanned per query; more lists means better recall and slower search
+DEFAULT_NPROBE = 8
+# k-means iterations and the training sample size per list
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE_PER_LIST = 64
+# Rows scored per block when assigning vectors to lists
+_ASSIGN_BLOCK = 65536
+
+INDEX_VERSION = 1
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def _normalize(vector):
+    """Scale a vector to unit length (zero vectors are left as they are)"""
+    norm = math.sqrt(sum(map(mul, vector, vector)))
+    return [v / norm for v in vector] if norm else list(vector)
+
+
+def _train_ivf(vectors, nlist, seed=0):
+    """Spherical k-means over unit vectors (NumPy)
+
+    Args:
+        vectors (numpy.ndarray): (rows, dims) unit vectors
+        nlist (int): Number of lists (centroids)
+        seed (int): Random seed
+
+    Returns:
+        tuple: (centroids array (nlist, dims), list id per row)
+    """
+    rng = np.random.default_rng(seed)
+    rows = vectors.shape[0]
+    sample_size = min(rows, nlist * _KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(rows, sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(_KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            # Reseed empty lists from random sample rows
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.where(norms == 0, 1, norms)
+
+    assign = np.empty(rows, dtype=np.int32)
+    for start in range(0, rows, _ASSIGN_BLOCK):
+        block = np.asarray(vectors[start:start + _ASSIGN_BLOCK])
+        assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return centroids.astype(np.float32), assign
+
+
+def build_index(vectors_path, texts_path, out_dir=DEFAULT_INDEX_DIR, fmt="npy", model=None,
+                ivf_threshold=DEFAULT_IVF_THRESHOLD, nlist=None, quiet=False):
+    """Build a local index from embed.py batch output
+
+    The vectors file's ``.index.jsonl`` sidecar maps rows to input lines,
+    which are read from the same JSONL/text file the batch was run on. A
+    record's "id" becomes the result's source.
+
+    Args:
+        vectors_path (str): Matrix written by embed.py (--out-format npy or f32)
+        texts_path (str): Batch input the vectors were made from
+        out_dir (str): Index directory to write
+        fmt (str): "npy" or "f32", the format of vectors_path
+        model (str): Model the vectors came from (queries must use the same)
+        ivf_threshold (int): Build IVF lists from this many vectors
+        nlist (int or None): Number of IVF lists (default: about 4 * sqrt(rows))
+        quiet (bool): Suppress progress output
+
+    Returns:
+        dict: The index metadata
+    """
+    matrix, entries = read_vectors(vectors_path, fmt)
+    flat = matrix.cast("B").cast("f")
+    rows_in = matrix.shape[0] if matrix.ndim == 2 else 0
+    dims = matrix.shape[1] if rows_in else 0
+    row_of = {entry["index"]: entry["row"] for entry in entries if "row" in entry}
+
+    os.makedirs(out_dir, exist_ok=True)
+    writer = VectorWriter(os.path.join(out_dir, "vectors.npy"), "npy")
+    offsets = array.array("Q")
+    rows = 0
+    with open(texts_path, "r", encoding="utf-8") as texts, \
+            open(os.path.join(out_dir, "docs.jsonl"), "wb") as docs:
+        for index, record_id, text in read_batch_input(texts):
+            row = row_of.get(index)
+            if row is None:
+                continue  # Failed to embed: not searchable
+            vector = _normalize(flat[row * dims:(row + 1) * dims])
+            writer.write({"index": index, "embedding": vector})
+            offsets.append(docs.tell())
+            source = record_id if record_id is not None else "line %d" % (index + 1)
+            docs.write((json.dumps({"source": str(source), "content": text}) + "\n").encode("utf-8"))
+            rows += 1
+    writer.close()
+    with open(os.path.join(out_dir, "docs.offsets"), "wb") as f:
+        offsets.tofile(f)
+
+    meta = {
+        "version": INDEX_VERSION,
+        "model": model or DEFAULT_MODEL,
+        "rows": rows,
+        "dimensions": dims,
+        "ivf": None,
+    }
+    if rows >= ivf_threshold:
+        if np is None:
+            if not quiet:
+                print("NumPy not installed: building a brute-force index only", file=sys.stderr)
+        else:
+            nlist = min(rows, nlist or max(1, int(4 * math.sqrt(rows))))
+            vectors = np.load(os.path.join(out_dir, "vectors.npy"), mmap_mode="r")
+            centroids, assign = _train_ivf(vectors, nlist)
+            order = np.argsort(assign, kind="stable").astype(np.int32)
+            list_offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=nlist))))
+            np.save(os.path.join(out_dir, "ivf_centroids.npy"), centroids)
+            order.tofile(os.path.join(out_dir, "ivf_rows.i32"))
+            meta["ivf"] = {"nlist": nlist, "offsets": [int(o) for o in list_offsets]}
+
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    if not quiet:
+        kind = "IVF, %d lists" % meta["ivf"]["nlist"] if meta["ivf"] else "brute force"
+        print("Indexed %d vectors (%d dims, %s) in %s" % (rows, dims, kind, out_dir))
+    return meta
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+class LocalIndex:
+    """A built index, memory-mapped for search
+
+    Args:
+        index_dir (str): Directory written by build_index
+
+    Raises:
+        IOError: If the index is missing or unreadable
+        ValueError: If the index was written by an incompatible version
+    """
+
+    def __init__(self, index_dir=DEFAULT_INDEX_DIR):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError("Unsupported local index version: %s" % self.meta.get("version"))
+        self.model = self.meta["model"]
+        self.rows = self.meta["rows"]
+        self.dims = self.meta["dimensions"]
+        self.ivf = self.meta.get("ivf")
+
+        vectors_path = os.path.join(index_dir, "vectors.npy")
+        if np is not None:
+            self.vectors = np.load(vectors_path, mmap_mode="r") if self.rows else None
+        else:
+            matrix, _ = read_vectors(vectors_path)
+            self.vectors = matrix.cast("B").cast("f")
+        self.offsets = array.array("Q")
+        with open(os.path.join(index_dir, "docs.offsets"), "rb") as f:
+            self.offsets.frombytes(f.read())
+
+        if self.ivf:
+            self.list_offsets = self.ivf["offsets"]
+            rows_path = os.path.join(index_dir, "ivf_rows.i32")
+            if np is not None:
+                self.centroids = np.load(os.path.join(index_dir, "ivf_centroids.npy"))
+                self.list_rows = np.fromfile(rows_path, dtype=np.int32)
+            else:
+                with open(os.path.join(index_dir, "ivf_centroids.npy"), "rb") as f:
+                    header_len = int.from_bytes(f.read(10)[8:10], "little")
+                    f.seek(10 + header_len)
+                    self.centroids = array.array("f", f.read())
+                self.list_rows = array.array("i")
+                with open(rows_path, "rb") as f:
+                    self.list_rows.frombytes(f.read())
+
+    def _candidates(self, query, nprobe):
+        """Rows in the nprobe lists whose centroids are nearest the query"""
+        nlist = self.ivf["nlist"]
+        nprobe = max(1, min(nprobe, nlist))
+        if np is not None:
+            scores = self.centroids @ query
+            lists = np.argpartition(-scores, nprobe - 1)[:nprobe]
+            return np.concatenate([
+                self.list_rows[self.list_offsets[i]:self.list_offsets[i + 1]] for i in lists
+            ])
+        dims = self.dims
+        scores = [
+            sum(map(mul, self.centroids[i * dims:(i + 1) * dims], query)) for i in range(nlist)
+        ]
+        lists = heapq.nlargest(nprobe, range(nlist), key=scores.__getitem__)
+        rows = []
+        for i in lists:
+            rows.extend(self.list_rows[self.list_offsets[i]:self.list_offsets[i + 1]])
+        return rows
+
+    def search(self, query_vector, k=5, nprobe=DEFAULT_NPROBE):
+        """Find the rows most similar (cosine) to a query vector
+
+        Args:
+            query_vector (list[float]): Query embedding from the index's model
+            k (int): Number of results
+            nprobe (int): IVF lists to scan (ignored for brute-force indexes)
+
+        Returns:
+            list[tuple[int, float]]: (row, cosine similarity), best first
+        """
+        if not self.rows or len(query_vector) != self.dims:
+            return []
+        query = _normalize(query_vector)
+        k = min(k, self.rows)
+
+        if np is not None:
+            query = np.asarray(query, dtype=np.float32)
+            if self.ivf:
+                # Sorted so the gather reads the mapped file sequentially
+                rows = np.sort(self._candidates(query, nprobe))
+                scores = self.vectors[rows] @ query
+            else:
+                rows = None
+                scores = self.vectors @ query
+            k = min(k, len(scores))
+            if not k:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            if rows is not None:
+                return [(int(rows[i]), float(scores[i])) for i in top]
+            return [(int(i), float(scores[i])) for i in top]
+
+        dims = self.dims
+        vectors = self.vectors
+        rows = self._candidates(query, nprobe) if self.ivf else range(self.rows)
+        return heapq.nlargest(
+            k,
+            ((row, sum(map(mul, vectors[row * dims:(row + 1) * dims], query))) for row in rows),
+            key=lambda item: item[1],
+        )
+
+    def documents(self, rows):
+        """Read the source and content stored for rows
+
+        Args:
+            rows (list[int]): Row numbers
+
+        Returns:
+            list[dict]: {"source", "content"} per row
+        """
+        docs = []
+        with open(os.path.join(self.index_dir, "docs.jsonl"), "rb") as f:
+            for row in rows:
+                f.seek(self.offsets[row])
+                docs.append(json.loads(f.readline().decode("utf-8")))
+        return docs
+
+
+def local_search(query, num_docs=5, index_dir=DEFAULT_INDEX_DIR, timeout=30,
+                 nprobe=DEFAULT_NPROBE, cache=None):
+    """Search a local index, in the same result format as similarity search
+
+    Args:
+        query (str): Search query text
+        num_docs (int): Number of documents to return
+        index_dir (str): Index directory
+        timeout (int): Timeout for embedding the query
+        nprobe (int): IVF lists to scan
+        cache (EmbeddingCache or None): Cache for query embeddings
+
+    Returns:
+        dict or None: {"data": [{content, source, certainty, distance}], "local": True},
+            or None on a miss (no index, query embedding failed, or no results)
+            so the caller can fall back to the API
+    """
+    try:
+        index = LocalIndex(index_dir)
+    except (IOError, OSError, ValueError, KeyError):
+        return None
+
+    result = embed_text(query, model=index.model, timeout=timeout, cache=cache)
+    if not result.get("data"):
+        return None
+
+    hits = index.search(result["data"][0]["embedding"], num_docs, nprobe)
+    if not hits:
+        return None
+
+    data = []
+    for (row, score), doc in zip(hits, index.documents([row for row, _ in hits])):
+        data.append({
+            "content": doc["content"],
+            "source": doc["source"],
+            # Same scale as the API's certainty: cosine mapped to [0, 1]
+            "certainty": (1.0 + score) / 2.0,
+            "distance": 1.0 - score,
+        })
+    return {"data": data, "local": True}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query a local vector index")
+    subparsers = parser.add_subparsers(dest="command", help="Command")
+
+    p_build = subparsers.add_parser("build", help="Build an index from embed.py batch output")
+    p_build.add_argument("--vectors", required=True, help="Matrix from embed.py --out-format npy|f32")
+    p_build.add_argument("--format", choices=["npy", "f32"], default="npy", help="Matrix format")
+    p_build.add_argument("--texts", required=True, help="Batch input the vectors were made from")
+    p_build.add_argument("--out", default=DEFAULT_INDEX_DIR, help="Index directory")
+    p_build.add_argument("--model", "-m", default=DEFAULT_MODEL, help="Model used for the vectors")
+    p_build.add_argument(
+        "--ivf-threshold", type=int, default=DEFAULT_IVF_THRESHOLD,
+        help="Build IVF lists for at least this many vectors (default: %d)" % DEFAULT_IVF_THRESHOLD
+    )
+    p_build.add_argument("--nlist", type=int, default=None, help="Number of IVF lists")
+
+    p_info = subparsers.add_parser("info", help="Show index metadata")
+    p_info.add_argument("--index", default=DEFAULT_INDEX_DIR, help="Index directory")
+
+    p_search = subparsers.add_parser("search", help="Search the index")
+    p_search.add_argument("query", nargs="+", help="Search query")
+    p_search.add_argument("--index", default=DEFAULT_INDEX_DIR, help="Index directory")
+    p_search.add_argument("--num", "-n", type=int, default=5, help="Number of results")
+    p_search.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE, help="IVF lists to scan")
+    p_search.add_argument("--cache", action="store_true", help="Cache query embeddings")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        try:
+            build_index(args.vectors, args.texts, args.out, args.format, args.model,
+                        args.ivf_threshold, args.nlist)
+        except (IOError, ValueError) as e:
+            print("ERROR: %s" % e, file=sys.stderr)
+            sys.exit(1)
+    elif args.command == "info":
+        try:
+            index = LocalIndex(args.index)
+        except (IOError, OSError, ValueError, KeyError) as e:
+            print("ERROR: Could not open index: %s" % e, file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps({k: v for k, v in index.meta.items() if k != "ivf"}, indent=2))
+        if index.ivf:
+            print("IVF lists: %d" % index.ivf["nlist"])
+        print("NumPy: %s" % ("yes" if np is not None else "no (pure-Python search)"))
+    elif args.command == "search":
+        cache = EmbeddingCache() if args.cache else None
+        result = local_search(" ".join(args.query), args.num, args.index, nprobe=args.nprobe,
+                              cache=cache)
+        if cache is not None:
+            cache.close()
+        if result is None:
+            print("No local results (missing index or query embedding failed)", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(result, indent=2))
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
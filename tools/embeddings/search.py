@@ -11,6 +11,9 @@ Usage:
   ./search.py "meeting notes" --bucket my-bucket --num 10
   ./search.py "API limits" --json
   ./search.py "deployment" --timeout 45
+  ./search.py "porting" --local        # Search the local index, API on a miss
+  ./search.py "porting" --no-cache     # Skip the query result cache
+  ./search.py "porting" -b memory -b slack:0.8   # Search several buckets at once
 """
 
 import os
@@ -20,6 +23,7 @@ import urllib.request
 import urllib.error
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 
 # Default configuration
@@ -27,8 +31,37 @@ DEFAULT_CONFIG = {
     "bucket": "openclaw-main",
     "region": "us-central-1",
     "default_num_docs": 5,
+    "query_cache_ttl": 300,
+    "query_cache_max_mb": 32,
+    "search_buckets": [],
+    "bucket_weights": {},
 }
 
+# Where local_index.py builds its index by default
+DEFAULT_LOCAL_INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".local-index")
+
+# The query result cache is shared with tools/rag, whose sync.py invalidates it
+RAG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rag")
+
+
+def open_cache(config):
+    """Open the query result cache shared with tools/rag/query_cache.py
+
+    Args:
+        config (dict): Configuration ("query_cache_ttl", "query_cache_max_mb")
+
+    Returns:
+        QueryCache or None: None if caching is disabled or the rag tool
+            isn't installed alongside this one
+    """
+    if RAG_DIR not in sys.path:
+        sys.path.append(RAG_DIR)
+    try:
+        from query_cache import open_query_cache
+    except ImportError:
+        return None
+    return open_query_cache(config)
+
 
 def load_config():
     """Load configuration from file or defaults"""
@@ -120,7 +153,7 @@ def normalize_response(response_data):
     return response_data
 
 
-def similarity_search(query, num_docs=5, bucket_name=None, timeout=30, max_retries=3):
+def similarity_search(query, num_docs=5, bucket_name=None, timeout=30, max_retries=3, cache=None):
     """Search using Telnyx similarity search API with retry logic
 
     Args:
@@ -129,15 +162,22 @@ def similarity_search(query, num_docs=5, bucket_name=None, timeout=30, max_retri
         bucket_name (str): Override bucket name from config
         timeout (int): Request timeout in seconds
         max_retries (int): Maximum retry attempts
+        cache (QueryCache or None): Serve repeated queries from this cache
+            and store new responses in it
 
     Returns:
         dict: API response with search results or error info
     """
     config = load_config()
-    api_key = load_credentials()
-
     bucket = bucket_name or config["bucket"]
 
+    if cache is not None:
+        cached = cache.get(bucket, query, num_docs)
+        if cached is not None:
+            return normalize_response(cached)
+
+    api_key = load_credentials()
+
     url = "https://api.telnyx.com/v2/ai/embeddings/similarity-search"
 
     payload = json.dumps({
@@ -158,6 +198,8 @@ def similarity_search(query, num_docs=5, bucket_name=None, timeout=30, max_retri
         try:
             with urllib.request.urlopen(req, timeout=timeout) as response:
                 response_data = json.loads(response.read().decode())
+                if cache is not None:
+                    cache.put(bucket, query, num_docs, response_data)
                 return normalize_response(response_data)
 
         except urllib.error.HTTPError as e:
@@ -195,6 +237,105 @@ def similarity_search(query, num_docs=5, bucket_name=None, timeout=30, max_retri
     return {"error": "Max retries exceeded"}
 
 
+def parse_bucket_spec(spec):
+    """Split a "name" or "name:weight" bucket argument
+
+    Args:
+        spec (str): Bucket name, optionally followed by ":weight"
+
+    Returns:
+        tuple[str, float or None]: (bucket, weight), weight None if not given
+
+    Raises:
+        ValueError: If the weight is not a number
+    """
+    bucket, sep, weight = spec.partition(":")
+    if not sep:
+        return spec, None
+    return bucket, float(weight)
+
+
+def multi_bucket_search(query, buckets, num_docs=5, weights=None, timeout=30, max_retries=3,
+                        cache=None):
+    """Search several buckets concurrently and merge the results
+
+    Every bucket is asked for num_docs results on its own thread. Each
+    result is scored as certainty times its bucket's weight (default 1.0).
+    A source returned by more than one bucket is only kept from the bucket
+    where it scored highest. The top num_docs results are returned.
+
+    Args:
+        query (str): Search query text
+        buckets (list[str]): Bucket names
+        num_docs (int): Number of documents to return
+        weights (dict or None): Bucket name -> score multiplier
+        timeout (int): Request timeout in seconds
+        max_retries (int): Maximum retry attempts per bucket
+        cache (QueryCache or None): Serve repeated queries from this cache
+
+    Returns:
+        dict: {"data": [...], "buckets": [...]}. Results carry "bucket" and
+            "score"; "buckets" lists each bucket's result count, latency_ms
+            and any error. "error" is set only if every bucket failed.
+    """
+    weights = weights or {}
+
+    def _search_one(bucket):
+        start = time.monotonic()
+        result = similarity_search(query, num_docs, bucket, timeout, max_retries, cache)
+        return result, time.monotonic() - start
+
+    with ThreadPoolExecutor(max_workers=max(1, len(buckets))) as pool:
+        outcomes = list(pool.map(_search_one, buckets))
+
+    report = []
+    candidates = []
+    best = {}  # source -> (score, bucket)
+    for bucket, (result, elapsed) in zip(buckets, outcomes):
+        docs = result.get("data") or []
+        entry = {"bucket": bucket, "results": len(docs), "latency_ms": round(elapsed * 1000.0, 1)}
+        if "error" in result:
+            entry["error"] = result["error"]
+            if result.get("details"):
+                entry["details"] = result["details"]
+        report.append(entry)
+
+        weight = weights.get(bucket, 1.0)
+        for doc in docs:
+            score = float(doc.get("certainty") or 0) * weight
+            candidates.append(dict(doc, bucket=bucket, score=score))
+            source = doc.get("source")
+            if source not in best or score > best[source][0]:
+                best[source] = (score, bucket)
+
+    merged = [d for d in candidates if best[d.get("source")][1] == d["bucket"]]
+    merged.sort(key=lambda d: -d["score"])
+    results = {"data": merged[:num_docs], "buckets": report}
+    if report and all("error" in entry for entry in report):
+        results["error"] = "All %d bucket searches failed" % len(report)
+        results["details"] = "; ".join("%s: %s" % (e["bucket"], e["error"]) for e in report)
+    return results
+
+
+def format_bucket_report(results):
+    """Format the per-bucket result counts and latencies of a multi-bucket search
+
+    Args:
+        results (dict): Results from multi_bucket_search
+
+    Returns:
+        str: One line per bucket
+    """
+    lines = ["Buckets:"]
+    for entry in results.get("buckets", []):
+        line = "  %s: %d results in %.0f ms" % (
+            entry["bucket"], entry["results"], entry["latency_ms"])
+        if "error" in entry:
+            line += " (%s)" % entry["error"]
+        lines.append(line)
+    return "\n".join(lines)
+
+
 def format_results(results, max_content_chars=500):
     """Format search results for display
 
@@ -227,8 +368,14 @@ def format_results(results, max_content_chars=500):
         else:
             conf = "[LOW]"
 
-        output.append("--- Result %d %s (certainty: %.3f) ---" % (i, conf, certainty))
-        output.append("Source: %s" % filename)
+        weighted = ""
+        if doc.get("score", certainty) != certainty:
+            weighted = ", weighted: %.3f" % doc["score"]
+        output.append("--- Result %d %s (certainty: %.3f%s) ---" % (i, conf, certainty, weighted))
+        if "bucket" in doc:
+            output.append("Source: %s (bucket: %s)" % (filename, doc["bucket"]))
+        else:
+            output.append("Source: %s" % filename)
         output.append("")
         output.append(display_content)
         if len(content) > max_content_chars:
@@ -238,7 +385,8 @@ def format_results(results, max_content_chars=500):
     return "\n".join(output)
 
 
-def search(query, num_docs=5, bucket_name=None, output_json=False, timeout=30):
+def search(query, num_docs=5, bucket_name=None, output_json=False, timeout=30,
+           local_index=None, use_cache=True, buckets=None):
     """Main search function
 
     Args:
@@ -247,14 +395,47 @@ def search(query, num_docs=5, bucket_name=None, output_json=False, timeout=30):
         bucket_name (str): Override bucket name
         output_json (bool): Return JSON instead of formatted text
         timeout (int): Request timeout in seconds
+        local_index (str or None): Search this local index directory first
+            (see local_index.py), using the API only on a miss
+        use_cache (bool): Use the query result cache shared with tools/rag
+        buckets (list[str] or None): Search these buckets concurrently
+            instead of bucket_name; entries may be "name:weight", and
+            config "bucket_weights" supplies weights not given inline
 
     Returns:
         str: Formatted results or JSON string
     """
-    results = similarity_search(query, num_docs, bucket_name, timeout)
+    config = load_config()
+    weights = dict(config.get("bucket_weights") or {})
+    names = []
+    for spec in buckets or []:
+        name, weight = parse_bucket_spec(spec)
+        names.append(name)
+        if weight is not None:
+            weights[name] = weight
+    if len(names) == 1:
+        bucket_name = names[0]
+
+    results = None
+    if local_index:
+        from local_index import local_search
+        results = local_search(query, num_docs, local_index, timeout)
+    if results is None:
+        cache = open_cache(config) if use_cache else None
+        try:
+            if len(names) > 1:
+                results = multi_bucket_search(
+                    query, names, num_docs, weights, timeout, cache=cache)
+            else:
+                results = similarity_search(query, num_docs, bucket_name, timeout, cache=cache)
+        finally:
+            if cache is not None:
+                cache.close()
 
     if output_json:
         return json.dumps(results, indent=2)
+    elif "buckets" in results:
+        return "%s\n%s" % (format_results(results), format_bucket_report(results))
     else:
         return format_results(results)
 
@@ -265,10 +446,20 @@ def main():
     )
     parser.add_argument("query", nargs="*", help="Search query")
     parser.add_argument("--num", "-n", type=int, default=None, help="Number of results")
-    parser.add_argument("--bucket", "-b", help="Bucket name to search")
+    parser.add_argument(
+        "--bucket", "-b", action="append", metavar="NAME[:WEIGHT]",
+        help="Bucket to search; repeat to search several buckets concurrently, "
+             "optionally weighting each one's certainties (default: config)"
+    )
     parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
     parser.add_argument("--full", "-f", action="store_true", help="Show full content (no truncation)")
     parser.add_argument("--timeout", "-t", type=int, default=30, help="Request timeout in seconds")
+    parser.add_argument(
+        "--local", nargs="?", const=DEFAULT_LOCAL_INDEX, default=None, metavar="DIR",
+        help="Search a local index built by local_index.py (default: .local-index), "
+             "falling back to the API on a miss"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the query result cache")
 
     args = parser.parse_args()
 
@@ -279,17 +470,25 @@ def main():
     query = " ".join(args.query)
     config = load_config()
     num_docs = args.num or config.get("default_num_docs", 5)
+    buckets = args.bucket or config.get("search_buckets") or []
+    try:
+        names = [parse_bucket_spec(spec)[0] for spec in buckets]
+    except ValueError:
+        print("ERROR: Bucket weights must be numbers, e.g. --bucket slack:0.8", file=sys.stderr)
+        sys.exit(1)
 
     if not args.json:
-        bucket_info = " (bucket: %s)" % args.bucket if args.bucket else ""
+        bucket_info = " (bucket: %s)" % ", ".join(names) if names else ""
         print("\nSearching: \"%s\"%s\n" % (query, bucket_info))
 
     results = search(
         query=query,
         num_docs=num_docs,
-        bucket_name=args.bucket,
+        buckets=buckets,
         output_json=args.json,
         timeout=args.timeout,
+        local_index=args.local,
+        use_cache=not args.no_cache,
     )
 
     print(results)
@@ -10,6 +10,10 @@ Usage:
   ./ask.py "meeting notes" --context           # Show retrieved chunks
   ./ask.py "deployment steps" --json           # Structured output
   ./ask.py "API usage" --model meta-llama/Meta-Llama-3.1-8B-Instruct
+  ./ask.py "porting" --local                  # Retrieve from the local index
+  ./ask.py "porting" --no-cache               # Skip the query result cache
+  ./ask.py "porting" --stream                 # Print the answer as it arrives
+  ./ask.py "porting" -b work -b slack:0.8 -r "number transfer"  # Parallel retrieval
 """
 
 import os
@@ -21,16 +25,46 @@ import urllib.request
 import urllib.error
 import time
 import argparse
+import asyncio
+import hashlib
+import http.client
+import threading
+import zlib
 from collections import Counter
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # Optional: pure-Python rerank fallback
+    np = None
 
-def load_config():
+from query_cache import open_query_cache
+from search import parse_bucket_spec
+
+# Config and credentials are resolved once per process (see load_config and
+# load_credentials)
+_resolved = {}
+
+
+def load_config(reload=False):
     """Load configuration from config.json
 
+    The file is read on the first call only; later calls return a copy of
+    the same settings.
+
+    Args:
+        reload (bool): Read config.json again
+
     Returns:
         dict: Merged configuration with defaults
     """
+    if reload or "config" not in _resolved:
+        _resolved["config"] = _read_config()
+    return dict(_resolved["config"])
+
+
+def _read_config():
+    """Read config.json merged over the defaults"""
     defaults = {
         "bucket": "openclaw-memory",
         "region": "us-central-1",
@@ -38,6 +72,15 @@ def load_config():
         "ask_model": "meta-llama/Meta-Llama-3.1-70B-Instruct",
         "ask_num_docs": 8,
         "retrieve_num_docs": 20,
+        "local_index": None,
+        "query_cache_ttl": 300,
+        "query_cache_max_mb": 32,
+        "near_duplicate_threshold": 0.8,
+        "context_budget": 6000,
+        "context_budgets": {},
+        "ask_buckets": [],
+        "bucket_weights": {},
+        "speculative_certainty": 0.85,
     }
     config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
     if os.path.exists(config_path):
@@ -50,12 +93,24 @@ def load_config():
     return defaults
 
 
-def load_credentials():
+def load_credentials(reload=False):
     """Load Telnyx API key from environment or .env file
 
+    A key, once found, is reused for the rest of the process.
+
+    Args:
+        reload (bool): Look the key up again
+
     Returns:
         str or None: The API key, or None if not found
     """
+    if reload or not _resolved.get("api_key"):
+        _resolved["api_key"] = _find_credentials()
+    return _resolved["api_key"]
+
+
+def _find_credentials():
+    """Read the API key from TELNYX_API_KEY or the .env file"""
     api_key = os.environ.get("TELNYX_API_KEY")
     if api_key:
         return api_key
@@ -77,7 +132,7 @@ def load_credentials():
 # Retrieval
 # ---------------------------------------------------------------------------
 
-def retrieve_chunks(query, num_docs, bucket, api_key, timeout=30, max_retries=3):
+def retrieve_chunks(query, num_docs, bucket, api_key, timeout=30, max_retries=3, cache=None):
     """Retrieve similar chunks from Telnyx similarity search API
 
     Args:
@@ -87,10 +142,17 @@ def retrieve_chunks(query, num_docs, bucket, api_key, timeout=30, max_retries=3)
         api_key (str): Telnyx API key
         timeout (int): Request timeout seconds
         max_retries (int): Max retry attempts
+        cache (QueryCache or None): Serve repeated queries from this cache
+            and store new responses in it
 
     Returns:
         list[dict]: List of {content, source, certainty} dicts
     """
+    if cache is not None:
+        cached = cache.get(bucket, query, num_docs)
+        if cached is not None:
+            return _normalize_results(cached)
+
     url = "https://api.telnyx.com/v2/ai/embeddings/similarity-search"
     payload = json.dumps({
         "bucket_name": bucket,
@@ -109,6 +171,8 @@ def retrieve_chunks(query, num_docs, bucket, api_key, timeout=30, max_retries=3)
         try:
             with urllib.request.urlopen(req, timeout=timeout) as resp:
                 data = json.loads(resp.read().decode())
+                if cache is not None:
+                    cache.put(bucket, query, num_docs, data)
                 return _normalize_results(data)
         except urllib.error.HTTPError as e:
             body = e.read().decode("utf-8", errors="ignore")
@@ -127,6 +191,39 @@ def retrieve_chunks(query, num_docs, bucket, api_key, timeout=30, max_retries=3)
     raise RuntimeError("Max retries exceeded during retrieval")
 
 
+# Local vector indexes are built and read by tools/embeddings/local_index.py
+EMBEDDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "embeddings")
+DEFAULT_LOCAL_INDEX = os.path.join(EMBEDDINGS_DIR, ".local-index")
+
+
+def retrieve_local(query, num_docs, index_dir, timeout=30):
+    """Retrieve similar chunks from a local index built by local_index.py
+
+    Args:
+        query (str): Search query
+        num_docs (int): Number of documents to retrieve
+        index_dir (str): Index directory
+        timeout (int): Timeout for embedding the query
+
+    Returns:
+        list[dict] or None: {content, source, certainty} dicts, or None on a
+            miss (embeddings tool or index unavailable, no results)
+    """
+    if EMBEDDINGS_DIR not in sys.path:
+        sys.path.append(EMBEDDINGS_DIR)
+    try:
+        from local_index import local_search
+    except ImportError:
+        return None
+    result = local_search(query, num_docs, index_dir, timeout)
+    if result is None:
+        return None
+    return [
+        {"content": d["content"], "source": d["source"], "certainty": d["certainty"]}
+        for d in result["data"]
+    ]
+
+
 def _normalize_results(response_data):
     """Normalize Telnyx API response into a flat list of dicts
 
@@ -154,10 +251,118 @@ def _normalize_results(response_data):
     return results
 
 
+def _run_in_thread(loop, fn, *args):
+    """Run a blocking call on a daemon thread, returning an asyncio future
+
+    Daemon threads let the pipeline abandon slow retrievals: nothing waits
+    for them when the loop or the process exits.
+
+    Args:
+        loop: Running event loop
+        fn (callable): Blocking function
+        *args: Arguments for fn
+
+    Returns:
+        asyncio.Future: Resolves to fn's result or exception
+    """
+    future = loop.create_future()
+
+    def settle(result, error):
+        if future.done():  # cancelled: an abandoned retrieval
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run():
+        try:
+            outcome = (fn(*args), None)
+        except Exception as e:
+            outcome = (None, e)
+        try:
+            loop.call_soon_threadsafe(settle, *outcome)
+        except RuntimeError:  # loop already closed
+            pass
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+async def gather_speculative(jobs, fetch, enough, min_certainty=None):
+    """Run retrievals concurrently until enough confident chunks arrive
+
+    Each job's chunks have their certainty multiplied by the job's weight.
+    Every chunk a job returns is kept; only the same chunk (same source and
+    content) returned by several buckets or rewrites is collapsed, keeping
+    the highest score. Once the merged
+    pool holds `enough` chunks with a certainty of at least min_certainty,
+    the remaining retrievals are abandoned and the pool is returned, so
+    generation can start without waiting for the slowest bucket.
+
+    Args:
+        jobs (list[dict]): Retrievals, each with "bucket", "query" and
+            "weight". Updated in place with "chunks" and "latency_ms", or
+            "error", or "skipped" for abandoned ones.
+        fetch (callable): Blocking fetch(job) returning a list of
+            {content, source, certainty} dicts; RuntimeError or ValueError
+            (a malformed response) fails that job only
+        enough (int): Confident chunks needed to stop early
+        min_certainty (float or None): Certainty that counts as confident;
+            None waits for every retrieval
+
+    Returns:
+        list[dict]: Merged chunks, highest certainty first
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    pending = {_run_in_thread(loop, fetch, job): job for job in jobs}
+    merged = []
+    seen = {}  # (source, content hash) -> (index in merged, job index)
+    job_index = {id(job): i for i, job in enumerate(jobs)}
+    while pending:
+        done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            job = pending.pop(future)
+            job["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            try:
+                chunks = future.result()
+            except (RuntimeError, ValueError) as e:
+                job["error"] = str(e)
+                continue
+            job["chunks"] = len(chunks)
+            for chunk in chunks:
+                chunk = dict(chunk, certainty=chunk["certainty"] * job["weight"],
+                             bucket=job["bucket"])
+                key = (chunk["source"],
+                       hashlib.sha1(chunk["content"].encode("utf-8")).digest())
+                previous = seen.get(key)
+                if previous is None or previous[1] == job_index[id(job)]:
+                    seen[key] = (len(merged), job_index[id(job)])
+                    merged.append(chunk)
+                elif chunk["certainty"] > merged[previous[0]]["certainty"]:
+                    merged[previous[0]] = chunk
+        if pending and min_certainty is not None:
+            confident = sum(1 for c in merged if c["certainty"] >= min_certainty)
+            if confident >= enough:
+                break
+    for future, job in pending.items():
+        future.cancel()
+        job["skipped"] = True
+    return sorted(merged, key=lambda c: -c["certainty"])
+
+
 # ---------------------------------------------------------------------------
 # Reranking
 # ---------------------------------------------------------------------------
 
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_CHUNK_KEY_RE = re.compile(r"^(.+)__chunk-([0-9a-f]+)\.\w+$")
+# Byte translation for _tokenize_bytes: [a-z0-9] stay, everything else,
+# including every byte of a multi-byte UTF-8 character, separates tokens
+_TOKEN_BYTES = bytes(b if 48 <= b <= 57 or 97 <= b <= 122 else 32 for b in range(256))
+
+
 def _tokenize(text):
     """Simple whitespace + punctuation tokenizer
 
@@ -167,7 +372,19 @@ def _tokenize(text):
     Returns:
         list[str]: Lowercased tokens
     """
-    return re.findall(r"[a-z0-9]+", text.lower())
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _tokenize_bytes(text):
+    """The tokens of _tokenize as ASCII bytes, about twice as fast
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        list[bytes]: Lowercased tokens
+    """
+    return text.lower().encode("utf-8", "replace").translate(_TOKEN_BYTES).split()
 
 
 def _idf_scores(docs):
@@ -184,9 +401,7 @@ def _idf_scores(docs):
         return {}
     df = Counter()
     for doc in docs:
-        tokens = set(_tokenize(doc))
-        for t in tokens:
-            df[t] += 1
+        df.update(set(_tokenize(doc)))
     return {t: math.log((n + 1) / (count + 1)) + 1 for t, count in df.items()}
 
 
@@ -202,16 +417,75 @@ def _keyword_overlap_score(query_tokens, doc_text, idf):
         float: Overlap score
     """
     doc_tokens = Counter(_tokenize(doc_text))
-    if not doc_tokens:
-        return 0.0
+    total = sum(doc_tokens.values())
     score = 0.0
     for qt in query_tokens:
         if qt in doc_tokens:
-            tf = doc_tokens[qt] / sum(doc_tokens.values())
-            score += tf * idf.get(qt, 1.0)
+            score += doc_tokens[qt] / total * idf.get(qt, 1.0)
     return score
 
 
+class _TermMatrix:
+    """Retrieved chunks tokenized once, as sparse chunk x query-term counts
+
+    Keyword scoring only reads the columns of the query's terms, so only
+    those are counted. keyword_scores() gives every chunk the same score as
+    _keyword_overlap_score, computed with one matrix-vector product when
+    NumPy is installed. Chunk token sets for duplicate checks are built on
+    demand from the same tokenization.
+
+    Args:
+        texts (list[str]): Chunk texts
+        query_tokens (list[str]): Tokenized query
+    """
+
+    def __init__(self, texts, query_tokens):
+        self.query_tokens = [t.encode("ascii") for t in query_tokens]
+        terms = set(self.query_tokens)
+        self.tokens = [_tokenize_bytes(text) for text in texts]
+        self.lengths = [len(tokens) for tokens in self.tokens]
+        self.rows = [Counter(filter(terms.__contains__, tokens)) for tokens in self.tokens]
+        self._token_sets = {}
+
+    def keyword_scores(self):
+        """TF-IDF keyword overlap of every chunk with the query
+
+        The sum over query tokens (repeats included) of the token's
+        frequency in the chunk times its IDF across the chunks.
+
+        Returns:
+            list[float] or numpy.ndarray: One score per chunk
+        """
+        n = len(self.rows)
+        weights = Counter(self.query_tokens)
+        df = Counter()
+        for row in self.rows:
+            df.update(row.keys())
+        terms = [t for t in weights if df[t]]
+        if np is None or not terms:
+            idf = {t: math.log((n + 1) / (df[t] + 1)) + 1 for t in terms}
+            scores = []
+            for row, total in zip(self.rows, self.lengths):
+                score = 0.0
+                for qt in self.query_tokens:
+                    if qt in row:
+                        score += row[qt] / total * idf[qt]
+                scores.append(score)
+            return scores
+
+        counts = np.array([[row.get(t, 0) for t in terms] for row in self.rows], dtype=np.float64)
+        lengths = np.maximum(np.array(self.lengths, dtype=np.float64), 1.0)
+        idf = np.log((n + 1) / (np.array([df[t] for t in terms], dtype=np.float64) + 1)) + 1
+        return (counts / lengths[:, None]) @ (idf * np.array([weights[t] for t in terms]))
+
+    def token_set(self, i):
+        """Distinct tokens of chunk i"""
+        token_set = self._token_sets.get(i)
+        if token_set is None:
+            token_set = self._token_sets[i] = set(self.tokens[i])
+        return token_set
+
+
 def _priority_score(source, priority_prefixes):
     """Score a source filename by priority prefix match (lower = better)
 
@@ -228,73 +502,222 @@ def _priority_score(source, priority_prefixes):
     return len(priority_prefixes)
 
 
-def _is_adjacent_duplicate(a, b):
+def _is_adjacent_duplicate(a, b, tokens_a=None, tokens_b=None):
     """Check if two chunks are near-identical adjacent chunks from same source
 
     Args:
         a (dict): First chunk
         b (dict): Second chunk
+        tokens_a (set or None): a's distinct tokens, if already known
+        tokens_b (set or None): b's distinct tokens, if already known
 
     Returns:
         bool: True if they should be deduplicated
     """
     if a["source"] != b["source"]:
         return False
-    # Check for __chunk- pattern
-    pat = re.compile(r"^(.+)__chunk-(\d+)\.\w+$")
-    ma = pat.match(a["source"])
-    mb = pat.match(b["source"])
-    if ma and mb and ma.group(1) == mb.group(1):
-        if abs(int(ma.group(2)) - int(mb.group(2))) <= 1:
-            # Check content similarity via token overlap
-            ta = set(_tokenize(a["content"]))
-            tb = set(_tokenize(b["content"]))
-            if ta and tb:
-                overlap = len(ta & tb) / min(len(ta), len(tb))
-                return overlap > 0.8
+    # Check for __chunk- pattern (numbered or content-addressed chunk ids).
+    # Both chunks share a source, so one match covers both.
+    m = _CHUNK_KEY_RE.match(a["source"])
+    if m:
+        # Check content similarity via token overlap
+        ta = tokens_a if tokens_a is not None else set(_tokenize(a["content"]))
+        tb = tokens_b if tokens_b is not None else set(_tokenize(b["content"]))
+        if ta and tb:
+            overlap = len(ta & tb) / min(len(ta), len(tb))
+            return overlap > 0.8
     return False
 
 
-def rerank(query, chunks, num_final, priority_prefixes):
+# Near-duplicate detection across sources: one-permutation MinHash over
+# word 3-gram shingles, split into LSH bands so a chunk is only compared
+# with kept chunks that share a band
+NEAR_DUPLICATE_THRESHOLD = 0.8
+_SHINGLE_SIZE = 3
+_MINHASH_BINS = 64
+_LSH_BAND_SIZE = 4
+_EMPTY_BIN = 1 << 32
+
+
+def _estimate_tokens(text):
+    """Approximate LLM token count (about 4 characters per token)
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        int: Token estimate (at least 1)
+    """
+    return max(1, (len(text) + 3) // 4)
+
+
+def _shingle_hashes(tokens):
+    """CRC32 of each distinct word 3-gram (of each token, for shorter texts)
+
+    Args:
+        tokens (list[bytes]): Tokens from _tokenize_bytes
+
+    Returns:
+        set[int]: Shingle hashes
+    """
+    if len(tokens) < _SHINGLE_SIZE:
+        shingles = tokens
+    else:
+        shingles = map(b" ".join, zip(*(tokens[i:] for i in range(_SHINGLE_SIZE))))
+    return set(map(zlib.crc32, shingles))
+
+
+def _minhash(hashes):
+    """One-permutation MinHash: the smallest hash that falls in each bin
+
+    Args:
+        hashes (set[int]): Shingle hashes
+
+    Returns:
+        list[int]: _MINHASH_BINS values, _EMPTY_BIN where no hash fell
+    """
+    signature = [_EMPTY_BIN] * _MINHASH_BINS
+    for h in hashes:
+        i = h % _MINHASH_BINS
+        if h < signature[i]:
+            signature[i] = h
+    return signature
+
+
+class _NearDuplicateIndex:
+    """LSH index of kept chunks for Jaccard near-duplicate lookups
+
+    Each kept chunk's MinHash signature is split into bands of
+    _LSH_BAND_SIZE bins and filed under every band. A candidate is only
+    compared with chunks sharing at least one band, and a match is
+    confirmed with the exact Jaccard similarity of the shingle sets, so
+    checking n candidates takes roughly linear time. At the default
+    threshold of 0.8, a true duplicate shares a band with probability
+    above 0.999.
+
+    Args:
+        threshold (float): Minimum Jaccard similarity of a duplicate
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._bands = {}
+        self._shingles = []
+
+    def _band_keys(self, hashes):
+        signature = _minhash(hashes)
+        empty = (_EMPTY_BIN,) * _LSH_BAND_SIZE
+        keys = []
+        for start in range(0, _MINHASH_BINS, _LSH_BAND_SIZE):
+            band = tuple(signature[start:start + _LSH_BAND_SIZE])
+            # Bands with no hashes at all say nothing about similarity
+            if band != empty:
+                keys.append((start, band))
+        return keys
+
+    def check_and_add(self, hashes):
+        """Return True if hashes duplicate a kept chunk, else keep them
+
+        Args:
+            hashes (set[int]): Shingle hashes of the candidate chunk
+
+        Returns:
+            bool: True if the candidate is a near-duplicate
+        """
+        if not hashes:
+            return False
+        keys = self._band_keys(hashes)
+        compared = set()
+        for key in keys:
+            for j in self._bands.get(key, ()):
+                if j in compared:
+                    continue
+                compared.add(j)
+                other = self._shingles[j]
+                common = len(hashes & other)
+                if common >= self.threshold * (len(hashes) + len(other) - common):
+                    return True
+        index = len(self._shingles)
+        self._shingles.append(hashes)
+        for key in keys:
+            self._bands.setdefault(key, []).append(index)
+        return False
+
+
+def rerank(query, chunks, num_final, priority_prefixes,
+           near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD, stats=None):
     """Rerank retrieved chunks using keyword overlap, priority, and dedup
 
+    Each chunk is tokenized once; keyword scores for all chunks come from
+    one pass over the term matrix (see _TermMatrix). Duplicates are
+    dropped in two ways. Adjacent chunks of the same source are compared
+    by token overlap. Chunks from any source are compared through a
+    MinHash LSH index (see _NearDuplicateIndex), which catches the same
+    text copied into different files.
+
     Args:
         query (str): Original query
         chunks (list[dict]): Retrieved chunks with content/source/certainty
         num_final (int): Number of results to return after reranking
         priority_prefixes (list[str]): Priority source prefixes
+        near_duplicate_threshold (float or None): Jaccard similarity of
+            word 3-grams above which chunks from different sources count
+            as duplicates; None turns cross-source dedup off
+        stats (dict or None): Filled with "duplicates_removed" and
+            "tokens_saved", the estimated context tokens those duplicates
+            would have taken
 
     Returns:
         list[dict]: Top-N reranked chunks
     """
+    if stats is not None:
+        stats.update(duplicates_removed=0, tokens_saved=0)
     if not chunks:
         return []
 
-    query_tokens = _tokenize(query)
-    doc_texts = [c["content"] for c in chunks]
-    idf = _idf_scores(doc_texts)
+    matrix = _TermMatrix([c["content"] for c in chunks], _tokenize(query))
+    kw_scores = matrix.keyword_scores()
 
-    scored = []
+    priority_bonus = {}
     for c in chunks:
-        kw_score = _keyword_overlap_score(query_tokens, c["content"], idf)
-        pri = _priority_score(c["source"], priority_prefixes)
-        # Combined score: certainty (0-1) + keyword overlap + priority bonus
-        combined = c["certainty"] * 2.0 + kw_score * 1.0 + (1.0 / (pri + 1)) * 0.3
-        scored.append((combined, c))
-
-    # Sort descending by combined score
-    scored.sort(key=lambda x: -x[0])
-
-    # Deduplicate adjacent chunks
+        if c["source"] not in priority_bonus:
+            pri = _priority_score(c["source"], priority_prefixes)
+            priority_bonus[c["source"]] = (1.0 / (pri + 1)) * 0.3
+
+    # Combined score: certainty (0-1) + keyword overlap + priority bonus
+    if np is not None:
+        combined = (
+            np.array([c["certainty"] for c in chunks], dtype=np.float64) * 2.0
+            + np.asarray(kw_scores, dtype=np.float64) * 1.0
+            + np.array([priority_bonus[c["source"]] for c in chunks])
+        )
+        order = np.argsort(-combined, kind="stable").tolist()
+    else:
+        combined = [
+            c["certainty"] * 2.0 + kw * 1.0 + priority_bonus[c["source"]]
+            for c, kw in zip(chunks, kw_scores)
+        ]
+        order = sorted(range(len(chunks)), key=lambda i: -combined[i])
+
+    # Deduplicate adjacent chunks, then near-duplicates from any source
+    near_duplicates = None
+    if near_duplicate_threshold is not None:
+        near_duplicates = _NearDuplicateIndex(near_duplicate_threshold)
     result = []
-    for _, chunk in scored:
-        is_dup = False
-        for existing in result:
-            if _is_adjacent_duplicate(chunk, existing):
-                is_dup = True
-                break
-        if not is_dup:
-            result.append(chunk)
+    kept_by_source = {}
+    for i in order:
+        chunk = chunks[i]
+        kept = kept_by_source.setdefault(chunk["source"], [])
+        if any(_is_adjacent_duplicate(chunk, chunks[j], matrix.token_set(i), matrix.token_set(j))
+               for j in kept) or (
+                near_duplicates is not None
+                and near_duplicates.check_and_add(_shingle_hashes(matrix.tokens[i]))):
+            if stats is not None:
+                stats["duplicates_removed"] += 1
+                stats["tokens_saved"] += _estimate_tokens(chunk["content"])
+            continue
+        kept.append(i)
+        result.append(chunk)
         if len(result) >= num_final:
             break
 
@@ -311,22 +734,172 @@ SYSTEM_PROMPT = (
 )
 
 
+# Context packing: tokens of retrieved context placed in the prompt
+DEFAULT_CONTEXT_BUDGET = 6000
+# No single chunk may take more than this share of the budget untrimmed
+_MAX_CHUNK_SHARE = 0.5
+# Stop packing once less than this much budget is left
+_MIN_PACK_TOKENS = 32
+_SENTENCE_RE = re.compile(r"[^\s.!?][^\n.!?]*[.!?]*")
+_CONTEXT_HEADER = "[%d] Source: %s\n"
+_CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+
+def context_budget(config, model):
+    """Context token budget for a model
+
+    Args:
+        config (dict): Configuration ("context_budgets" per model, falling
+            back to "context_budget")
+        model (str): LLM model name
+
+    Returns:
+        int or None: Token budget, or None to pass ask_num_docs chunks whole
+    """
+    budgets = config.get("context_budgets") or {}
+    if model in budgets:
+        return budgets[model]
+    return config.get("context_budget", DEFAULT_CONTEXT_BUDGET)
+
+
+def _document_key(source):
+    """Source file of a chunk key ("notes__chunk-3f2a9c01.md" -> "notes.md")"""
+    m = _CHUNK_KEY_RE.match(source)
+    if not m:
+        return source
+    return m.group(1) + source[m.end(2):]
+
+
+def _trim_to_relevant(text, query_terms, max_tokens):
+    """Keep the sentences of text that mention the query, within max_tokens
+
+    Sentences are ranked by how many distinct query terms they contain
+    (earlier sentences first on ties) and taken while they fit, then put
+    back in their original order. Gaps between kept sentences are marked
+    with "...".
+
+    Args:
+        text (str): Chunk content
+        query_terms (set[str]): Distinct query tokens
+        max_tokens (int): Token limit for the trimmed text
+
+    Returns:
+        str: Trimmed text, empty if no sentence mentions the query or fits
+    """
+    sentences = []
+    for m in _SENTENCE_RE.finditer(text):
+        score = len(query_terms.intersection(_tokenize(m.group())))
+        if score:
+            sentences.append((-score, m.start(), m.end()))
+    sentences.sort()
+
+    kept = []
+    used = 0
+    for _, start, end in sentences:
+        cost = _estimate_tokens(text[start:end]) + 1
+        if used + cost <= max_tokens:
+            kept.append((start, end))
+            used += cost
+    kept.sort()
+
+    parts = []
+    prev_end = None
+    for start, end in kept:
+        if prev_end is not None and not text[prev_end:start].strip():
+            parts.append(text[prev_end:end])
+        else:
+            if parts:
+                parts.append(" ... ")
+            parts.append(text[start:end])
+        prev_end = end
+    return "".join(parts)
+
+
+def pack_context(query, chunks, budget, max_chunks=None, stats=None):
+    """Fill a token budget with reranked chunks, best first
+
+    Chunks that fit are taken whole. A chunk that doesn't fit the remaining
+    budget, or would take more than half of the whole budget, is trimmed
+    to its query-relevant sentences (see _trim_to_relevant), and skipped if
+    none fit. Each chunk stays its own block, labelled with its source
+    file: chunk keys carry no position in the file, so chunks of one file
+    can't be put back in document order, and merging them in rank order
+    would splice unrelated passages together. Token counts are estimates
+    (about 4 characters per token).
+
+    Args:
+        query (str): User question
+        chunks (list[dict]): Reranked chunks, best first
+        budget (int): Token budget for the context block
+        max_chunks (int or None): Pack at most this many chunks
+        stats (dict or None): Filled with "tokens_used", "token_budget",
+            "chunks_packed" and "chunks_trimmed"
+
+    Returns:
+        list[dict]: Blocks with source (the chunk's file), content,
+            certainty and chunk (the chunk key), for build_prompt
+    """
+    query_terms = set(_tokenize(query))
+    chunk_cap = max(_MIN_PACK_TOKENS, int(budget * _MAX_CHUNK_SHARE))
+    blocks = []
+    used = 0
+    packed = 0
+    trimmed = 0
+
+    for c in chunks:
+        remaining = budget - used
+        if remaining < _MIN_PACK_TOKENS or (max_chunks is not None and packed >= max_chunks):
+            break
+        document = _document_key(c.get("source", "unknown"))
+        overhead = _estimate_tokens(
+            _CONTEXT_HEADER % (len(blocks) + 1, document)
+            + (_CONTEXT_SEPARATOR if blocks else ""))
+        limit = min(remaining, chunk_cap + overhead) - overhead
+
+        content = c["content"]
+        cost = _estimate_tokens(content)
+        if cost > limit:
+            content = _trim_to_relevant(content, query_terms, limit)
+            if not content:
+                continue
+            cost = _estimate_tokens(content)
+            trimmed += 1
+
+        blocks.append({
+            "source": document, "content": content,
+            "certainty": c.get("certainty", 0), "chunk": c.get("source", "unknown"),
+        })
+        used += overhead + cost
+        packed += 1
+
+    if stats is not None:
+        stats.update(
+            tokens_used=_estimate_tokens(_format_context(blocks)) if blocks else 0,
+            token_budget=budget, chunks_packed=packed, chunks_trimmed=trimmed,
+        )
+    return blocks
+
+
+def _format_context(chunks):
+    """Join chunks into the numbered context block of the prompt"""
+    return _CONTEXT_SEPARATOR.join(
+        _CONTEXT_HEADER % (i, c.get("source", "unknown")) + c["content"]
+        for i, c in enumerate(chunks, 1)
+    )
+
+
 def build_prompt(query, chunks):
     """Build the prompt with context chunks for the LLM
 
     Args:
         query (str): User question
-        chunks (list[dict]): Retrieved and reranked chunks
+        chunks (list[dict]): Retrieved and reranked chunks, or blocks from
+            pack_context
 
     Returns:
         list[dict]: Messages list for chat completions API
     """
-    context_parts = []
-    for i, c in enumerate(chunks, 1):
-        source = c.get("source", "unknown")
-        context_parts.append("[%d] Source: %s\n%s" % (i, source, c["content"]))
-
-    context_block = "\n\n---\n\n".join(context_parts)
+    context_block = _format_context(chunks)
 
     messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
@@ -340,42 +913,132 @@ def build_prompt(query, chunks):
     return messages
 
 
-def call_llm(messages, model, api_key, timeout=60, max_retries=2):
+class _StreamError(RuntimeError):
+    """A streamed response failed after it started"""
+
+
+def _iter_sse_data(resp):
+    """Yield the data payload of each server-sent event in a response
+
+    Lines are read as they arrive, so each event is yielded as soon as its
+    terminating blank line is received. Comment lines and fields other than
+    ``data`` are ignored; multi-line data is joined with newlines.
+
+    Args:
+        resp: File-like HTTP response streaming ``text/event-stream``
+
+    Yields:
+        str: Event data
+    """
+    data = []
+    for raw in resp:
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+            continue
+        if line.startswith("data:"):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(" ") else value)
+    if data:
+        yield "\n".join(data)
+
+
+def _read_stream(resp, on_token, started, stats):
+    """Assemble a streamed chat completion, passing each delta to on_token
+
+    Args:
+        resp: Streaming HTTP response
+        on_token (callable): Called with each piece of answer text
+        started (float): perf_counter() when the request was sent
+        stats (dict): Receives "time_to_first_token_ms"
+
+    Returns:
+        str: Full answer text
+    """
+    parts = []
+    for data in _iter_sse_data(resp):
+        if data == "[DONE]":
+            break
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        if event.get("error"):
+            raise _StreamError("LLM stream error: %s" % event["error"])
+        for choice in event.get("choices") or []:
+            text = (choice.get("delta") or {}).get("content")
+            if not text:
+                continue
+            if not parts:
+                stats["time_to_first_token_ms"] = round(
+                    (time.perf_counter() - started) * 1000, 1)
+            parts.append(text)
+            on_token(text)
+    return "".join(parts)
+
+
+def call_llm(messages, model, api_key, timeout=60, max_retries=2, on_token=None,
+             stats=None):
     """Call Telnyx inference API for chat completion
 
     Args:
         messages (list[dict]): Chat messages
         model (str): Model identifier
         api_key (str): Telnyx API key
-        timeout (int): Request timeout
+        timeout (int): Request timeout (per read when streaming)
         max_retries (int): Max retries
+        on_token (callable or None): Stream the response as server-sent
+            events, calling this with each piece of text as it arrives
+        stats (dict or None): Receives "generation_ms" and, when streaming,
+            "time_to_first_token_ms"
 
     Returns:
         str: Generated answer text
     """
     url = "https://api.telnyx.com/v2/ai/chat/completions"
-    payload = json.dumps({
+    body = {
         "model": model,
         "messages": messages,
         "max_tokens": 2048,
         "temperature": 0.3,
-    }).encode()
+    }
+    if on_token is not None:
+        body["stream"] = True
+    payload = json.dumps(body).encode()
 
     headers = {
         "Authorization": "Bearer " + api_key,
         "Content-Type": "application/json",
         "User-Agent": "openclaw-telnyx-rag/2.0",
     }
+    if on_token is not None:
+        headers["Accept"] = "text/event-stream"
+    if stats is None:
+        stats = {}
 
     for attempt in range(max_retries):
         req = urllib.request.Request(url, data=payload, headers=headers, method="POST")
+        started = time.perf_counter()
+        emitted = []
+
+        def emit(text):
+            emitted.append(text)
+            on_token(text)
+
         try:
             with urllib.request.urlopen(req, timeout=timeout) as resp:
-                data = json.loads(resp.read().decode())
-                choices = data.get("choices", [])
-                if choices:
-                    return choices[0].get("message", {}).get("content", "")
-                return "(No response generated)"
+                if on_token is not None:
+                    answer = _read_stream(resp, emit, started, stats) or None
+                else:
+                    data = json.loads(resp.read().decode())
+                    choices = data.get("choices", [])
+                    answer = choices[0].get("message", {}).get("content", "") if choices else None
+            stats["generation_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return "(No response generated)" if answer is None else answer
+        except _StreamError:
+            raise
         except urllib.error.HTTPError as e:
             body = e.read().decode("utf-8", errors="ignore")
             if e.code in (401, 403):
@@ -384,7 +1047,11 @@ def call_llm(messages, model, api_key, timeout=60, max_retries=2):
                 time.sleep(2 ** attempt)
                 continue
             raise RuntimeError("LLM API error (HTTP %d): %s" % (e.code, body))
-        except (urllib.error.URLError, OSError) as e:
+        except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+            # Text already shown to the caller cannot be taken back, so a
+            # stream that broke midway is not retried
+            if emitted:
+                raise RuntimeError("LLM stream interrupted: %s" % e)
             if attempt < max_retries - 1:
                 time.sleep(2 ** attempt)
                 continue
@@ -397,22 +1064,63 @@ def call_llm(messages, model, api_key, timeout=60, max_retries=2):
 # Main pipeline
 # ---------------------------------------------------------------------------
 
+def _stage_ms(started):
+    """Milliseconds since a perf_counter() reading"""
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
 def ask(query, config=None, num_final=None, model=None, bucket=None,
-        show_context=False, output_json=False):
+        show_context=False, output_json=False, local_index=None, use_cache=True,
+        budget=None, stream=False, rewrites=None):
     """Full RAG pipeline: retrieve -> rerank -> generate
 
+    Runs ask_async(), which takes the same arguments, on a new event loop;
+    async callers should await ask_async() directly.
+
+    Returns:
+        str: Answer text or JSON string
+    """
+    return asyncio.run(ask_async(
+        query, config, num_final, model, bucket, show_context, output_json,
+        local_index, use_cache, budget, stream, rewrites))
+
+
+async def ask_async(query, config=None, num_final=None, model=None, bucket=None,
+                    show_context=False, output_json=False, local_index=None,
+                    use_cache=True, budget=None, stream=False, rewrites=None):
+    """Full RAG pipeline: retrieve -> rerank -> generate
+
+    Retrieval runs for every bucket and query rewrite at once. Generation
+    starts as soon as enough chunks at or above the config's
+    "speculative_certainty" have arrived, without waiting for the rest.
+
     Args:
         query (str): User question
         config (dict): Configuration (loaded if None)
-        num_final (int): Final number of chunks to use
+        num_final (int): Final number of chunks to use (with a context
+            budget, the most chunks packed; default: as many as fit)
         model (str): Override LLM model name
-        bucket (str): Override bucket name
+        bucket (str or list): Override bucket name, or several buckets to
+            retrieve from (entries may be "name:weight")
         show_context (bool): Include retrieved chunks in output
         output_json (bool): Return structured JSON
+        local_index (str or None): Retrieve from this local index directory,
+            falling back to the API on a miss (default: config "local_index")
+        use_cache (bool): Serve repeated retrievals from the shared query
+            cache (see query_cache.py)
+        budget (int or None): Context token budget (default: from config,
+            see context_budget)
+        stream (bool): Print the answer as it is generated (to stderr with
+            output_json, so stdout stays valid JSON); the returned text then
+            starts after the answer
+        rewrites (list[str] or None): Alternative phrasings of the query,
+            retrieved alongside it (reranking still uses the query)
 
     Returns:
         str: Answer text or JSON string
     """
+    started = time.perf_counter()
+    latency = {}
     if config is None:
         config = load_config()
 
@@ -423,17 +1131,56 @@ def ask(query, config=None, num_final=None, model=None, bucket=None,
             return json.dumps({"error": err})
         return "ERROR: " + err
 
-    bucket = bucket or config.get("bucket", "openclaw-memory")
+    default_bucket = config.get("bucket", "openclaw-memory")
+    if isinstance(bucket, str):
+        bucket = [bucket]
+    bucket_specs = bucket or config.get("ask_buckets") or [default_bucket]
+    weights = dict(config.get("bucket_weights") or {})
+    buckets = []
+    for spec in bucket_specs:
+        try:
+            name, weight = parse_bucket_spec(spec)
+        except ValueError:
+            err = "Invalid bucket weight: %s" % spec
+            if output_json:
+                return json.dumps({"error": err})
+            return "ERROR: " + err
+        if weight is not None:
+            weights[name] = weight
+        if name not in buckets:
+            buckets.append(name)
     model = model or config.get("ask_model", "meta-llama/Meta-Llama-3.1-70B-Instruct")
     retrieve_n = config.get("retrieve_num_docs", 20)
     final_n = num_final or config.get("ask_num_docs", 8)
+    budget = budget or context_budget(config, model)
     priority_prefixes = config.get("priority_prefixes", [])
-
-    # Step 1: Retrieve
+    local_index = local_index or config.get("local_index")
+    latency["setup"] = _stage_ms(started)
+
+    # Step 1: Retrieve every bucket x query at once (the local index, when
+    # configured, stands in for the default bucket)
+    cache = open_query_cache(config) if use_cache else None
+
+    def fetch(job):
+        if local_index and job["bucket"] == default_bucket:
+            chunks = retrieve_local(job["query"], retrieve_n, local_index)
+            if chunks is not None:
+                return chunks
+        return retrieve_chunks(job["query"], retrieve_n, job["bucket"], api_key, cache=cache)
+
+    queries = list(dict.fromkeys([query] + list(rewrites or [])))
+    jobs = [{"bucket": b, "query": q, "weight": weights.get(b, 1.0)}
+            for b in buckets for q in queries]
+    stage = time.perf_counter()
     try:
-        raw_chunks = retrieve_chunks(query, retrieve_n, bucket, api_key)
-    except RuntimeError as e:
-        err = "Retrieval failed: %s" % e
+        raw_chunks = await gather_speculative(
+            jobs, fetch, final_n, config.get("speculative_certainty"))
+    finally:
+        if cache is not None:
+            cache.close()
+    latency["retrieve"] = _stage_ms(stage)
+    if all("error" in job for job in jobs):
+        err = "Retrieval failed: %s" % "; ".join(job["error"] for job in jobs)
         if output_json:
             return json.dumps({"error": err})
         return "ERROR: " + err
@@ -444,18 +1191,46 @@ def ask(query, config=None, num_final=None, model=None, bucket=None,
             return json.dumps({"answer": msg, "sources": [], "chunks_used": 0})
         return msg
 
-    # Step 2: Rerank
-    ranked = rerank(query, raw_chunks, final_n, priority_prefixes)
-
-    # Step 3: Build prompt & call LLM
+    # Step 2: Rerank (every chunk when packing to a budget, which decides
+    # how many fit)
+    stage = time.perf_counter()
+    dedup = {}
+    ranked = rerank(query, raw_chunks, len(raw_chunks) if budget else final_n,
+                    priority_prefixes,
+                    config.get("near_duplicate_threshold", NEAR_DUPLICATE_THRESHOLD), dedup)
+    latency["rerank"] = _stage_ms(stage)
+
+    # Step 3: Pack context, build prompt & call LLM
+    stage = time.perf_counter()
+    packing = {}
+    if budget:
+        ranked = pack_context(query, ranked, budget, num_final, packing)
     messages = build_prompt(query, ranked)
+    latency["prompt"] = _stage_ms(stage)
+    timing = {}
+    on_token = None
+    if stream:
+        out = sys.stderr if output_json else sys.stdout
+
+        def on_token(text):
+            out.write(text)
+            out.flush()
+
+    loop = asyncio.get_running_loop()
     try:
-        answer = call_llm(messages, model, api_key)
+        answer = await _run_in_thread(loop, call_llm, messages, model, api_key,
+                                      60, 2, on_token, timing)
     except RuntimeError as e:
         err = "LLM generation failed: %s" % e
+        if "time_to_first_token_ms" in timing:
+            on_token("\n")
         if output_json:
             return json.dumps({"error": err})
         return "ERROR: " + err
+    latency["generate"] = timing["generation_ms"]
+    if "time_to_first_token_ms" in timing:
+        latency["first_token"] = timing["time_to_first_token_ms"]
+    latency["total"] = _stage_ms(started)
 
     # Collect sources
     sources = list(dict.fromkeys(c["source"] for c in ranked))  # unique, ordered
@@ -465,9 +1240,19 @@ def ask(query, config=None, num_final=None, model=None, bucket=None,
             "answer": answer,
             "model": model,
             "sources": sources,
-            "chunks_used": len(ranked),
+            "chunks_used": packing.get("chunks_packed", len(ranked)),
             "chunks_retrieved": len(raw_chunks),
+            "duplicates_removed": dedup["duplicates_removed"],
+            "tokens_saved": dedup["tokens_saved"],
         }
+        result.update(timing)
+        result["latency_ms"] = latency
+        if len(jobs) > 1:
+            result["retrievals"] = jobs
+        if packing:
+            result["context_tokens"] = packing["tokens_used"]
+            result["context_budget"] = packing["token_budget"]
+            result["chunks_trimmed"] = packing["chunks_trimmed"]
         if show_context:
             result["context"] = [
                 {"source": c["source"], "certainty": c["certainty"],
@@ -478,7 +1263,11 @@ def ask(query, config=None, num_final=None, model=None, bucket=None,
 
     # Text output
     lines = []
-    lines.append(answer)
+    if stream:
+        # Nothing was streamed when the model returned no text
+        on_token("\n" if "time_to_first_token_ms" in timing else answer + "\n")
+    else:
+        lines.append(answer)
     lines.append("")
     lines.append("📚 Sources: " + ", ".join(sources))
 
@@ -486,6 +1275,21 @@ def ask(query, config=None, num_final=None, model=None, bucket=None,
         lines.append("")
         lines.append("=" * 60)
         lines.append("Retrieved Context Chunks (%d):" % len(ranked))
+        if packing:
+            lines.append("Context: ~%d of %d tokens (%d chunks, %d trimmed)" % (
+                packing["tokens_used"], packing["token_budget"],
+                packing["chunks_packed"], packing["chunks_trimmed"]))
+        if "time_to_first_token_ms" in timing:
+            lines.append("Generation: first token after %.0f ms, done after %.0f ms" % (
+                timing["time_to_first_token_ms"], timing["generation_ms"]))
+        lines.append("Latency: " + ", ".join("%s %.0f ms" % kv for kv in latency.items()))
+        skipped = sum(1 for job in jobs if job.get("skipped"))
+        if skipped:
+            lines.append("Started generating before %d of %d retrievals finished" % (
+                skipped, len(jobs)))
+        if dedup["duplicates_removed"]:
+            lines.append("Skipped %d duplicate chunks (~%d tokens)" % (
+                dedup["duplicates_removed"], dedup["tokens_saved"]))
         lines.append("=" * 60)
         for i, c in enumerate(ranked, 1):
             lines.append("")
@@ -509,11 +1313,21 @@ def main():
     )
     parser.add_argument(
         "--num", "-n", type=int, default=None,
-        help="Number of context chunks to use (default: from config.json)"
+        help="Number of context chunks to use (default: from config.json; with a "
+             "context budget, as many as fit)"
+    )
+    parser.add_argument(
+        "--budget", type=int, default=None,
+        help="Context token budget (default: config context_budgets/context_budget)"
     )
     parser.add_argument(
-        "--bucket", "-b", default=None,
-        help="Override bucket name"
+        "--bucket", "-b", action="append", default=None, metavar="NAME[:WEIGHT]",
+        help="Override bucket name; repeat to retrieve from several buckets at once "
+             "(default: config ask_buckets, else bucket)"
+    )
+    parser.add_argument(
+        "--rewrite", "-r", action="append", default=None, metavar="QUERY",
+        help="Alternative phrasing to retrieve with alongside the question; repeatable"
     )
     parser.add_argument(
         "--context", "-c", action="store_true",
@@ -523,6 +1337,19 @@ def main():
         "--json", "-j", dest="output_json", action="store_true",
         help="Output structured JSON"
     )
+    parser.add_argument(
+        "--local", nargs="?", const=DEFAULT_LOCAL_INDEX, default=None, metavar="DIR",
+        help="Retrieve from a local index built by tools/embeddings/local_index.py "
+             "(default: tools/embeddings/.local-index), falling back to the API on a miss"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Bypass the query result cache and always call the similarity search API"
+    )
+    parser.add_argument(
+        "--stream", "-s", action="store_true",
+        help="Print the answer as it is generated (to stderr with --json)"
+    )
 
     args = parser.parse_args()
 
@@ -542,6 +1369,11 @@ def main():
         bucket=args.bucket,
         show_context=args.context,
         output_json=args.output_json,
+        local_index=args.local,
+        use_cache=not args.no_cache,
+        budget=args.budget,
+        stream=args.stream,
+        rewrites=args.rewrite,
     )
 
     print(result)
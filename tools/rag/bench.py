@@ -0,0 +1,602 @@
+#!/usr/bin/env python3
+"""
+Telnyx RAG Memory - Offline Benchmarks
+
+Microbenchmarks for the hot paths of sync.py and ask.py. Everything runs
+locally against synthetic data; no API key or network access is needed.
+
+Usage:
+  ./bench.py signing                 # SigV4 signing throughput, before vs after
+  ./bench.py signing --requests 50000
+  ./bench.py chunking --files 200 --workers 4   # Serial vs process-pool chunking
+  ./bench.py slack-recall --threads 300         # Recall@k, thread-aware vs arrival packing
+  ./bench.py tokenizer --files 300              # BPE token counting share of sync time
+  ./bench.py rerank --chunks 20 200 2000        # ask.py rerank, before vs after
+"""
+
+import os
+import sys
+import hashlib
+import hmac
+import datetime
+import time
+import argparse
+import threading
+import json
+import math
+import random
+import re
+import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import sync  # noqa: E402
+import ask  # noqa: E402
+
+
+def _timed(fn, iterations):
+    """Run fn() iterations times and return (elapsed_seconds, last_result)
+
+    Args:
+        fn (callable): Zero-argument function to time
+        iterations (int): Number of calls
+
+    Returns:
+        tuple[float, object]: Elapsed wall time and the last return value
+    """
+    result = None
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = fn()
+    return time.perf_counter() - start, result
+
+
+def _report(label, iterations, elapsed, unit="req"):
+    """Print a single throughput line"""
+    rate = iterations / elapsed if elapsed > 0 else float("inf")
+    print("  %-28s %10.0f %s/s  (%.3fs for %d)" % (label, rate, unit, elapsed, iterations))
+    return rate
+
+
+# ---------------------------------------------------------------------------
+# SigV4 signing
+# ---------------------------------------------------------------------------
+
+def _legacy_sign(api_key, secret_key, region, method, path, headers, payload_hash):
+    """Per-request SigV4 signing as TelnyxS3Client did before SigV4Signer
+
+    Re-derives the signing key and rebuilds every string for each call.
+    """
+    def _hmac(key, msg):
+        return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+    amz_date = headers["x-amz-date"]
+    date_stamp = amz_date[:8]
+
+    canonical_headers = "".join("%s:%s\n" % (k, v) for k, v in sorted(headers.items()))
+    signed_headers = ";".join(sorted(headers.keys()))
+    canonical_request = "%s\n%s\n\n%s\n%s\n%s" % (
+        method, path, canonical_headers, signed_headers, payload_hash
+    )
+
+    algorithm = "AWS4-HMAC-SHA256"
+    credential_scope = "%s/%s/s3/aws4_request" % (date_stamp, region)
+    string_to_sign = "%s\n%s\n%s\n%s" % (
+        algorithm,
+        amz_date,
+        credential_scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest(),
+    )
+
+    k_date = _hmac(("AWS4" + secret_key).encode("utf-8"), date_stamp)
+    k_region = _hmac(k_date, region)
+    k_service = _hmac(k_region, "s3")
+    signing_key = _hmac(k_service, "aws4_request")
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    return "%s Credential=%s/%s, SignedHeaders=%s, Signature=%s" % (
+        algorithm, api_key, credential_scope, signed_headers, signature
+    )
+
+
+def bench_signing(args):
+    """Compare legacy per-request signing with the cached SigV4Signer"""
+    api_key, secret_key, region = "KEY0123456789", "placeholder", "us-central-1"
+    payload = b"x" * 2048
+    payload_hash = hashlib.sha256(payload).hexdigest()
+    headers = {
+        "host": "bench-bucket.%s.telnyxcloudstorage.com" % region,
+        "x-amz-content-sha256": payload_hash,
+        "x-amz-date": datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        "content-type": "text/markdown",
+        "content-length": str(len(payload)),
+    }
+    path = "/memory/2024-01-01__chunk-001.md"
+    signer = sync.SigV4Signer(api_key, secret_key, region)
+
+    before = _legacy_sign(api_key, secret_key, region, "PUT", path, headers, payload_hash)
+    after = signer.sign("PUT", path, headers, payload_hash)
+    if before != after:
+        print("ERROR: signatures differ\n  legacy: %s\n  signer: %s" % (before, after),
+              file=sys.stderr)
+        sys.exit(1)
+
+    print("\nSigV4 signing (%d requests, pure CPU):" % args.requests)
+    elapsed, _ = _timed(
+        lambda: _legacy_sign(api_key, secret_key, region, "PUT", path, headers, payload_hash),
+        args.requests,
+    )
+    rate_before = _report("before (per-request key)", args.requests, elapsed)
+    elapsed, _ = _timed(
+        lambda: signer.sign("PUT", path, headers, payload_hash),
+        args.requests,
+    )
+    rate_after = _report("after (SigV4Signer)", args.requests, elapsed)
+    print("  speedup: %.2fx" % (rate_after / rate_before))
+
+
+# ---------------------------------------------------------------------------
+# Chunking
+# ---------------------------------------------------------------------------
+
+def _write_markdown_corpus(root, files, paragraphs, seed=7):
+    """Write synthetic markdown notes and return [(path, key)]"""
+    rng = random.Random(seed)
+    words = ["deploy", "latency", "carrier", "webhook", "number", "porting", "invoice",
+             "retry", "queue", "region", "bucket", "embedding", "customer", "routing"]
+    result = []
+    for i in range(files):
+        lines = ["# Note %d" % i, ""]
+        for p in range(paragraphs):
+            if p % 12 == 0:
+                lines.extend(["## Section %d" % p, ""])
+            lines.append(" ".join(rng.choice(words) for _ in range(rng.randint(30, 90))))
+            lines.append("")
+        path = Path(root) / ("note-%04d.md" % i)
+        path.write_text("\n".join(lines), encoding="utf-8")
+        result.append((path, "memory/%s" % path.name))
+    return result
+
+
+def bench_chunking(args):
+    """Compare serial chunking with the process-pool chunking stage"""
+    root = tempfile.mkdtemp(prefix="rag-bench-")
+    try:
+        files = _write_markdown_corpus(root, args.files, args.paragraphs)
+        jobs = [(path, key, None, args.chunk_size) for path, key in files]
+
+        print("\nChunking %d files (%d paragraphs each, %d-token chunks):" % (
+            args.files, args.paragraphs, args.chunk_size))
+        start = time.perf_counter()
+        serial = [sync._prepare_file(*job) for job in jobs]
+        elapsed = time.perf_counter() - start
+        rate_before = _report("serial", len(jobs), elapsed, "file")
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers) as procs:
+            parallel = list(sync._ordered_map(procs, sync._prepare_file, jobs, args.workers * 4))
+        elapsed = time.perf_counter() - start
+        rate_after = _report("%d processes" % args.workers, len(jobs), elapsed, "file")
+
+        if serial != parallel:
+            print("ERROR: process-pool output differs from serial output", file=sys.stderr)
+            sys.exit(1)
+        chunks = sum(len(r["chunks"]) for r in serial)
+        print("  %d chunks, output identical" % chunks)
+        print("  speedup: %.2fx" % (rate_after / rate_before))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Slack chunking recall
+# ---------------------------------------------------------------------------
+
+_FILLER = ("ok", "thanks", "sounds good", "looking now", "let me check", "same here",
+           "pushed a change", "will do", "checking logs", "any update", "on it", "nice")
+
+
+def _synthetic_slack_export(threads, seed=11):
+    """Build a Slack channel export with interleaved threads
+
+    Each thread's root asks about a few topic words. One reply, posted
+    minutes to hours later and interleaved with other threads and chatter,
+    carries a unique answer word but none of the topic words.
+
+    Returns:
+        tuple[list[dict], list[tuple[list[str], str]]]: Messages sorted by ts,
+            and (query words, answer word) per thread
+    """
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "ze", "po", "qu", "fa"]
+    used = set()
+
+    def _word():
+        while True:
+            w = "".join(rng.choice(syllables) for _ in range(4))
+            if w not in used:
+                used.add(w)
+                return w
+
+    users = ["alice", "bob", "carol", "dan", "erin", "frank"]
+    messages = []
+    queries = []
+    start = 1700000000
+    for i in range(threads):
+        root_ts = start + i * 600 + rng.randint(0, 300)
+        topic = [_word() for _ in range(3)]
+        answer = _word()
+        queries.append((topic, answer))
+        root = "%s.000100" % root_ts
+        messages.append({
+            "ts": root, "thread_ts": root, "user": rng.choice(users),
+            "text": "question about %s %s %s, %s" % (
+                topic[0], topic[1], topic[2], rng.choice(_FILLER)),
+        })
+        replies = rng.randint(2, 6)
+        answer_at = rng.randrange(replies)
+        for r in range(replies):
+            ts = root_ts + rng.randint(120, 6 * 3600)
+            text = rng.choice(_FILLER)
+            if r == answer_at:
+                text = "the fix was %s, %s" % (answer, text)
+            messages.append({
+                "ts": "%d.%06d" % (ts, 200 + r), "thread_ts": root,
+                "user": rng.choice(users), "text": text,
+            })
+        for c in range(rng.randint(0, 2)):
+            ts = root_ts + rng.randint(0, 600)
+            messages.append({
+                "ts": "%d.%06d" % (ts, 900 + c), "user": rng.choice(users),
+                "text": " ".join(rng.choice(_FILLER) for _ in range(rng.randint(2, 8))),
+            })
+    messages.sort(key=lambda m: float(m["ts"]))
+    return messages, queries
+
+
+def _recall_at_k(chunks, queries, ks):
+    """Fraction of queries whose answer is in one of the top-k chunks
+
+    Chunks are ranked with ask.py's TF-IDF keyword overlap, a stand-in for
+    embedding similarity that needs no API access.
+    """
+    texts = [content for content, _ in chunks]
+    idf = ask._idf_scores(texts)
+    token_sets = [set(ask._tokenize(t)) for t in texts]
+    hits = {k: 0 for k in ks}
+    for words, answer in queries:
+        scores = [ask._keyword_overlap_score(words, t, idf) for t in texts]
+        ranked = sorted(range(len(texts)), key=lambda j: -scores[j])
+        for k in ks:
+            if any(answer in token_sets[j] for j in ranked[:k]):
+                hits[k] += 1
+    return {k: hits[k] / len(queries) for k in ks}
+
+
+def bench_slack_recall(args):
+    """Compare retrieval recall of arrival-order and thread-aware Slack chunks"""
+    messages, queries = _synthetic_slack_export(args.threads)
+    text = json.dumps(messages)
+    ks = sorted(args.k)
+
+    print("\nSlack export: %d messages in %d threads, %d-token chunks" % (
+        len(messages), args.threads, args.chunk_size))
+    print("  %-20s %7s %8s  %s" % ("packer", "chunks", "avg tok", "  ".join(
+        "recall@%-3d" % k for k in ks)))
+    for label, gap in (("arrival order", None), ("threads (%ds gap)" % args.gap, args.gap)):
+        start = time.perf_counter()
+        chunks = sync.chunk_slack_json(text, "slack/general.json", args.chunk_size, gap)
+        elapsed = time.perf_counter() - start
+        avg = sum(sync._estimate_tokens(c) for c, _ in chunks) / len(chunks)
+        recall = _recall_at_k(chunks, queries, ks)
+        print("  %-20s %7d %8.0f  %s   (%.3fs)" % (
+            label, len(chunks), avg,
+            "  ".join("%-10.3f" % recall[k] for k in ks), elapsed))
+
+
+# ---------------------------------------------------------------------------
+# Token counting
+# ---------------------------------------------------------------------------
+
+def _write_mixed_corpus(root, files, seed=5):
+    """Write notes mixing prose, code blocks and URLs; return total bytes
+
+    Uses a Zipf-like vocabulary of a few thousand words plus random
+    identifiers, so the BPE piece cache sees realistic miss rates.
+    """
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "ze", "po", "ex", "an",
+                 "de", "ti", "on", "er", "al", "in", "st", "re"]
+    vocab = ["".join(rng.choice(syllables) for _ in range(rng.randint(1, 4)))
+             for _ in range(5000)]
+    weights = [1.0 / (r + 1) for r in range(len(vocab))]
+    mem = Path(root) / "memory"
+    mem.mkdir(parents=True, exist_ok=True)
+    total = 0
+    for i in range(files):
+        lines = ["# Note %d" % i, ""]
+        for p in range(rng.randint(20, 120)):
+            kind = rng.random()
+            if p % 10 == 0:
+                lines.append("## %s %s" % tuple(rng.choices(vocab, weights, k=2)))
+            elif kind < 0.15:
+                ident = "".join(rng.choice(syllables) for _ in range(3))
+                lines.append("```python\ndef %s_%d(x):\n    return x.%s(%d)\n```" % (
+                    ident, rng.randint(0, 999), rng.choice(vocab), rng.randint(0, 99)))
+            elif kind < 0.25:
+                lines.append("See https://portal.example.com/%s/%s?id=%08x" % (
+                    rng.choice(vocab), rng.choice(vocab), rng.getrandbits(32)))
+            else:
+                words = rng.choices(vocab, weights, k=rng.randint(20, 120))
+                lines.append(" ".join(words).capitalize() + ".")
+            lines.append("")
+        text = "\n".join(lines)
+        (mem / ("note-%04d.md" % i)).write_text(text, encoding="utf-8")
+        total += len(text.encode("utf-8"))
+    return total
+
+
+def bench_tokenizer(args):
+    """Share of a full sync spent counting tokens, heuristic vs BPE
+
+    Runs sync_files against a simulated bucket whose requests take
+    --latency ms, adding up the CPU time of every call into the active
+    token counter.
+    """
+    root = tempfile.mkdtemp(prefix="rag-bench-")
+    cwd = os.getcwd()
+    os.environ.setdefault("TELNYX_API_KEY", "bench-placeholder")
+
+    def _fake_request(self, method, bucket, key, payload=b"", content_type=None,
+                      extra_headers=None, query=None):
+        time.sleep(args.latency / 1000.0)
+        return 200, ""
+
+    original_request = sync.TelnyxS3Client._make_request
+    sync.TelnyxS3Client._make_request = _fake_request
+    try:
+        size = _write_mixed_corpus(root, args.files)
+        os.chdir(root)
+        print("\nSync of %d files (%.1f MB), %d ms per request, concurrency %d:" % (
+            args.files, size / 1e6, args.latency, args.concurrency))
+
+        for name in ("heuristic", "bpe"):
+            for path in Path(root).glob(".sync-state.db*"):
+                path.unlink()
+            config = dict(sync.DEFAULT_CONFIG, workspace=root, bucket="bench",
+                          patterns=["memory/*.md"], tokenizer=name)
+
+            spent = [0.0]
+            lock = threading.Lock()
+            local = threading.local()
+            original_configure = sync.configure_token_counter
+
+            def _configure(*a, **kw):
+                counter = original_configure(*a, **kw)
+                for method in ("count", "exceeds"):
+                    inner = getattr(counter, method)
+
+                    def _timed_call(*ca, _inner=inner):
+                        if getattr(local, "busy", False):
+                            return _inner(*ca)  # exceeds() calling count()
+                        # CPU time of this thread, so waiting on the GIL
+                        # while upload threads run is not charged to it
+                        local.busy = True
+                        start = time.thread_time()
+                        try:
+                            return _inner(*ca)
+                        finally:
+                            local.busy = False
+                            with lock:
+                                spent[0] += time.thread_time() - start
+                    setattr(counter, method, _timed_call)
+                return counter
+
+            sync.configure_token_counter = _configure
+            try:
+                start = time.perf_counter()
+                sync.sync_files(config, quiet=True, concurrency=args.concurrency)
+                total = time.perf_counter() - start
+            finally:
+                sync.configure_token_counter = original_configure
+
+            share = 100.0 * spent[0] / total
+            print("  %-10s total %7.2fs   counting %6.2fs   share %5.1f%%" % (
+                name, total, spent[0], share))
+        print("  target: BPE counting under 5%% of sync time -> %s" % (
+            "PASS" if share < 5.0 else "FAIL"))
+    finally:
+        sync.TelnyxS3Client._make_request = original_request
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Reranking
+# ---------------------------------------------------------------------------
+
+def _legacy_tokenize(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _legacy_rerank(query, chunks, num_final, priority_prefixes):
+    """ask.rerank as it was before the term matrix
+
+    Tokenizes every chunk for IDF, again for keyword overlap (re-summing
+    the chunk's token count per query token), and again per pair when
+    checking duplicates.
+    """
+    n = len(chunks)
+    df = Counter()
+    for c in chunks:
+        for t in set(_legacy_tokenize(c["content"])):
+            df[t] += 1
+    idf = {t: math.log((n + 1) / (count + 1)) + 1 for t, count in df.items()}
+    query_tokens = _legacy_tokenize(query)
+
+    def keyword_score(doc_text):
+        doc_tokens = Counter(_legacy_tokenize(doc_text))
+        if not doc_tokens:
+            return 0.0
+        score = 0.0
+        for qt in query_tokens:
+            if qt in doc_tokens:
+                tf = doc_tokens[qt] / sum(doc_tokens.values())
+                score += tf * idf.get(qt, 1.0)
+        return score
+
+    def is_duplicate(a, b):
+        if a["source"] != b["source"]:
+            return False
+        pat = re.compile(r"^(.+)__chunk-([0-9a-f]+)\.\w+$")
+        ma = pat.match(a["source"])
+        mb = pat.match(b["source"])
+        if ma and mb and ma.group(1) == mb.group(1):
+            numbered = ma.group(2).isdigit() and mb.group(2).isdigit()
+            if not numbered or abs(int(ma.group(2)) - int(mb.group(2))) <= 1:
+                ta = set(_legacy_tokenize(a["content"]))
+                tb = set(_legacy_tokenize(b["content"]))
+                if ta and tb:
+                    return len(ta & tb) / min(len(ta), len(tb)) > 0.8
+        return False
+
+    scored = []
+    for c in chunks:
+        pri = ask._priority_score(c["source"], priority_prefixes)
+        combined = c["certainty"] * 2.0 + keyword_score(c["content"]) + (1.0 / (pri + 1)) * 0.3
+        scored.append((combined, c))
+    scored.sort(key=lambda x: -x[0])
+
+    result = []
+    for _, chunk in scored:
+        if not any(is_duplicate(chunk, existing) for existing in result):
+            result.append(chunk)
+        if len(result) >= num_final:
+            break
+    return result
+
+
+def _synthetic_chunks(count, seed=3):
+    """Retrieved-chunk dicts of 100-300 Zipf-distributed words
+
+    About a third of the chunks repeat an earlier chunk's source with
+    mostly the same words, and a tenth copy an earlier chunk's text under
+    a new source, so both kinds of deduplication have real work to do.
+    """
+    rng = random.Random(seed)
+    vocab = ["w%d" % i for i in range(5000)]
+    weights = [1.0 / (r + 1) for r in range(len(vocab))]
+    chunks = []
+    for i in range(count):
+        if chunks and rng.random() < 0.33:
+            base = rng.choice(chunks)
+            words = base["content"].split()
+            words[rng.randrange(len(words))] = rng.choice(vocab)
+            source = base["source"]
+        elif chunks and rng.random() < 0.15:
+            words = rng.choice(chunks)["content"].split()
+            source = "docs/copy-%d__chunk-%012x.md" % (i, rng.getrandbits(48))
+        else:
+            words = rng.choices(vocab, weights, k=rng.randint(100, 300))
+            source = "%s/note-%d__chunk-%012x.md" % (
+                rng.choice(["memory", "knowledge", "docs"]), rng.randrange(count),
+                rng.getrandbits(48))
+        chunks.append({
+            "content": " ".join(words),
+            "source": source,
+            "certainty": round(rng.uniform(0.75, 0.95), 4),
+        })
+    query = " ".join(rng.choices(vocab[20:500], k=6))
+    return query, chunks
+
+
+def bench_rerank(args):
+    """Compare the legacy rerank with the term-matrix rerank at several sizes
+
+    The two must pick the same chunks with cross-source dedup off; the
+    "+minhash" column times the full rerank with it on.
+    """
+    prefixes = ["memory/", "MEMORY.md"]
+    print("\nask.py rerank (top %d, NumPy %s):" % (
+        args.final, "available" if ask.np is not None else "not installed"))
+    print("  %8s %11s %11s %8s %13s %6s %12s" % (
+        "chunks", "before ms", "after ms", "speedup", "+minhash ms", "dups", "tokens saved"))
+    for count in args.chunks:
+        query, chunks = _synthetic_chunks(count)
+        before = _legacy_rerank(query, chunks, args.final, prefixes)
+        after = ask.rerank(query, chunks, args.final, prefixes, None)
+        if [c["content"] for c in before] != [c["content"] for c in after]:
+            print("ERROR: rerank results differ at %d chunks" % count, file=sys.stderr)
+            sys.exit(1)
+        stats = {}
+        ask.rerank(query, chunks, args.final, prefixes, stats=stats)
+        iterations = max(1, args.iterations * 20 // count)
+        elapsed_before, _ = _timed(
+            lambda: _legacy_rerank(query, chunks, args.final, prefixes), iterations)
+        elapsed_after, _ = _timed(
+            lambda: ask.rerank(query, chunks, args.final, prefixes, None), iterations)
+        elapsed_dedup, _ = _timed(
+            lambda: ask.rerank(query, chunks, args.final, prefixes), iterations)
+        ms_before = elapsed_before * 1000.0 / iterations
+        ms_after = elapsed_after * 1000.0 / iterations
+        print("  %8d %11.2f %11.2f %7.2fx %13.2f %6d %12d" % (
+            count, ms_before, ms_after, ms_before / ms_after,
+            elapsed_dedup * 1000.0 / iterations, stats["duplicates_removed"],
+            stats["tokens_saved"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telnyx RAG offline benchmarks")
+    subparsers = parser.add_subparsers(dest="command", help="Benchmark to run")
+
+    p_signing = subparsers.add_parser("signing", help="SigV4 signing throughput")
+    p_signing.add_argument("--requests", type=int, default=20000, help="Requests to sign")
+
+    p_chunking = subparsers.add_parser("chunking", help="Serial vs process-pool chunking")
+    p_chunking.add_argument("--files", type=int, default=200, help="Synthetic files")
+    p_chunking.add_argument("--paragraphs", type=int, default=120, help="Paragraphs per file")
+    p_chunking.add_argument("--chunk-size", type=int, default=800, help="Tokens per chunk")
+    p_chunking.add_argument("--workers", type=int, default=os.cpu_count() or 2,
+                            help="Chunking processes")
+
+    p_recall = subparsers.add_parser(
+        "slack-recall", help="Recall@k of thread-aware vs arrival-order Slack chunks")
+    p_recall.add_argument("--threads", type=int, default=300, help="Synthetic threads")
+    p_recall.add_argument("--chunk-size", type=int, default=800, help="Tokens per chunk")
+    p_recall.add_argument("--gap", type=int, default=1800, help="Time-window gap (seconds)")
+    p_recall.add_argument("--k", type=int, nargs="+", default=[1, 3, 5], help="Cutoffs")
+
+    p_tok = subparsers.add_parser("tokenizer", help="Token counting share of sync time")
+    p_tok.add_argument("--files", type=int, default=300, help="Synthetic files")
+    p_tok.add_argument("--latency", type=int, default=40, help="Simulated ms per request")
+    p_tok.add_argument("--concurrency", type=int, default=8, help="Upload workers")
+
+    p_rerank = subparsers.add_parser("rerank", help="ask.py rerank, before vs after")
+    p_rerank.add_argument("--chunks", type=int, nargs="+", default=[20, 200, 2000],
+                          help="Retrieved chunk counts")
+    p_rerank.add_argument("--final", type=int, default=8, help="Chunks kept after reranking")
+    p_rerank.add_argument("--iterations", type=int, default=50,
+                          help="Reranks timed at 20 chunks (scaled down for larger counts)")
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        sys.exit(1)
+
+    commands = {
+        "signing": bench_signing,
+        "chunking": bench_chunking,
+        "slack-recall": bench_slack_recall,
+        "tokenizer": bench_tokenizer,
+        "rerank": bench_rerank,
+    }
+    commands[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
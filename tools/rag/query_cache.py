@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Telnyx RAG Memory - Similarity Search Result Cache
+
+Caches similarity search responses keyed by (bucket, normalised query,
+num_docs), in process and in a SQLite file shared by search.py, ask.py and
+tools/embeddings/search.py. Entries expire after a TTL, the file is kept
+under a size limit by LRU eviction, and sync.py invalidates a bucket's
+entries whenever it uploads to or deletes from that bucket.
+
+Usage:
+  ./query_cache.py --stats
+  ./query_cache.py --invalidate my-bucket
+  ./query_cache.py --clear
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".query-cache.db")
+DEFAULT_TTL = 300
+DEFAULT_MAX_MB = 32
+DEFAULT_MEMORY_ENTRIES = 256
+
+
+def normalize_query(query):
+    """Normalise a query so trivially different spellings share an entry
+
+    Applies NFKC, case folding and whitespace collapsing.
+
+    Args:
+        query (str): Search query
+
+    Returns:
+        str: Normalised query
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class QueryCache:
+    """Two-level TTL cache of raw similarity search responses
+
+    Responses are kept as JSON in a small in-process LRU and in a SQLite
+    file, so repeated queries within one process skip the database and
+    repeated queries across processes skip the network. Each bucket has a
+    generation number that invalidate() bumps; entries from an older
+    generation are never served, which also covers in-process entries made
+    stale by a sync running in another process.
+
+    The stored size is summed once on open and then tracked per put, so a
+    put doesn't scan the table; it is re-summed, correcting for
+    invalidations and for writes from other processes, only when the
+    tracked size passes max_bytes. Hits served from the database refresh last_used at most once
+    per tenth of the TTL, so repeated hits don't each cost a write.
+
+    If the database cannot be opened (e.g. a read-only checkout), the cache
+    works in process only.
+
+    Args:
+        path (str): Database file
+        ttl (float): Seconds an entry stays valid
+        max_bytes (int): Size limit for stored responses
+        memory_entries (int): Responses kept in process
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl=DEFAULT_TTL,
+                 max_bytes=DEFAULT_MAX_MB * 1024 * 1024, memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (generation, created, response_json)
+        self._generations = {}  # bucket -> generation, for the in-process-only mode
+        # Generation seen by the last miss of each key: a response fetched
+        # before an invalidation must not be stored under the new generation
+        self._missed = OrderedDict()
+        self._bytes = 0
+        try:
+            self.conn = _connect(path)
+            self._bytes = self._stored_bytes()
+        except sqlite3.Error:
+            self.conn = None
+
+    def _stored_bytes(self):
+        """Sum the size of all stored responses (full scan)"""
+        return self.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(response)), 0) FROM entries"
+        ).fetchone()[0]
+
+    @staticmethod
+    def _key(bucket, query, num_docs):
+        return (bucket, normalize_query(query), int(num_docs))
+
+    def _generation(self, bucket):
+        """Current generation of bucket (lock held)"""
+        if self.conn is None:
+            return self._generations.get(bucket, 0)
+        row = self.conn.execute(
+            "SELECT generation FROM buckets WHERE bucket = ?", (bucket,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, bucket, query, num_docs):
+        """Look up a cached response, counting a hit or a miss
+
+        Args:
+            bucket (str): Bucket name
+            query (str): Search query
+            num_docs (int): Number of documents requested
+
+        Returns:
+            dict or None: Raw API response, freshly decoded so callers may
+                modify it
+        """
+        key = self._key(bucket, query, num_docs)
+        now = time.time()
+        with self._lock:
+            try:
+                generation = self._generation(bucket)
+                entry = self._memory.get(key)
+                if entry is not None and entry[0] == generation and now - entry[1] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(entry[2])
+                self._memory.pop(key, None)
+
+                row = None
+                if self.conn is not None:
+                    row = self.conn.execute(
+                        "SELECT generation, created, response, last_used FROM entries "
+                        "WHERE bucket = ? AND query = ? AND num_docs = ?", key
+                    ).fetchone()
+                if row is None or row[0] != generation or now - row[1] > self.ttl:
+                    self._miss(key, generation)
+                    return None
+                # LRU order only needs coarse timestamps
+                if now - row[3] > self.ttl / 10:
+                    self.conn.execute(
+                        "UPDATE entries SET last_used = ? "
+                        "WHERE bucket = ? AND query = ? AND num_docs = ?", (now,) + key
+                    )
+            except sqlite3.Error:
+                self._miss(key, 0)
+                return None
+            self._remember(key, (row[0], row[1], row[2]))
+            self.hits += 1
+        return json.loads(row[2])
+
+    def put(self, bucket, query, num_docs, response):
+        """Store a successful response, evicting old entries if over the size limit
+
+        Args:
+            bucket (str): Bucket name
+            query (str): Search query
+            num_docs (int): Number of documents requested
+            response (dict): Raw API response
+        """
+        key = self._key(bucket, query, num_docs)
+        blob = json.dumps(response, separators=(",", ":")).encode("utf-8")
+        now = time.time()
+        with self._lock:
+            try:
+                generation = self._generation(bucket)
+                if self._missed.pop(key, generation) != generation:
+                    return
+                if self.conn is not None:
+                    old = self.conn.execute(
+                        "SELECT LENGTH(response) FROM entries "
+                        "WHERE bucket = ? AND query = ? AND num_docs = ?", key
+                    ).fetchone()
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO entries "
+                        "(bucket, query, num_docs, generation, created, last_used, response) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        key + (generation, now, now, blob),
+                    )
+                    self._bytes += len(blob) - (old[0] if old else 0)
+                    if self._bytes > self.max_bytes:
+                        self._evict(now)
+            except sqlite3.Error:
+                return
+            self._remember(key, (generation, now, blob))
+
+    def _miss(self, key, generation):
+        """Count a miss and remember the generation it saw (lock held)"""
+        self.misses += 1
+        self._missed[key] = generation
+        self._missed.move_to_end(key)
+        while len(self._missed) > self.memory_entries:
+            self._missed.popitem(last=False)
+
+    def _remember(self, key, entry):
+        """Add an entry to the in-process LRU (lock held)"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now):
+        """Drop expired entries, then least recently used ones until under max_bytes (lock held)"""
+        total = self._stored_bytes()
+        self._bytes = total
+        if total <= self.max_bytes:
+            return
+        # Expired entries go first; the rest free down to 90% of the limit
+        # so eviction doesn't run on every put
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        freed = 0
+        for rowid, size in self.conn.execute(
+            "SELECT rowid, LENGTH(response) FROM entries "
+            "ORDER BY created >= ?, last_used", (now - self.ttl,)
+        ):
+            if excess <= 0:
+                break
+            victims.append((rowid,))
+            excess -= size
+            freed += size
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+        self.conn.execute("COMMIT")
+        self.evictions += len(victims)
+        self._bytes = total - freed
+
+    def invalidate(self, bucket):
+        """Drop every entry for bucket
+
+        Args:
+            bucket (str): Bucket name
+        """
+        with self._lock:
+            self._generations[bucket] = self._generations.get(bucket, 0) + 1
+            for key in [k for k in self._memory if k[0] == bucket]:
+                del self._memory[key]
+            if self.conn is not None:
+                _invalidate(self.conn, bucket)
+
+    def clear(self):
+        """Drop every entry for every bucket"""
+        with self._lock:
+            for bucket in set(k[0] for k in self._memory):
+                self._generations[bucket] = self._generations.get(bucket, 0) + 1
+            self._memory.clear()
+            if self.conn is not None:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO buckets (bucket, generation) "
+                    "SELECT DISTINCT bucket, 0 FROM entries"
+                )
+                self.conn.execute("UPDATE buckets SET generation = generation + 1")
+                self.conn.execute("DELETE FROM entries")
+                self.conn.execute("COMMIT")
+                self._bytes = 0
+
+    def stats(self):
+        """Hit/miss counters for this process and the cache's current size
+
+        Returns:
+            dict: hits, misses, evictions, entries, bytes
+        """
+        entries, size = 0, 0
+        with self._lock:
+            if self.conn is not None:
+                entries, size = self.conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(response)), 0) FROM entries"
+                ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self):
+        """Close the database connection"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _connect(path):
+    """Open the cache database, creating its tables if needed"""
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS entries (
+            bucket TEXT NOT NULL,
+            query TEXT NOT NULL,
+            num_docs INTEGER NOT NULL,
+            generation INTEGER NOT NULL,
+            created REAL NOT NULL,
+            last_used REAL NOT NULL,
+            response BLOB NOT NULL,
+            PRIMARY KEY (bucket, query, num_docs)
+        )"""
+    )
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS buckets (
+            bucket TEXT PRIMARY KEY,
+            generation INTEGER NOT NULL
+        )"""
+    )
+    return conn
+
+
+def _invalidate(conn, bucket):
+    """Bump bucket's generation and delete its entries in one transaction"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT OR IGNORE INTO buckets (bucket, generation) VALUES (?, 0)", (bucket,)
+        )
+        conn.execute(
+            "UPDATE buckets SET generation = generation + 1 WHERE bucket = ?", (bucket,)
+        )
+        conn.execute("DELETE FROM entries WHERE bucket = ?", (bucket,))
+    except sqlite3.Error:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def invalidate_bucket(bucket, path=DEFAULT_CACHE_FILE):
+    """Invalidate bucket's cached results without opening a full QueryCache
+
+    Used by sync.py after uploads and deletes. Does nothing if the cache
+    file doesn't exist yet.
+
+    Args:
+        bucket (str): Bucket name
+        path (str): Database file
+
+    Returns:
+        bool: False if the cache exists but could not be updated
+    """
+    if not os.path.exists(path):
+        return True
+    try:
+        conn = _connect(path)
+        try:
+            _invalidate(conn, bucket)
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def open_query_cache(config, path=DEFAULT_CACHE_FILE):
+    """Open the shared cache with the TTL and size limit from config
+
+    Args:
+        config (dict): Configuration ("query_cache_ttl", "query_cache_max_mb")
+        path (str): Database file
+
+    Returns:
+        QueryCache or None: None when caching is disabled (TTL of 0)
+    """
+    ttl = config.get("query_cache_ttl", DEFAULT_TTL)
+    if not ttl or ttl <= 0:
+        return None
+    max_mb = config.get("query_cache_max_mb", DEFAULT_MAX_MB)
+    return QueryCache(path, ttl=ttl, max_bytes=int(max_mb * 1024 * 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the similarity search cache")
+    parser.add_argument("--cache-file", default=DEFAULT_CACHE_FILE, help="Cache database file")
+    parser.add_argument("--stats", action="store_true", help="Show entry count and size")
+    parser.add_argument("--invalidate", metavar="BUCKET", help="Drop one bucket's entries")
+    parser.add_argument("--clear", action="store_true", help="Drop every entry")
+
+    args = parser.parse_args()
+
+    if not (args.stats or args.invalidate or args.clear):
+        parser.print_help()
+        sys.exit(1)
+
+    cache = QueryCache(args.cache_file)
+    if cache.conn is None:
+        print("ERROR: Could not open %s" % args.cache_file, file=sys.stderr)
+        sys.exit(1)
+    try:
+        if args.invalidate:
+            cache.invalidate(args.invalidate)
+            print("Invalidated cached results for %s" % args.invalidate)
+        if args.clear:
+            cache.clear()
+            print("Cleared %s" % args.cache_file)
+        if args.stats:
+            stats = cache.stats()
+            print("Entries: %d (%.1f KB)" % (stats["entries"], stats["bytes"] / 1024.0))
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ Usage:
   ./search.py "project timeline" --json
   ./search.py "meetings" --priority   # Prioritize knowledge/ and skills/
   ./search.py "test" --bucket my-bucket  # Search specific bucket
+  ./search.py "test" --no-cache          # Always query the API
+  ./search.py "test" -b memory -b slack:0.8   # Search several buckets at once
 """
 
 import os
@@ -20,8 +22,11 @@ import urllib.error
 import urllib.parse
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from query_cache import open_query_cache
+
 # Default configuration
 DEFAULT_CONFIG = {
     "bucket": "chief-memory",
@@ -29,6 +34,10 @@ DEFAULT_CONFIG = {
     "workspace": "/home/node/clawd",
     "priority_prefixes": ["memory/", "MEMORY.md"],
     "default_num_docs": 5,
+    "query_cache_ttl": 300,
+    "query_cache_max_mb": 32,
+    "search_buckets": [],
+    "bucket_weights": {},
 }
 
 def load_config():
@@ -90,7 +99,8 @@ def parse_telnyx_error(error_body):
     except (json.JSONDecodeError, KeyError):
         return error_body.strip()
 
-def similarity_search_with_retry(query, num_docs=5, bucket_name=None, timeout=30, max_retries=3):
+def similarity_search_with_retry(query, num_docs=5, bucket_name=None, timeout=30, max_retries=3,
+                                 cache=None):
     """Search memory using Telnyx similarity search API with retry logic
     
     Args:
@@ -99,16 +109,24 @@ def similarity_search_with_retry(query, num_docs=5, bucket_name=None, timeout=30
         bucket_name (str): Override bucket name from config
         timeout (int): Request timeout in seconds (default: 30)
         max_retries (int): Maximum retry attempts (default: 3)
+        cache (QueryCache or None): Serve repeated queries from this cache
+            and store new responses in it
         
     Returns:
         dict: API response with search results or error info
     """
     config = load_config()
-    api_key = load_credentials()
     
     # Use provided bucket or fall back to config
     bucket = bucket_name or config["bucket"]
     
+    if cache is not None:
+        cached = cache.get(bucket, query, num_docs)
+        if cached is not None:
+            return normalize_api_response(cached)
+    
+    api_key = load_credentials()
+    
     url = "https://api.telnyx.com/v2/ai/embeddings/similarity-search"
     
     payload = json.dumps({
@@ -130,6 +148,8 @@ def similarity_search_with_retry(query, num_docs=5, bucket_name=None, timeout=30
         try:
             with urllib.request.urlopen(req, timeout=timeout) as response:
                 response_data = json.loads(response.read().decode())
+                if cache is not None:
+                    cache.put(bucket, query, num_docs, response_data)
                 # Normalize API response format
                 return normalize_api_response(response_data)
                 
@@ -194,6 +214,84 @@ def normalize_api_response(response_data):
     
     return response_data
 
+def parse_bucket_spec(spec):
+    """Split a "name" or "name:weight" bucket argument
+    
+    Args:
+        spec (str): Bucket name, optionally followed by ":weight"
+        
+    Returns:
+        tuple: (bucket, weight), weight None if not given
+        
+    Raises:
+        ValueError: If the weight is not a number
+    """
+    bucket, sep, weight = spec.partition(":")
+    if not sep:
+        return spec, None
+    return bucket, float(weight)
+
+def multi_bucket_search(query, buckets, num_docs=5, weights=None, timeout=30, max_retries=3,
+                        cache=None):
+    """Search several buckets concurrently and merge the results
+    
+    Every bucket is asked for num_docs results on its own thread. Each
+    result is scored as certainty times its bucket's weight (default 1.0).
+    A source returned by more than one bucket is only kept from the bucket
+    where it scored highest. The top num_docs results are returned.
+    
+    Args:
+        query (str): Search query text
+        buckets (list): Bucket names
+        num_docs (int): Number of documents to return
+        weights (dict): Bucket name -> score multiplier
+        timeout (int): Request timeout in seconds
+        max_retries (int): Maximum retry attempts per bucket
+        cache (QueryCache or None): Serve repeated queries from this cache
+        
+    Returns:
+        dict: {"data": [...], "buckets": [...]}. Results carry "bucket" and
+            "score"; "buckets" lists each bucket's result count, latency_ms
+            and any error. "error" is set only if every bucket failed.
+    """
+    weights = weights or {}
+    
+    def search_one(bucket):
+        start = time.monotonic()
+        result = similarity_search_with_retry(query, num_docs, bucket, timeout, max_retries, cache)
+        return result, time.monotonic() - start
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(buckets))) as pool:
+        outcomes = list(pool.map(search_one, buckets))
+    
+    report = []
+    candidates = []
+    best = {}  # source -> (score, bucket)
+    for bucket, (result, elapsed) in zip(buckets, outcomes):
+        docs = result.get("data") or []
+        entry = {"bucket": bucket, "results": len(docs), "latency_ms": round(elapsed * 1000.0, 1)}
+        if "error" in result:
+            entry["error"] = result["error"]
+            if result.get("details"):
+                entry["details"] = result["details"]
+        report.append(entry)
+        
+        weight = weights.get(bucket, 1.0)
+        for doc in docs:
+            score = float(doc.get("certainty") or 0) * weight
+            candidates.append({**doc, "bucket": bucket, "score": score})
+            source = doc.get("source")
+            if source not in best or score > best[source][0]:
+                best[source] = (score, bucket)
+    
+    merged = [d for d in candidates if best[d.get("source")][1] == d["bucket"]]
+    merged.sort(key=lambda d: -d["score"])
+    results = {"data": merged[:num_docs], "buckets": report}
+    if report and all("error" in entry for entry in report):
+        results["error"] = f"All {len(report)} bucket searches failed"
+        results["details"] = "; ".join(f"{e['bucket']}: {e['error']}" for e in report)
+    return results
+
 def prioritize_results(results, priority_prefixes):
     """Re-rank results to prioritize certain directories
     
@@ -215,7 +313,8 @@ def prioritize_results(results, priority_prefixes):
         return len(priority_prefixes)  # Non-priority files last
     
     def get_certainty(doc):
-        return doc.get("certainty", 0)
+        # Multi-bucket results rank by their bucket-weighted score
+        return doc.get("score", doc.get("certainty", 0))
     
     # Sort by priority first, then by certainty
     results["data"] = sorted(
@@ -258,8 +357,14 @@ def format_results(results, max_content_chars=500):
         else:
             conf = "🔴"
         
-        output.append(f"--- Result {i} {conf} (certainty: {certainty:.3f}) ---")
-        output.append(f"Source: {filename}")
+        weighted = ""
+        if doc.get("score", certainty) != certainty:
+            weighted = f", weighted: {doc['score']:.3f}"
+        output.append(f"--- Result {i} {conf} (certainty: {certainty:.3f}{weighted}) ---")
+        if "bucket" in doc:
+            output.append(f"Source: {filename} (bucket: {doc['bucket']})")
+        else:
+            output.append(f"Source: {filename}")
         output.append(f"\n{display_content}")
         if len(content) > max_content_chars:
             output.append("...[truncated]")
@@ -267,7 +372,25 @@ def format_results(results, max_content_chars=500):
     
     return "\n".join(output)
 
-def search_memory(query, num_docs=5, bucket_name=None, output_json=False, prioritize=True, timeout=30):
+def format_bucket_report(results):
+    """Format the per-bucket result counts and latencies of a multi-bucket search
+    
+    Args:
+        results (dict): Results from multi_bucket_search
+        
+    Returns:
+        str: One line per bucket
+    """
+    lines = ["Buckets:"]
+    for entry in results.get("buckets", []):
+        line = f"  {entry['bucket']}: {entry['results']} results in {entry['latency_ms']:.0f} ms"
+        if "error" in entry:
+            line += f" ({entry['error']})"
+        lines.append(line)
+    return "\n".join(lines)
+
+def search_memory(query, num_docs=5, bucket_name=None, output_json=False, prioritize=True, timeout=30,
+                  use_cache=True, buckets=None):
     """Main search function
     
     Args:
@@ -277,24 +400,48 @@ def search_memory(query, num_docs=5, bucket_name=None, output_json=False, priori
         output_json (bool): Return JSON instead of formatted text
         prioritize (bool): Apply priority ranking
         timeout (int): Request timeout in seconds
+        use_cache (bool): Use the shared query cache (see query_cache.py)
+        buckets (list or None): Search these buckets concurrently instead of
+            bucket_name; entries may be "name:weight", and config
+            "bucket_weights" supplies weights not given inline
         
     Returns:
         str: Formatted results or JSON string
     """
     config = load_config()
+    weights = dict(config.get("bucket_weights") or {})
+    names = []
+    for spec in buckets or []:
+        name, weight = parse_bucket_spec(spec)
+        names.append(name)
+        if weight is not None:
+            weights[name] = weight
+    if len(names) == 1:
+        bucket_name = names[0]
+    cache = open_query_cache(config) if use_cache else None
     
-    results = similarity_search_with_retry(
-        query, 
-        num_docs, 
-        bucket_name, 
-        timeout
-    )
+    try:
+        if len(names) > 1:
+            results = multi_bucket_search(query, names, num_docs, weights, timeout, cache=cache)
+        else:
+            results = similarity_search_with_retry(
+                query, 
+                num_docs, 
+                bucket_name, 
+                timeout,
+                cache=cache
+            )
+    finally:
+        if cache is not None:
+            cache.close()
     
     if prioritize and "data" in results:
         results = prioritize_results(results, config.get("priority_prefixes", []))
     
     if output_json:
         return json.dumps(results, indent=2)
+    elif "buckets" in results:
+        return format_results(results) + "\n" + format_bucket_report(results)
     else:
         return format_results(results)
 
@@ -302,11 +449,16 @@ def main():
     parser = argparse.ArgumentParser(description="Search memory with Telnyx RAG")
     parser.add_argument("query", nargs="*", help="Search query")
     parser.add_argument("--num", "-n", type=int, default=5, help="Number of results")
-    parser.add_argument("--bucket", "-b", help="Override bucket name from config")
+    parser.add_argument(
+        "--bucket", "-b", action="append", metavar="NAME[:WEIGHT]",
+        help="Override bucket name from config; repeat to search several buckets "
+             "concurrently, optionally weighting each one's certainties"
+    )
     parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
     parser.add_argument("--no-priority", action="store_true", help="Don't prioritize results")
     parser.add_argument("--full", "-f", action="store_true", help="Show full content")
     parser.add_argument("--timeout", "-t", type=int, default=30, help="Request timeout in seconds")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the query result cache")
     
     args = parser.parse_args()
     
@@ -315,18 +467,25 @@ def main():
         sys.exit(1)
     
     query = " ".join(args.query)
+    buckets = args.bucket or load_config().get("search_buckets") or []
+    try:
+        names = [parse_bucket_spec(spec)[0] for spec in buckets]
+    except ValueError:
+        print("ERROR: Bucket weights must be numbers, e.g. --bucket slack:0.8", file=sys.stderr)
+        sys.exit(1)
     
     if not args.json:
-        bucket_info = f" (bucket: {args.bucket})" if args.bucket else ""
+        bucket_info = f" (bucket: {', '.join(names)})" if names else ""
         print(f"\n🔍 Searching: \"{query}\"{bucket_info}\n")
     
     results = search_memory(
         query=query,
         num_docs=args.num,
-        bucket_name=args.bucket,
+        buckets=buckets,
         output_json=args.json,
         prioritize=not args.no_priority,
-        timeout=args.timeout
+        timeout=args.timeout,
+        use_cache=not args.no_cache
     )
     
     print(results)
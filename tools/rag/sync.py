@@ -10,6 +10,7 @@ Supports smart chunking for large files (markdown, JSON/Slack exports).
 Usage:
   ./sync.py                 # Sync all configured files
   ./sync.py --watch         # Watch for changes and sync in real-time
+  ./sync.py --watch --poll  # Watch using directory polling instead of inotify
   ./sync.py --list          # List files in bucket
   ./sync.py --create-bucket # Create the memory bucket
   ./sync.py --status        # Check bucket and embedding status
@@ -18,21 +19,43 @@ Usage:
   ./sync.py --embed         # Trigger embedding after sync
   ./sync.py --embed-status <task_id>  # Check embedding task status
   ./sync.py --chunk-size 600          # Override chunk size (tokens)
+  ./sync.py --concurrency 16          # Parallel file uploads
+  ./sync.py --workers 4               # Chunk on 4 processes
+  ./sync.py --verify                  # Rehash all files (ignore size/mtime fast path)
 """
 
 import os
 import sys
 import json
+import base64
 import hashlib
 import hmac
+import mmap
 import datetime
-import urllib.request
-import urllib.error
+import http.client
+import ssl
 import urllib.parse
+import urllib.request
 import time
 import re
+import zlib
 import argparse
-from pathlib import Path
+import ctypes
+import ctypes.util
+import select
+import struct
+import collections
+import sqlite3
+import contextlib
+import xml.etree.ElementTree as ElementTree
+from xml.sax.saxutils import escape as xml_escape
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait,
+)
+from pathlib import Path, PurePosixPath
+
+from query_cache import invalidate_bucket
 
 # Default configuration
 DEFAULT_CONFIG = {
@@ -61,31 +84,329 @@ DEFAULT_CONFIG = {
     ],
     "priority_prefixes": ["memory/", "MEMORY.md"],
     "chunk_size": 800,
+    "concurrency": 8,
+    "workers": 1,
+    "slack_grouping": "arrival",
+    "slack_time_gap": 1800,
+    "max_connections_per_host": 8,
+    "chunk_overlap": 0,
+    "tokenizer": None,  # "heuristic", or "bpe" when tokenizer_file is set
+    "tokenizer_file": None,
 }
 
 # ---------------------------------------------------------------------------
-# Chunking helpers
+# Token counting
 # ---------------------------------------------------------------------------
 
+# BPE merge ranks in tiktoken's format ("<base64 token> <rank>" per line)
+DEFAULT_BPE_RANKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bpe_ranks.tiktoken")
+
+# Pre-tokenizer splitting a line into words, numbers, punctuation and
+# whitespace runs before BPE; a stdlib-re approximation of cl100k's pattern
+# (" word" comes first only because it is by far the most common piece)
+_BPE_PRETOKENIZE = re.compile(
+    r" [^\W\d_]+"
+    r"|'(?i:s|t|re|ve|m|ll|d)"
+    r"|[^\W\d_]+"
+    r"|[^\r\n\w][^\W\d_]+"
+    r"|_[^\W\d_]+"
+    r"|\d{1,3}"
+    r"| ?(?:[^\s\w]|_)+[\r\n]*"
+    r"|\s*[\r\n]+"
+    r"|\s+(?!\S)"
+    r"|\s+"
+)
+# Pieces longer than this are merged in slices to keep BPE linear
+_BPE_MAX_PIECE = 64
+
+
+class HeuristicTokenCounter:
+    """Token counter assuming roughly 4 characters per token"""
+
+    name = "heuristic"
+
+    def count(self, text):
+        """Count tokens in text
+
+        Args:
+            text (str): Input text
+
+        Returns:
+            int: Estimated token count (at least 1)
+        """
+        return max(1, len(text) // 4)
+
+    def exceeds(self, text, limit):
+        """Check whether text has more than `limit` tokens"""
+        return self.count(text) > limit
+
+    def min_tokens_for_size(self, size):
+        """Lower bound on the token count of a file of `size` bytes
+
+        A character is at most 4 UTF-8 bytes, so the text has at least
+        size / 4 characters.
+        """
+        return max(1, size // 4 // 4)
+
+
+class BPETokenCounter:
+    """Token counter using byte-level BPE merge ranks, fully offline
+
+    Text is counted line by line, each newline being one token. Paragraph
+    counts are kept in an LRU cache keyed by a hash of the paragraph, and
+    per-line and per-word counts in bounded dicts, so re-chunking mostly
+    unchanged files costs a hash per paragraph.
+
+    Args:
+        ranks_file (str): Path to a tiktoken-format ranks file
+        cache_size (int): Paragraph counts kept in the LRU cache
+    """
+
+    name = "bpe"
+
+    def __init__(self, ranks_file=DEFAULT_BPE_RANKS, cache_size=65536):
+        self.ranks_file = ranks_file
+        self.ranks = {}
+        with open(ranks_file, "rb") as f:
+            data = f.read()
+        # Identifies the vocab in the chunking fingerprint
+        self.vocab_hash = hashlib.sha256(data).hexdigest()
+        for line in data.splitlines():
+            if line.strip():
+                token, rank = line.split()
+                self.ranks[base64.b64decode(token)] = int(rank)
+        if not all(bytes([b]) in self.ranks for b in range(256)):
+            raise ValueError("%s does not cover all single bytes" % ranks_file)
+        self.max_token_bytes = max(len(token) for token in self.ranks)
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._pieces = {}
+        self._lines = {}
+        self._lock = threading.Lock()
+
+    def _bpe_count(self, piece):
+        """Number of BPE tokens for one pre-tokenized piece
+
+        Merging starts from whole characters rather than bytes, so a
+        character outside the vocab counts as one token (as it would in
+        the embedding models' tokenizers) instead of one per UTF-8 byte.
+        """
+        parts = [ch.encode("utf-8", "surrogatepass") for ch in piece]
+        ranks = self.ranks
+        if len(parts) > 1 and b"".join(parts) in ranks:
+            return 1
+        while len(parts) > 1:
+            best = None
+            best_rank = None
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best, best_rank = i, rank
+            if best is None:
+                break
+            parts[best:best + 2] = [parts[best] + parts[best + 1]]
+        return len(parts)
+
+    def _count_pieces(self, pieces):
+        """Sum BPE token counts of pre-tokenized pieces, caching per piece"""
+        known = self._pieces
+        try:
+            # Fast path: every piece seen before, summed without Python loops
+            return sum(map(known.__getitem__, pieces))
+        except KeyError:
+            pass
+        if len(known) >= 262144:
+            known.clear()
+        for piece in set(pieces).difference(known):
+            if len(piece) <= _BPE_MAX_PIECE:
+                known[piece] = self._bpe_count(piece)
+                continue
+            total = 0
+            for i in range(0, len(piece), _BPE_MAX_PIECE):
+                part = piece[i:i + _BPE_MAX_PIECE]
+                if part not in known:
+                    known[part] = self._bpe_count(part)
+                total += known[part]
+            known[piece] = total
+        return sum(map(known.__getitem__, pieces))
+
+    def _count_lines(self, lines):
+        """Sum BPE token counts of lines (without their newlines)
+
+        Lines are pre-tokenized once and their counts kept in a bounded
+        dict, so the whole-file, section and paragraph checks chunking
+        makes over the same text only pay for dict lookups after the first.
+        """
+        known = self._lines
+        try:
+            return sum(map(known.__getitem__, lines))
+        except KeyError:
+            pass
+        if len(known) >= 262144:
+            known.clear()
+        for line in set(lines).difference(known):
+            known[line] = self._count_pieces(_BPE_PRETOKENIZE.findall(line))
+        return sum(map(known.__getitem__, lines))
+
+    def count(self, text):
+        """Count tokens in text
+
+        Args:
+            text (str): Input text
+
+        Returns:
+            int: BPE token count (at least 1)
+        """
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            count = self._cache.get(key)
+            if count is not None:
+                self._cache.move_to_end(key)
+                return count
+
+        lines = text.split("\n")
+        count = max(1, self._count_lines(lines) + len(lines) - 1)
+
+        with self._lock:
+            self._cache[key] = count
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return count
+
+    def exceeds(self, text, limit):
+        """Check whether text has more than `limit` tokens
+
+        Args:
+            text (str): Input text
+            limit (int): Token limit
+
+        Returns:
+            bool: True if count(text) > limit
+        """
+        if limit < 1:
+            return True  # count() is never below 1
+        if len(text) <= limit:
+            return False  # Every token covers at least one character
+        return self.count(text) > limit
+
+    def min_tokens_for_size(self, size):
+        """Lower bound on the token count of a file of `size` bytes
+
+        Each token covers at most max_token_bytes bytes, and decoding
+        (CRLF -> LF) can at most halve the byte count.
+        """
+        return max(1, size // (2 * self.max_token_bytes))
+
+
+_token_counter = None
+
+
+def configure_token_counter(name="heuristic", ranks_file=None):
+    """Select the token counter used for chunk sizing
+
+    Falls back to the 4-chars-per-token heuristic if the BPE ranks file is
+    missing or invalid. Also used as the process-pool initializer so
+    chunking workers count tokens the same way.
+
+    Args:
+        name (str): "bpe" or "heuristic"
+        ranks_file (str or None): tiktoken-format ranks file (default: bundled)
+
+    Returns:
+        HeuristicTokenCounter or BPETokenCounter: The active counter
+    """
+    global _token_counter
+    counter = HeuristicTokenCounter()
+    if name == "bpe":
+        try:
+            counter = BPETokenCounter(ranks_file or DEFAULT_BPE_RANKS)
+        except (IOError, ValueError) as e:
+            print("Warning: BPE token counter unavailable (%s), using heuristic" % e,
+                  file=sys.stderr)
+    _token_counter = counter
+    return counter
+
+
+def tokenizer_settings(config):
+    """Get the token counter name and ranks file selected by config
+
+    The bundled vocab is not any embedding model's, so BPE counting is only
+    the default once a model vocab is supplied through "tokenizer_file".
+
+    Args:
+        config (dict): Configuration ("tokenizer", "tokenizer_file")
+
+    Returns:
+        tuple[str, str or None]: (name, ranks_file) for configure_token_counter
+    """
+    ranks_file = config.get("tokenizer_file")
+    return config.get("tokenizer") or ("bpe" if ranks_file else "heuristic"), ranks_file
+
+
+def get_token_counter():
+    """Get the active token counter, configuring the default on first use"""
+    if _token_counter is None:
+        configure_token_counter()
+    return _token_counter
+
+
 def _estimate_tokens(text):
-    """Estimate token count from character count (approx 1 token per 4 chars)
+    """Count tokens with the active token counter
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        int: Token count (at least 1)
+    """
+    return get_token_counter().count(text)
+
+
+def _exceeds_tokens(text, limit):
+    """Check whether text is over a token limit with the active counter
 
     Args:
         text (str): Input text
+        limit (int): Token limit
+
+    Returns:
+        bool: True if the text has more than `limit` tokens
+    """
+    return get_token_counter().exceeds(text, limit)
+
+
+# ---------------------------------------------------------------------------
+# Chunking helpers
+# ---------------------------------------------------------------------------
+
+# Content-defined chunk boundaries: once a chunk holds at least
+# _CDC_MIN_FILL of the token budget, it is closed after any paragraph (or
+# message) whose CRC32 has its low bits clear. Boundaries then depend on
+# content rather than position, so an edit only reshapes nearby chunks.
+_CDC_MIN_FILL = 0.5
+_CDC_BOUNDARY_MASK = 0x3
+
+
+def _is_content_boundary(text):
+    """Check whether a chunk may end after this paragraph or message
+
+    Args:
+        text (str): Paragraph or formatted message
 
     Returns:
-        int: Estimated token count
+        bool: True if the text's content hash marks a boundary
     """
-    return max(1, len(text) // 4)
+    return (zlib.crc32(text.encode("utf-8")) & _CDC_BOUNDARY_MASK) == 0
 
 
-def _make_metadata_header(source, chunk_index, total_chunks, title=""):
+def _make_metadata_header(source, title=""):
     """Build a YAML-style metadata header for a chunk
 
+    The header holds no positional fields, so a chunk's content (and key)
+    only changes when its own text changes.
+
     Args:
         source (str): Original file path
-        chunk_index (int): 1-based chunk index
-        total_chunks (int): Total chunks for this file
         title (str): Section title
 
     Returns:
@@ -93,26 +414,37 @@ def _make_metadata_header(source, chunk_index, total_chunks, title=""):
     """
     lines = ["---"]
     lines.append("source: %s" % source)
-    lines.append("chunk: %d/%d" % (chunk_index, total_chunks))
     if title:
         lines.append("title: %s" % title)
     lines.append("---")
     return "\n".join(lines)
 
 
-def _chunk_key(original_key, index, ext=".md"):
-    """Generate deterministic chunk filename
+def _content_hash(content):
+    """SHA-256 hex digest of chunk content
+
+    Args:
+        content (str): Chunk content
+
+    Returns:
+        str: Hex digest
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _chunk_key(original_key, content_hash, ext=".md"):
+    """Generate a content-addressed chunk filename
 
     Args:
         original_key (str): Original S3 key / relative path
-        index (int): 1-based chunk index
+        content_hash (str): Hex digest of the chunk content
         ext (str): File extension for chunks
 
     Returns:
-        str: Chunk key like  'path/file__chunk-001.md'
+        str: Chunk key like  'path/file__chunk-3f2a9c01b7de.md'
     """
     base, _ = os.path.splitext(original_key)
-    return "%s__chunk-%03d%s" % (base, index, ext)
+    return "%s__chunk-%s%s" % (base, content_hash[:12], ext)
 
 
 def _extract_heading(text):
@@ -131,54 +463,186 @@ def _extract_heading(text):
     return ""
 
 
-def _split_by_paragraphs(text, max_tokens):
+# Separators tried, coarsest first, when a single paragraph is over the
+# token budget: line breaks (code blocks, log dumps), sentence ends, then
+# any whitespace. Each is paired with the string that rejoins the parts.
+_OVERSIZE_SPLITS = (
+    (re.compile(r"\n"), "\n"),
+    (re.compile(r"(?<=[.!?])\s+"), " "),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def _split_fixed_window(text, max_tokens):
+    """Cut text without usable separators into windows of at most max_tokens
+
+    Args:
+        text (str): Input text
+        max_tokens (int): Max tokens per window
+
+    Returns:
+        list[str]: Consecutive slices of text
+    """
+    pieces = []
+    width = max(1, len(text) * max_tokens // _estimate_tokens(text))
+    pos = 0
+    while pos < len(text):
+        piece = text[pos:pos + width]
+        tokens = _estimate_tokens(piece)
+        while tokens > max_tokens and len(piece) > 1:
+            piece = piece[:max(1, len(piece) * max_tokens // tokens)]
+            tokens = _estimate_tokens(piece)
+        pieces.append(piece)
+        pos += len(piece)
+    return pieces
+
+
+def _split_oversized(text, max_tokens, level=0):
+    """Split a paragraph larger than max_tokens into pieces that fit
+
+    Parts are packed greedily at the coarsest separator level, and only
+    parts that are still too large go one level finer, ending with fixed
+    character windows. Every character is looked at a bounded number of
+    times and each piece is joined once, so the split is linear.
+
+    Args:
+        text (str): Oversized paragraph
+        max_tokens (int): Max tokens per piece
+        level (int): Index of the first separator in _OVERSIZE_SPLITS to try
+
+    Returns:
+        list[str]: Pieces in order
+    """
+    if level >= len(_OVERSIZE_SPLITS):
+        return _split_fixed_window(text, max_tokens)
+
+    pattern, joiner = _OVERSIZE_SPLITS[level]
+    pieces = []
+    current = []
+    current_tokens = 0
+    for part in pattern.split(text):
+        part = part.rstrip()
+        if not part.strip():
+            continue
+        pt = _estimate_tokens(part)
+        if pt > max_tokens:
+            if current:
+                pieces.append(joiner.join(current))
+                current, current_tokens = [], 0
+            pieces.extend(_split_oversized(part.strip(), max_tokens, level + 1))
+            continue
+        # Count one token per joiner so a rejoined piece stays within budget
+        if current and current_tokens + pt + 1 > max_tokens:
+            pieces.append(joiner.join(current))
+            current, current_tokens = [], 0
+        current.append(part if joiner == "\n" else part.strip())
+        current_tokens += pt + 1
+    if current:
+        pieces.append(joiner.join(current))
+    return pieces
+
+
+def _overlap_tail(units, counts, overlap):
+    """Trailing paragraphs of a chunk, up to `overlap` tokens
+
+    Args:
+        units (list[str]): Paragraphs (or paragraph pieces) of the chunk
+        counts (list[int]): Token count of each unit
+        overlap (int): Token budget for the tail
+
+    Returns:
+        list[str]: Units to repeat at the start of the next chunk
+    """
+    tail = []
+    total = 0
+    for unit, tokens in zip(reversed(units), reversed(counts)):
+        if total + tokens > overlap:
+            break
+        tail.append(unit)
+        total += tokens
+    if not tail:
+        # The last paragraph alone is too long: repeat its last sentences
+        tail = [_split_oversized(units[-1], overlap)[-1]]
+    tail.reverse()
+    return tail
+
+
+def _split_by_paragraphs(text, max_tokens, overlap=0):
     """Split text into chunks by paragraph boundaries respecting token limit
 
+    Paragraphs larger than the limit are split by lines, sentences, words
+    and finally fixed windows. With `overlap`, each chunk starts with the
+    last paragraphs (or sentences) of the previous one, up to that many
+    tokens, and the rest of the chunk is packed to max_tokens - overlap.
+
     Args:
         text (str): Input text
         max_tokens (int): Max tokens per chunk
+        overlap (int): Tokens repeated from the end of the previous chunk
+            (at most half of max_tokens)
 
     Returns:
         list[str]: List of text chunks
     """
-    paragraphs = re.split(r"\n\s*\n", text)
-    chunks = []
+    overlap = max(0, min(overlap, max_tokens // 2))
+    budget = max_tokens - overlap
+    min_fill = budget * _CDC_MIN_FILL
+
+    # Group units (paragraphs, or pieces of oversized ones) into chunks
+    # first; overlap is added once the groups are known
+    groups = []
     current = []
+    counts = []
     current_tokens = 0
 
-    for para in paragraphs:
+    for para in re.split(r"\n\s*\n", text):
         para = para.strip()
         if not para:
             continue
         pt = _estimate_tokens(para)
-        if current and (current_tokens + pt) > max_tokens:
-            chunks.append("\n\n".join(current))
-            current = [para]
-            current_tokens = pt
+        if pt > budget:
+            units = [(piece, _estimate_tokens(piece)) for piece in _split_oversized(para, budget)]
         else:
-            current.append(para)
-            current_tokens += pt
+            units = [(para, pt)]
+        for unit, tokens in units:
+            if current and (current_tokens + tokens) > budget:
+                groups.append((current, counts))
+                current, counts, current_tokens = [], [], 0
+            current.append(unit)
+            counts.append(tokens)
+            current_tokens += tokens
+            if current_tokens >= min_fill and _is_content_boundary(unit):
+                groups.append((current, counts))
+                current, counts, current_tokens = [], [], 0
 
     if current:
-        chunks.append("\n\n".join(current))
+        groups.append((current, counts))
+
+    chunks = []
+    for i, (units, unit_counts) in enumerate(groups):
+        if overlap and i:
+            units = _overlap_tail(*groups[i - 1], overlap=overlap) + units
+        chunks.append("\n\n".join(units))
 
     return chunks if chunks else [text]
 
 
-def chunk_markdown(text, source, max_tokens=800):
+def chunk_markdown(text, source, max_tokens=800, overlap=0):
     """Split markdown into semantic chunks by headers then paragraphs
 
     Args:
         text (str): Markdown content
         source (str): Original file path for metadata
         max_tokens (int): Target max tokens per chunk
+        overlap (int): Tokens repeated between neighbouring chunks of a
+            section, see _split_by_paragraphs
 
     Returns:
         list[tuple[str, str]]: List of (chunk_content_with_metadata, title)
     """
-    if _estimate_tokens(text) <= max_tokens:
+    if not _exceeds_tokens(text, max_tokens):
         title = _extract_heading(text) or os.path.basename(source)
-        header = _make_metadata_header(source, 1, 1, title)
+        header = _make_metadata_header(source, title)
         return [(header + "\n\n" + text, title)]
 
     # Split on level-2 and level-3 headers
@@ -216,65 +680,73 @@ def chunk_markdown(text, source, max_tokens=800):
     # Sub-split large sections by paragraph
     final_parts = []
     for heading, body in parts:
-        if _estimate_tokens(body) > max_tokens:
-            sub_chunks = _split_by_paragraphs(body, max_tokens)
-            for j, sc in enumerate(sub_chunks):
-                sub_title = heading
-                if len(sub_chunks) > 1:
-                    sub_title = "%s (part %d)" % (heading, j + 1) if heading else ""
-                final_parts.append((sub_title, sc))
+        if _exceeds_tokens(body, max_tokens):
+            sub_chunks = _split_by_paragraphs(body, max_tokens, overlap)
+            for sc in sub_chunks:
+                final_parts.append((heading, sc))
         else:
             final_parts.append((heading, body))
 
-    total = len(final_parts)
     results = []
-    for idx, (title, body) in enumerate(final_parts, 1):
+    for title, body in final_parts:
         display_title = title or _extract_heading(body) or os.path.basename(source)
-        header = _make_metadata_header(source, idx, total, display_title)
+        header = _make_metadata_header(source, display_title)
         results.append((header + "\n\n" + body, display_title))
 
     return results
 
 
-def chunk_slack_json(text, source, max_tokens=800):
-    """Split Slack-style JSON exports into chunks by time window / thread
-
-    Args:
-        text (str): JSON content (array of message objects)
-        source (str): Original file path
-        max_tokens (int): Target max tokens per chunk
+def _format_slack_chunk(msgs, authors, dates, source, channel_name):
+    """Render one packed group of Slack messages with its metadata header
 
     Returns:
-        list[tuple[str, str]]: List of (chunk_content_with_metadata, title)
+        tuple[str, str]: (chunk_content_with_metadata, title)
     """
-    try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        # Fall back to markdown chunking for invalid JSON
-        return chunk_markdown(text, source, max_tokens)
+    date_range = ""
+    clean_dates = sorted(set(d for d in dates if d))
+    if clean_dates:
+        if len(clean_dates) == 1:
+            date_range = clean_dates[0]
+        else:
+            date_range = "%s to %s" % (clean_dates[0], clean_dates[-1])
 
-    # Handle both array of messages and object with messages key
-    messages = []
-    channel_name = ""
-    if isinstance(data, list):
-        messages = data
-        # Try to extract channel from filename
-        channel_name = os.path.basename(source).replace(".json", "")
-    elif isinstance(data, dict):
-        messages = data.get("messages", data.get("data", []))
-        channel_name = data.get("channel", data.get("name", ""))
-        if not isinstance(messages, list):
-            return chunk_markdown(text, source, max_tokens)
+    title = channel_name or os.path.basename(source)
+    meta_lines = ["---"]
+    meta_lines.append("source: %s" % source)
+    meta_lines.append("title: %s" % title)
+    if channel_name:
+        meta_lines.append("channel: %s" % channel_name)
+    if date_range:
+        meta_lines.append("date_range: %s" % date_range)
+    if authors:
+        meta_lines.append("authors: %s" % ", ".join(sorted(authors)))
+    meta_lines.append("---")
+    header = "\n".join(meta_lines)
+
+    body = "\n".join(msgs)
+    return header + "\n\n" + body, title
 
-    if not messages:
-        return chunk_markdown(text, source, max_tokens)
 
-    # Group messages into chunks by token budget
-    chunks_raw = []
+def _pack_slack_messages(messages, source, channel_name, max_tokens):
+    """Group Slack messages into chunks by token budget
+
+    Consumes messages lazily and yields each chunk as soon as it closes, so
+    only the chunk being filled is held in memory.
+
+    Args:
+        messages (iterable): Message objects (non-dicts are skipped)
+        source (str): Original file path
+        channel_name (str): Channel name for metadata
+        max_tokens (int): Target max tokens per chunk
+
+    Yields:
+        tuple[str, str]: (chunk_content_with_metadata, title)
+    """
     current_msgs = []
     current_tokens = 0
     current_authors = set()
     current_dates = []
+    min_fill = max_tokens * _CDC_MIN_FILL
 
     for msg in messages:
         if not isinstance(msg, dict):
@@ -288,7 +760,8 @@ def chunk_slack_json(text, source, max_tokens=800):
         mt = _estimate_tokens(formatted)
 
         if current_msgs and (current_tokens + mt) > max_tokens:
-            chunks_raw.append((current_msgs[:], current_authors.copy(), current_dates[:]))
+            yield _format_slack_chunk(
+                current_msgs, current_authors, current_dates, source, channel_name)
             current_msgs = [formatted]
             current_tokens = mt
             current_authors = {user}
@@ -300,51 +773,381 @@ def chunk_slack_json(text, source, max_tokens=800):
             if ts:
                 current_dates.append(str(ts)[:10])
 
+        if current_tokens >= min_fill and _is_content_boundary(formatted):
+            yield _format_slack_chunk(
+                current_msgs, current_authors, current_dates, source, channel_name)
+            current_msgs = []
+            current_tokens = 0
+            current_authors = set()
+            current_dates = []
+
     if current_msgs:
-        chunks_raw.append((current_msgs[:], current_authors.copy(), current_dates[:]))
+        yield _format_slack_chunk(
+            current_msgs, current_authors, current_dates, source, channel_name)
 
-    total = len(chunks_raw)
-    results = []
-    for idx, (msgs, authors, dates) in enumerate(chunks_raw, 1):
-        date_range = ""
-        clean_dates = sorted(set(d for d in dates if d))
-        if clean_dates:
-            if len(clean_dates) == 1:
-                date_range = clean_dates[0]
-            else:
-                date_range = "%s to %s" % (clean_dates[0], clean_dates[-1])
-
-        title = channel_name or os.path.basename(source)
-        meta_lines = ["---"]
-        meta_lines.append("source: %s" % source)
-        meta_lines.append("chunk: %d/%d" % (idx, total))
-        meta_lines.append("title: %s" % title)
-        if channel_name:
-            meta_lines.append("channel: %s" % channel_name)
-        if date_range:
-            meta_lines.append("date_range: %s" % date_range)
-        if authors:
-            meta_lines.append("authors: %s" % ", ".join(sorted(authors)))
-        meta_lines.append("---")
-        header = "\n".join(meta_lines)
-
-        body = "\n".join(msgs)
-        results.append((header + "\n\n" + body, title))
 
+def _slack_ts_seconds(ts):
+    """Parse a Slack timestamp ("1600000000.000100" or number) to seconds
+
+    Returns:
+        float or None: Seconds since the epoch, or None if not numeric
+    """
+    try:
+        return float(ts)
+    except (TypeError, ValueError):
+        return None
+
+
+def _pack_slack_threads(messages, source, channel_name, max_tokens, thread_gap):
+    """Group Slack messages into chunks that keep conversations together
+
+    Messages sharing a ``thread_ts`` form one conversation wherever their
+    replies appear in the export; other messages form time windows that
+    break after ``thread_gap`` seconds of silence. Conversations are packed
+    whole into chunks by token budget, in order of their first message,
+    and only a conversation larger than the budget is split.
+
+    Args:
+        messages (iterable): Message objects (non-dicts are skipped)
+        source (str): Original file path
+        channel_name (str): Channel name for metadata
+        max_tokens (int): Target max tokens per chunk
+        thread_gap (float): Seconds of silence that end a time window
+
+    Yields:
+        tuple[str, str]: (chunk_content_with_metadata, title)
+    """
+    # Each conversation is a list of (formatted, user, date, tokens)
+    conversations = []
+    threads = {}
+    window = None
+    last_seen = None
+
+    for msg in messages:
+        if not isinstance(msg, dict):
+            continue
+        msg_text = msg.get("text", msg.get("content", ""))
+        user = msg.get("user", msg.get("username", msg.get("author", "unknown")))
+        ts = msg.get("ts", msg.get("timestamp", msg.get("date", "")))
+        thread_ts = msg.get("thread_ts")
+        is_reply = bool(thread_ts) and str(thread_ts) != str(ts)
+
+        formatted = "[%s] %s: %s" % (str(ts)[:10] if ts else "?", user, msg_text)
+        if is_reply:
+            formatted = "  " + formatted
+        entry = (formatted, user, str(ts)[:10] if ts else "", _estimate_tokens(formatted))
+
+        if not is_reply:
+            seconds = _slack_ts_seconds(ts)
+            if seconds is not None:
+                if last_seen is not None and seconds - last_seen > thread_gap:
+                    window = None
+                last_seen = seconds
+
+        if thread_ts:
+            conversation = threads.get(str(thread_ts))
+            if conversation is None:
+                conversation = threads[str(thread_ts)] = []
+                conversations.append(conversation)
+        else:
+            if window is None:
+                window = []
+                conversations.append(window)
+            conversation = window
+        conversation.append(entry)
+
+    current = []
+    current_tokens = 0
+    min_fill = max_tokens * _CDC_MIN_FILL
+
+    def _emit(entries):
+        return _format_slack_chunk(
+            [e[0] for e in entries], {e[1] for e in entries}, [e[2] for e in entries],
+            source, channel_name,
+        )
+
+    for conversation in conversations:
+        tokens = sum(e[3] for e in conversation)
+        if current and current_tokens + tokens > max_tokens:
+            yield _emit(current)
+            current = []
+            current_tokens = 0
+
+        if tokens > max_tokens:
+            # Oversized conversation: split it by budget on its own
+            for entry in conversation:
+                if current and current_tokens + entry[3] > max_tokens:
+                    yield _emit(current)
+                    current = []
+                    current_tokens = 0
+                current.append(entry)
+                current_tokens += entry[3]
+            yield _emit(current)
+            current = []
+            current_tokens = 0
+            continue
+
+        current.extend(conversation)
+        current_tokens += tokens
+        if current_tokens >= min_fill and _is_content_boundary(conversation[-1][0]):
+            yield _emit(current)
+            current = []
+            current_tokens = 0
+
+    if current:
+        yield _emit(current)
+
+
+def _pack_slack(messages, source, channel_name, max_tokens, thread_gap=None):
+    """Pack Slack messages by thread (thread_gap set) or by arrival order"""
+    if thread_gap is None:
+        return _pack_slack_messages(messages, source, channel_name, max_tokens)
+    return _pack_slack_threads(messages, source, channel_name, max_tokens, thread_gap)
+
+
+def slack_thread_gap(config):
+    """Get the Slack grouping setting from config
+
+    Args:
+        config (dict): Configuration
+
+    Returns:
+        float or None: Time-window gap in seconds when grouping by thread,
+            or None for arrival-order packing
+    """
+    if config.get("slack_grouping", "arrival") != "threads":
+        return None
+    return float(config.get("slack_time_gap", 1800))
+
+
+def chunk_slack_json(text, source, max_tokens=800, thread_gap=None):
+    """Split Slack-style JSON exports into chunks by time window / thread
+
+    Args:
+        text (str): JSON content (array of message objects)
+        source (str): Original file path
+        max_tokens (int): Target max tokens per chunk
+        thread_gap (float or None): Group by thread and time window, splitting
+            windows after this many seconds of silence; None packs by arrival
+
+    Returns:
+        list[tuple[str, str]]: List of (chunk_content_with_metadata, title)
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        # Fall back to markdown chunking for invalid JSON
+        return chunk_markdown(text, source, max_tokens)
+
+    # Handle both array of messages and object with messages key
+    messages = []
+    channel_name = ""
+    if isinstance(data, list):
+        messages = data
+        # Try to extract channel from filename
+        channel_name = os.path.basename(source).replace(".json", "")
+    elif isinstance(data, dict):
+        messages = data.get("messages", data.get("data", []))
+        channel_name = data.get("channel", data.get("name", ""))
+        if not isinstance(messages, list):
+            return chunk_markdown(text, source, max_tokens)
+
+    if not messages:
+        return chunk_markdown(text, source, max_tokens)
+
+    results = list(_pack_slack(messages, source, channel_name, max_tokens, thread_gap))
     return results if results else chunk_markdown(text, source, max_tokens)
 
 
-def chunk_file(filepath, s3_key, max_tokens=800):
+# Whitespace allowed between JSON tokens (same set json.loads accepts)
+_JSON_WS = re.compile(r"[ \t\n\r]*")
+_JSON_VALUE_END = frozenset(" \t\n\r,]")
+_JSON_READ_SIZE = 1 << 16
+
+
+def iter_json_array(fileobj, block_size=_JSON_READ_SIZE):
+    """Yield the elements of a top-level JSON array one at a time
+
+    Reads the file incrementally, so memory is bounded by the read block
+    and the largest single element rather than by the file. Elements decode
+    exactly as json.loads would decode them.
+
+    Args:
+        fileobj (file): Text-mode file object positioned at the document start
+        block_size (int): Characters read per refill
+
+    Yields:
+        object: Each decoded array element
+
+    Raises:
+        ValueError: If the document is not a well-formed JSON array
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def _more():
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        # Grow reads with the pending data so one huge element stays linear
+        data = fileobj.read(max(block_size, len(buf) - pos))
+        if not data:
+            eof = True
+            return False
+        buf = buf[pos:] + data
+        pos = 0
+        return True
+
+    def _skip_ws():
+        nonlocal pos
+        while True:
+            pos = _JSON_WS.match(buf, pos).end()
+            if pos < len(buf) or not _more():
+                return
+
+    _skip_ws()
+    if pos >= len(buf) or buf[pos] != "[":
+        raise ValueError("not a JSON array")
+    pos += 1
+    _skip_ws()
+
+    if pos < len(buf) and buf[pos] == "]":
+        pos += 1
+    else:
+        while True:
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # Possibly cut off by the read boundary
+                    if _more():
+                        continue
+                    raise
+                # A number cut by the read boundary decodes as a shorter
+                # number ("12" of "12.5"), so only accept a value that is
+                # followed by a separator
+                if (end >= len(buf) or buf[end] not in _JSON_VALUE_END) and _more():
+                    continue
+                break
+            pos = end
+            yield value
+
+            _skip_ws()
+            if pos >= len(buf):
+                raise ValueError("unterminated JSON array")
+            sep = buf[pos]
+            pos += 1
+            if sep == "]":
+                break
+            if sep != ",":
+                raise ValueError("expected ',' or ']' in JSON array")
+            _skip_ws()
+
+    _skip_ws()
+    if pos < len(buf):
+        raise ValueError("extra data after JSON array")
+
+
+def _streams_as_json_array(filepath, max_tokens):
+    """Check whether a file should be chunked with the streaming JSON reader
+
+    Only JSON files that are certainly over the chunk budget and start with
+    an array qualify; anything else takes the full-text path in chunk_file.
+
+    Args:
+        filepath (Path): Local file path
+        max_tokens (int): Target max tokens per chunk
+
+    Returns:
+        bool: True for large top-level JSON arrays
+    """
+    if os.path.splitext(str(filepath))[1].lower() != ".json":
+        return False
+    try:
+        # Only stream files that are certain to exceed the budget; smaller
+        # ones may fit in a single unchunked object
+        size = os.path.getsize(filepath)
+        if get_token_counter().min_tokens_for_size(size) <= max_tokens:
+            return False
+        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+            head = f.read(4096)
+    except OSError:
+        return False
+    return head.lstrip(" \t\n\r").startswith("[")
+
+
+def _iter_keyed_chunks(chunks, s3_key):
+    """Attach content-addressed keys to chunks, storing identical chunks once
+
+    Args:
+        chunks (iterable[tuple[str, str]]): (content, title) pairs
+        s3_key (str): Source file key
+
+    Yields:
+        tuple[str, str, str]: (chunk_key, content, title)
+    """
+    seen = set()
+    for content, title in chunks:
+        ck = _chunk_key(s3_key, _content_hash(content))
+        if ck not in seen:
+            seen.add(ck)
+            yield ck, content, title
+
+
+def iter_json_array_chunks(filepath, s3_key, max_tokens=800, thread_gap=None):
+    """Chunk a Slack-style JSON array export without loading it into memory
+
+    Messages are parsed one at a time and chunks are yielded as the token
+    budget fills, so peak memory is bounded by the chunk size. Grouping by
+    thread has to see the whole export first, but still only keeps the
+    formatted message text. Output is identical to chunk_file on the same file.
+
+    Args:
+        filepath (Path): Local file path (see _streams_as_json_array)
+        s3_key (str): Relative path / S3 key
+        max_tokens (int): Target max tokens per chunk
+        thread_gap (float or None): See chunk_slack_json
+
+    Yields:
+        tuple[str, str, str]: (chunk_key, content, title)
+
+    Raises:
+        ValueError: If the file is not a well-formed array with at least one
+            message; chunk_file then chunks the full text instead. Chunks
+            may already have been yielded when this is raised.
+    """
+    channel_name = os.path.basename(s3_key).replace(".json", "")
+    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+        chunks = _pack_slack(iter_json_array(f), s3_key, channel_name, max_tokens, thread_gap)
+        found = False
+        for chunk in _iter_keyed_chunks(chunks, s3_key):
+            found = True
+            yield chunk
+    if not found:
+        raise ValueError("no messages in JSON array")
+
+
+def chunk_file(filepath, s3_key, max_tokens=800, thread_gap=None, overlap=0):
     """Chunk a file based on its type
 
     Args:
         filepath (Path): Local file path
         s3_key (str): Relative path / S3 key
         max_tokens (int): Target max tokens per chunk
+        thread_gap (float or None): Slack grouping, see chunk_slack_json
+        overlap (int): Markdown chunk overlap in tokens, see chunk_markdown
 
     Returns:
         list[tuple[str, str, str]]: List of (chunk_key, content, title)
     """
+    if _streams_as_json_array(filepath, max_tokens):
+        try:
+            return list(iter_json_array_chunks(filepath, s3_key, max_tokens, thread_gap))
+        except (ValueError, IOError):
+            pass  # Not a plain message array: chunk the full text below
+
     try:
         with open(filepath, "r", encoding="utf-8", errors="replace") as f:
             text = f.read()
@@ -355,23 +1158,18 @@ def chunk_file(filepath, s3_key, max_tokens=800):
         return []
 
     # Small files don't need chunking - return as-is without metadata wrapping
-    if _estimate_tokens(text) <= max_tokens:
+    if not _exceeds_tokens(text, max_tokens):
         return [(s3_key, text, "")]
 
     # Route by file type
     ext = os.path.splitext(str(filepath))[1].lower()
     if ext == ".json":
-        chunks = chunk_slack_json(text, s3_key, max_tokens)
+        chunks = chunk_slack_json(text, s3_key, max_tokens, thread_gap)
     else:
-        chunks = chunk_markdown(text, s3_key, max_tokens)
+        chunks = chunk_markdown(text, s3_key, max_tokens, overlap)
 
-    # Generate chunk keys
-    result = []
-    for idx, (content, title) in enumerate(chunks, 1):
-        ck = _chunk_key(s3_key, idx)
-        result.append((ck, content, title))
-
-    return result
+    # Generate content-addressed chunk keys (identical chunks are stored once)
+    return list(_iter_keyed_chunks(chunks, s3_key))
 
 
 # ---------------------------------------------------------------------------
@@ -379,49 +1177,175 @@ def chunk_file(filepath, s3_key, max_tokens=800):
 # ---------------------------------------------------------------------------
 
 class SyncState:
-    """Manages sync state tracking with file hashes and chunk mappings"""
+    """Manages sync state tracking with file hashes and chunk mappings
+
+    State lives in a SQLite database in WAL mode with one table per mapping,
+    so updates are written row by row instead of rewriting a whole document.
+    Statements outside transaction() commit immediately; wrap related updates
+    in transaction() to commit them atomically. An existing JSON state file
+    from older versions is imported once and renamed to ``*.migrated``.
+    """
+
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS files (
+            key TEXT PRIMARY KEY,
+            hash TEXT,
+            size INTEGER,
+            mtime_ns INTEGER,
+            inode INTEGER
+        )""",
+        """CREATE TABLE IF NOT EXISTS chunk_map (
+            source TEXT NOT NULL,
+            chunk_key TEXT NOT NULL,
+            PRIMARY KEY (source, chunk_key)
+        )""",
+        "CREATE INDEX IF NOT EXISTS chunk_map_chunk_key ON chunk_map (chunk_key)",
+        """CREATE TABLE IF NOT EXISTS chunk_hashes (
+            source TEXT NOT NULL,
+            object_key TEXT NOT NULL,
+            content_hash TEXT,
+            PRIMARY KEY (source, object_key)
+        )""",
+        "CREATE INDEX IF NOT EXISTS chunk_hashes_object_key ON chunk_hashes (object_key)",
+        "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)",
+    )
 
-    def __init__(self, state_file=".sync-state.json"):
+    def __init__(self, state_file=".sync-state.db", legacy_file=".sync-state.json"):
         self.state_file = state_file
-        self.state = self._load_state()
+        self.legacy_file = legacy_file
+        self._depth = 0
+        # Autocommit mode; transaction() issues BEGIN/COMMIT explicitly
+        self.conn = sqlite3.connect(state_file, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self._SCHEMA:
+            self.conn.execute(statement)
+        self._migrate_json()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Group updates into a single atomic commit (nestable)"""
+        if self._depth == 0:
+            self.conn.execute("BEGIN IMMEDIATE")
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.execute("ROLLBACK")
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self.conn.execute("COMMIT")
+
+    def _migrate_json(self):
+        """Import a legacy JSON state file once, then rename it"""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        if self._get_meta("migrated_from_json"):
+            return
+        try:
+            with open(self.legacy_file, "r") as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print("Warning: Could not migrate %s: %s" % (self.legacy_file, e), file=sys.stderr)
+            return
+
+        with self.transaction():
+            for key, file_hash in legacy.get("file_hashes", {}).items():
+                self.set_file_hash(key, file_hash)
+            for key, stat in legacy.get("file_stats", {}).items():
+                self.set_file_stat(key, stat)
+            for source, chunk_keys in legacy.get("chunk_map", {}).items():
+                self.set_chunk_keys(source, chunk_keys)
+            for source, hashes in legacy.get("chunk_hashes", {}).items():
+                self.set_chunk_hashes(source, hashes)
+            if legacy.get("last_sync"):
+                self._set_meta("last_sync", legacy["last_sync"])
+            self._set_meta("migrated_from_json", self.legacy_file)
 
-    def _load_state(self):
-        """Load sync state from disk"""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                pass
-        return {"file_hashes": {}, "chunk_map": {}, "last_sync": None}
+        try:
+            os.replace(self.legacy_file, self.legacy_file + ".migrated")
+        except OSError:
+            pass
+
+    def _get_meta(self, name):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value)
+        )
+
+    def get_chunking_fingerprint(self):
+        """Get the chunking fingerprint recorded by the last complete sync"""
+        return self._get_meta("chunking_fingerprint")
+
+    def set_chunking_fingerprint(self, fingerprint):
+        """Record the chunking fingerprint every tracked file was chunked with"""
+        self._set_meta("chunking_fingerprint", fingerprint)
 
     def save_state(self):
-        """Save sync state to disk"""
-        self.state["last_sync"] = datetime.datetime.utcnow().isoformat()
+        """Record the sync time (updates are already committed as they happen)"""
         try:
-            with open(self.state_file, "w") as f:
-                json.dump(self.state, f, indent=2)
-        except IOError as e:
+            self._set_meta("last_sync", datetime.datetime.utcnow().isoformat())
+        except sqlite3.Error as e:
             print("Warning: Could not save sync state: %s" % e, file=sys.stderr)
 
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
     def get_file_hash(self, filepath):
         """Get stored hash for a file"""
-        return self.state["file_hashes"].get(str(filepath))
+        row = self.conn.execute(
+            "SELECT hash FROM files WHERE key = ?", (str(filepath),)
+        ).fetchone()
+        return row[0] if row else None
 
     def set_file_hash(self, filepath, file_hash):
         """Store hash for a file"""
-        self.state["file_hashes"][str(filepath)] = file_hash
+        self.conn.execute(
+            "INSERT INTO files (key, hash) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET hash = excluded.hash",
+            (str(filepath), file_hash),
+        )
+
+    def get_file_stat(self, filepath):
+        """Get stored (size, mtime_ns, inode) for a file
+
+        Returns:
+            tuple or None: Stat signature recorded with the file's hash
+        """
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, inode FROM files WHERE key = ?", (str(filepath),)
+        ).fetchone()
+        return tuple(row) if row and row[0] is not None else None
+
+    def set_file_stat(self, filepath, stat):
+        """Store (size, mtime_ns, inode) for a file"""
+        size, mtime_ns, inode = stat
+        self.conn.execute(
+            "INSERT INTO files (key, size, mtime_ns, inode) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET size = excluded.size, "
+            "mtime_ns = excluded.mtime_ns, inode = excluded.inode",
+            (str(filepath), size, mtime_ns, inode),
+        )
 
     def remove_file(self, filepath):
         """Remove file from sync state"""
-        self.state["file_hashes"].pop(str(filepath), None)
+        self.conn.execute("DELETE FROM files WHERE key = ?", (str(filepath),))
 
     def get_tracked_files(self):
         """Get set of all tracked files (including chunk keys)"""
-        tracked = set(self.state["file_hashes"].keys())
-        for chunks in self.state.get("chunk_map", {}).values():
-            tracked.update(chunks)
-        return tracked
+        rows = self.conn.execute(
+            "SELECT key FROM files WHERE hash IS NOT NULL "
+            "UNION SELECT chunk_key FROM chunk_map "
+            "UNION SELECT object_key FROM chunk_hashes"
+        )
+        return {row[0] for row in rows}
 
     def get_chunk_keys(self, source_key):
         """Get list of chunk keys for a source file
@@ -432,7 +1356,11 @@ class SyncState:
         Returns:
             list[str]: List of chunk keys
         """
-        return self.state.get("chunk_map", {}).get(source_key, [])
+        rows = self.conn.execute(
+            "SELECT chunk_key FROM chunk_map WHERE source = ? ORDER BY chunk_key",
+            (source_key,),
+        )
+        return [row[0] for row in rows]
 
     def set_chunk_keys(self, source_key, chunk_keys):
         """Store chunk key mapping for a source file
@@ -441,9 +1369,12 @@ class SyncState:
             source_key (str): Original file S3 key
             chunk_keys (list[str]): Chunk keys produced
         """
-        if "chunk_map" not in self.state:
-            self.state["chunk_map"] = {}
-        self.state["chunk_map"][source_key] = chunk_keys
+        with self.transaction():
+            self.conn.execute("DELETE FROM chunk_map WHERE source = ?", (source_key,))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO chunk_map (source, chunk_key) VALUES (?, ?)",
+                [(source_key, ck) for ck in chunk_keys],
+            )
 
     def remove_chunks(self, source_key):
         """Remove chunk mapping for a source file
@@ -454,7 +1385,51 @@ class SyncState:
         Returns:
             list[str]: Old chunk keys that were tracked
         """
-        return self.state.get("chunk_map", {}).pop(source_key, [])
+        with self.transaction():
+            old_keys = self.get_chunk_keys(source_key)
+            self.conn.execute("DELETE FROM chunk_map WHERE source = ?", (source_key,))
+            self.conn.execute("DELETE FROM chunk_hashes WHERE source = ?", (source_key,))
+        return old_keys
+
+    def get_chunk_hashes(self, source_key):
+        """Get content hashes of the objects uploaded for a source file
+
+        Args:
+            source_key (str): Original file S3 key
+
+        Returns:
+            dict[str, str]: Object key -> content hash (empty if unknown)
+        """
+        rows = self.conn.execute(
+            "SELECT object_key, content_hash FROM chunk_hashes WHERE source = ?",
+            (source_key,),
+        )
+        return {key: content_hash for key, content_hash in rows}
+
+    def set_chunk_hashes(self, source_key, hashes):
+        """Store content hashes of the objects uploaded for a source file
+
+        Args:
+            source_key (str): Original file S3 key
+            hashes (dict[str, str]): Object key -> content hash
+        """
+        with self.transaction():
+            self.conn.execute("DELETE FROM chunk_hashes WHERE source = ?", (source_key,))
+            self.conn.executemany(
+                "INSERT INTO chunk_hashes (source, object_key, content_hash) VALUES (?, ?, ?)",
+                [(source_key, key, content_hash) for key, content_hash in hashes.items()],
+            )
+
+    def get_chunked_sources(self):
+        """Get source keys that have a chunk mapping
+
+        Returns:
+            list[str]: Source file keys
+        """
+        rows = self.conn.execute(
+            "SELECT source FROM chunk_map UNION SELECT source FROM chunk_hashes ORDER BY 1"
+        )
+        return [row[0] for row in rows]
 
     def get_all_chunk_keys(self):
         """Get all chunk keys across all source files
@@ -462,37 +1437,304 @@ class SyncState:
         Returns:
             set[str]: All chunk keys
         """
-        result = set()
-        for chunks in self.state.get("chunk_map", {}).values():
-            result.update(chunks)
-        return result
+        rows = self.conn.execute("SELECT DISTINCT chunk_key FROM chunk_map")
+        return {row[0] for row in rows}
+
+
+# ---------------------------------------------------------------------------
+# HTTP connection pool
+# ---------------------------------------------------------------------------
+
+# Errors that mean a kept-alive connection was closed by the server while idle
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of keep-alive HTTPS connections, keyed by host
+
+    Reusing connections avoids a TCP and TLS handshake per request. At most
+    max_per_host connections to a host exist at once; idle connections are
+    closed after idle_timeout seconds, and a request that fails because the
+    server dropped an idle connection is retried once on a fresh one.
+
+    Like urllib, the pool honours HTTPS_PROXY/https_proxy (and NO_PROXY):
+    connections to a proxied host are CONNECT tunnels through the proxy.
+    Only http:// proxy URLs are supported (port 80 unless given).
+    """
+
+    def __init__(self, max_per_host=8, idle_timeout=30.0):
+        self.max_per_host = max(1, max_per_host)
+        self.idle_timeout = idle_timeout
+        self._idle = {}  # host -> list of (connection, last_used)
+        self._slots = {}  # host -> BoundedSemaphore
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+        self._proxies = urllib.request.getproxies()
+
+    def _proxy_for(self, host):
+        """Get the proxy URL to tunnel through for host, or None"""
+        proxy = self._proxies.get("https")
+        if not proxy or urllib.request.proxy_bypass(host.split(":", 1)[0]):
+            return None
+        return proxy
+
+    def _slot(self, host):
+        """Get the semaphore bounding connections to a host"""
+        with self._lock:
+            slot = self._slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self._slots[host] = slot
+            return slot
+
+    def _checkout(self, host, timeout):
+        """Take an idle connection for host, or open a new one
+
+        Returns:
+            tuple: (connection, reused)
+        """
+        now = time.monotonic()
+        conn = None
+        with self._lock:
+            idle = self._idle.get(host, [])
+            while idle:
+                candidate, last_used = idle.pop()
+                if now - last_used <= self.idle_timeout:
+                    conn = candidate
+                    break
+                candidate.close()
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        return self._connect(host, timeout), False
+
+    def _connect(self, host, timeout):
+        """Open a new HTTPS connection to host, tunnelled through a proxy if set"""
+        proxy = self._proxy_for(host)
+        if proxy is None:
+            return http.client.HTTPSConnection(host, timeout=timeout, context=self._ssl_context)
+
+        if "://" not in proxy:
+            proxy = "http://" + proxy
+        parts = urllib.parse.urlsplit(proxy)
+        if parts.scheme != "http":
+            # The CONNECT request goes to the proxy in plain text; TLS to the
+            # proxy itself is not supported
+            raise OSError("Unsupported proxy %s: only http:// proxies are supported" % proxy)
+        conn = http.client.HTTPSConnection(
+            parts.hostname, parts.port or 80, timeout=timeout, context=self._ssl_context
+        )
+        tunnel_headers = {}
+        if parts.username:
+            credentials = "%s:%s" % (
+                urllib.parse.unquote(parts.username), urllib.parse.unquote(parts.password or "")
+            )
+            tunnel_headers["Proxy-Authorization"] = (
+                "Basic " + base64.b64encode(credentials.encode()).decode()
+            )
+        conn.set_tunnel(host, headers=tunnel_headers)
+        return conn
+
+    def _checkin(self, host, conn):
+        """Return a connection to the idle list"""
+        with self._lock:
+            self._idle.setdefault(host, []).append((conn, time.monotonic()))
+
+    def request(self, method, url, body=None, headers=None, timeout=30):
+        """Send a request over a pooled connection and read the full response
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute https:// URL
+            body (bytes or None): Request body
+            headers (dict): Request headers
+            timeout (int): Socket timeout in seconds
+
+        Returns:
+            tuple[int, bytes]: (status_code, response_body)
+
+        Raises:
+            OSError, http.client.HTTPException: On network failure
+        """
+        parts = urllib.parse.urlsplit(url)
+        host = parts.netloc
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        with self._slot(host):
+            conn, reused = self._checkout(host, timeout)
+            while True:
+                try:
+                    conn.request(method, target, body=body, headers=headers or {})
+                    response = conn.getresponse()
+                    data = response.read()
+                except _STALE_CONNECTION_ERRORS:
+                    conn.close()
+                    if not reused:
+                        raise
+                    # Server closed the idle connection; retry once on a new one
+                    conn, reused = self._connect(host, timeout), False
+                    continue
+                except Exception:
+                    conn.close()
+                    raise
+                break
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(host, conn)
+            return response.status, data
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+_http_pool = None
+_http_pool_lock = threading.Lock()
+
+
+def get_http_pool(max_per_host=8):
+    """Get the process-wide connection pool, creating it on first use
+
+    Args:
+        max_per_host (int): Connection limit per host (first call only)
+
+    Returns:
+        HTTPConnectionPool: Shared pool
+    """
+    global _http_pool
+    with _http_pool_lock:
+        if _http_pool is None:
+            _http_pool = HTTPConnectionPool(max_per_host)
+        return _http_pool
 
 
 # ---------------------------------------------------------------------------
 # S3 Client
 # ---------------------------------------------------------------------------
 
+def _xml_tag(element):
+    """Get an XML element's tag without its namespace"""
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _s3_error_code(body):
+    """Get the <Code> of an S3 XML error response, or "" if there is none"""
+    try:
+        root = ElementTree.fromstring(body)
+    except ElementTree.ParseError:
+        return ""
+    for el in root.iter():
+        if _xml_tag(el) == "Code":
+            return (el.text or "").strip()
+    return ""
+
+
+class SigV4Signer:
+    """AWS SigV4 signer with a cached per-day signing key
+
+    The four-step HMAC key derivation and the credential scope only depend
+    on the date, region and service, so they are computed once per day and
+    reused by every request. Safe to share between threads.
+    """
+
+    ALGORITHM = "AWS4-HMAC-SHA256"
+
+    def __init__(self, access_key, secret_key, region, service="s3"):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.service = service
+        self._scope_suffix = "/%s/%s/aws4_request" % (region, service)
+        self._cached = None  # (date_stamp, signing_key, credential_scope, credential)
+        self._signed_headers = {}  # tuple of header names -> "a;b;c"
+
+    def _scope(self, date_stamp):
+        """Get (signing_key, credential_scope, credential) for a date stamp"""
+        cached = self._cached
+        if cached is not None and cached[0] == date_stamp:
+            return cached[1], cached[2], cached[3]
+
+        k_date = hmac.new(
+            ("AWS4" + self.secret_key).encode("utf-8"), date_stamp.encode("utf-8"), hashlib.sha256
+        ).digest()
+        k_region = hmac.new(k_date, self.region.encode("utf-8"), hashlib.sha256).digest()
+        k_service = hmac.new(k_region, self.service.encode("utf-8"), hashlib.sha256).digest()
+        signing_key = hmac.new(k_service, b"aws4_request", hashlib.sha256).digest()
+        credential_scope = date_stamp + self._scope_suffix
+        credential = "%s/%s" % (self.access_key, credential_scope)
+        # Single tuple assignment, so concurrent readers never see a mixed state
+        self._cached = (date_stamp, signing_key, credential_scope, credential)
+        return signing_key, credential_scope, credential
+
+    def sign(self, method, path, headers, payload_hash, query=""):
+        """Compute the Authorization header for a request
+
+        Args:
+            method (str): HTTP method
+            path (str): URI-encoded request path
+            headers (dict): Lowercase header names to sign (must include host,
+                x-amz-date and x-amz-content-sha256)
+            payload_hash (str): Hex SHA-256 of the payload
+            query (str): Canonical (sorted, encoded) query string
+
+        Returns:
+            str: Authorization header value
+        """
+        amz_date = headers["x-amz-date"]
+        names = tuple(sorted(headers))
+        signed_headers = self._signed_headers.get(names)
+        if signed_headers is None:
+            signed_headers = ";".join(names)
+            self._signed_headers[names] = signed_headers
+
+        canonical_headers = "".join("%s:%s\n" % (k, headers[k]) for k in names)
+        canonical_request = "%s\n%s\n%s\n%s\n%s\n%s" % (
+            method, path, query, canonical_headers, signed_headers, payload_hash
+        )
+
+        signing_key, credential_scope, credential = self._scope(amz_date[:8])
+        string_to_sign = "%s\n%s\n%s\n%s" % (
+            self.ALGORITHM,
+            amz_date,
+            credential_scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        )
+        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        return "%s Credential=%s, SignedHeaders=%s, Signature=%s" % (
+            self.ALGORITHM, credential, signed_headers, signature
+        )
+
+
 class TelnyxS3Client:
     """Clean S3 client for Telnyx Cloud Storage using AWS SigV4"""
 
-    def __init__(self, api_key, region):
+    def __init__(self, api_key, region, pool=None):
         self.api_key = api_key
         self.region = region
         self.secret_key = "placeholder"  # Telnyx uses API key as access key
+        self.pool = pool or get_http_pool()
+        self.signer = SigV4Signer(api_key, self.secret_key, region)
+        self.batch_delete_supported = True
 
-    def _sign(self, key, msg):
-        """AWS SigV4 signing helper"""
-        return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
-
-    def _get_signature_key(self, date_stamp):
-        """Generate AWS SigV4 signing key"""
-        k_date = self._sign(("AWS4" + self.secret_key).encode("utf-8"), date_stamp)
-        k_region = self._sign(k_date, self.region)
-        k_service = self._sign(k_region, "s3")
-        k_signing = self._sign(k_service, "aws4_request")
-        return k_signing
-
-    def _make_request(self, method, bucket, key, payload=b"", content_type=None, extra_headers=None):
+    def _make_request(self, method, bucket, key, payload=b"", content_type=None, extra_headers=None,
+                      query=None):
         """Make authenticated S3 request"""
         host = (
             "%s.%s.telnyxcloudstorage.com" % (bucket, self.region)
@@ -500,11 +1742,14 @@ class TelnyxS3Client:
             else "%s.telnyxcloudstorage.com" % self.region
         )
         path = "/%s" % key if key else "/"
+        canonical_query = ""
+        if query:
+            canonical_query = "&".join(
+                "%s=%s" % (urllib.parse.quote(k, safe="-_.~"), urllib.parse.quote(v, safe="-_.~"))
+                for k, v in sorted(query.items())
+            )
 
-        t = datetime.datetime.utcnow()
-        amz_date = t.strftime("%Y%m%dT%H%M%SZ")
-        date_stamp = t.strftime("%Y%m%d")
-
+        amz_date = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         payload_hash = hashlib.sha256(payload).hexdigest()
 
         headers = {
@@ -520,33 +1765,12 @@ class TelnyxS3Client:
         if extra_headers:
             headers.update(extra_headers)
 
-        canonical_headers = "".join("%s:%s\n" % (k, v) for k, v in sorted(headers.items()))
-        signed_headers = ";".join(sorted(headers.keys()))
-
-        canonical_request = "%s\n%s\n\n%s\n%s\n%s" % (
-            method, path, canonical_headers, signed_headers, payload_hash
-        )
-
-        algorithm = "AWS4-HMAC-SHA256"
-        credential_scope = "%s/%s/s3/aws4_request" % (date_stamp, self.region)
-        string_to_sign = "%s\n%s\n%s\n%s" % (
-            algorithm,
-            amz_date,
-            credential_scope,
-            hashlib.sha256(canonical_request.encode()).hexdigest(),
-        )
-
-        signing_key = self._get_signature_key(date_stamp)
-        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
-
-        auth = "%s Credential=%s/%s, SignedHeaders=%s, Signature=%s" % (
-            algorithm, self.api_key, credential_scope, signed_headers, signature
-        )
-
         request_headers = {
             "x-amz-date": amz_date,
             "x-amz-content-sha256": payload_hash,
-            "Authorization": auth,
+            "Authorization": self.signer.sign(
+                method, path, headers, payload_hash, canonical_query
+            ),
         }
         if content_type:
             request_headers["Content-Type"] = content_type
@@ -556,15 +1780,14 @@ class TelnyxS3Client:
             request_headers.update(extra_headers)
 
         url = "https://%s%s" % (host, path)
-        req = urllib.request.Request(
-            url, data=payload if payload else None, headers=request_headers, method=method
-        )
+        if canonical_query:
+            url += "?" + canonical_query
 
         try:
-            with urllib.request.urlopen(req, timeout=30) as response:
-                return response.status, response.read().decode("utf-8", errors="ignore")
-        except urllib.error.HTTPError as e:
-            return e.code, e.read().decode("utf-8", errors="ignore")
+            status, body = self.pool.request(
+                method, url, body=payload if payload else None, headers=request_headers
+            )
+            return status, body.decode("utf-8", errors="ignore")
         except Exception as e:
             return 0, str(e)
 
@@ -589,23 +1812,191 @@ class TelnyxS3Client:
         status, _ = self._make_request("HEAD", bucket, key)
         return status == 200
 
+    def iter_objects(self, bucket, prefix="", delimiter=None, page_size=1000):
+        """Iterate over objects in a bucket using paginated ListObjectsV2
+
+        Follows continuation tokens and yields each page's entries as soon as
+        the page arrives, so buckets of any size are listed in full without
+        holding the whole listing in memory.
+
+        Args:
+            bucket (str): Bucket name
+            prefix (str): Only list keys starting with this prefix
+            delimiter (str): Group keys sharing a prefix up to this delimiter
+            page_size (int): Keys per request (max 1000)
+
+        Yields:
+            dict: {key, size, etag, last_modified}. With a delimiter, grouped
+                prefixes are yielded as {key, size, etag, last_modified, prefix: True}
+
+        Raises:
+            RuntimeError: If a page request fails or returns invalid XML
+        """
+        token = None
+        while True:
+            query = {"list-type": "2", "max-keys": str(page_size)}
+            if prefix:
+                query["prefix"] = prefix
+            if delimiter:
+                query["delimiter"] = delimiter
+            if token:
+                query["continuation-token"] = token
+
+            status, body = self._make_request("GET", bucket, "", query=query)
+            if status != 200:
+                raise RuntimeError("List failed (HTTP %s): %s" % (status, body[:200]))
+            try:
+                root = ElementTree.fromstring(body)
+            except ElementTree.ParseError as e:
+                raise RuntimeError("List failed (invalid XML): %s" % e)
+
+            truncated = False
+            token = None
+            for el in root:
+                tag = _xml_tag(el)
+                if tag == "Contents":
+                    fields = {_xml_tag(child): child.text or "" for child in el}
+                    yield {
+                        "key": fields.get("Key", ""),
+                        "size": int(fields.get("Size") or 0),
+                        "etag": fields.get("ETag", "").strip('"'),
+                        "last_modified": fields.get("LastModified", ""),
+                    }
+                elif tag == "CommonPrefixes":
+                    fields = {_xml_tag(child): child.text or "" for child in el}
+                    yield {
+                        "key": fields.get("Prefix", ""),
+                        "size": 0,
+                        "etag": "",
+                        "last_modified": "",
+                        "prefix": True,
+                    }
+                elif tag == "IsTruncated":
+                    truncated = (el.text or "").strip().lower() == "true"
+                elif tag == "NextContinuationToken":
+                    token = el.text
+
+            if not truncated or not token:
+                return
+
     def list_objects(self, bucket, prefix=""):
-        """List objects in bucket"""
-        query = "?prefix=%s" % urllib.parse.quote(prefix) if prefix else ""
-        status, body = self._make_request("GET", bucket, "" + query)
-
-        if status == 200:
-            files = []
-            for match in re.finditer(r"<Key>([^<]+)</Key>", body):
-                files.append(match.group(1))
-            return files
-        return []
+        """List all object keys in bucket
+
+        Returns:
+            list[str]: Object keys, or an empty list if listing fails
+        """
+        try:
+            return [obj["key"] for obj in self.iter_objects(bucket, prefix)]
+        except RuntimeError:
+            return []
 
     def delete_object(self, bucket, key):
         """Delete object from bucket"""
         status, _ = self._make_request("DELETE", bucket, key)
         return status in [200, 204]
 
+    # S3 caps DeleteObjects at 1,000 keys per request
+    MAX_DELETE_BATCH = 1000
+    # Error codes of a 400 that mean DeleteObjects itself is not available
+    BATCH_DELETE_UNSUPPORTED = ("NotImplemented", "MethodNotAllowed")
+
+    def delete_objects(self, bucket, keys):
+        """Delete many objects using batched DeleteObjects requests
+
+        Keys are sent up to MAX_DELETE_BATCH per request. If the endpoint
+        does not support multi-object delete (HTTP 405/501, or a 400 with a
+        NotImplemented-style code), the batch falls back to single deletes
+        run in parallel (and later calls skip straight to the fallback).
+        Other failed batch requests fall back for that batch only.
+
+        Args:
+            bucket (str): Bucket name
+            keys (iterable[str]): Keys to delete
+
+        Returns:
+            tuple[list[str], dict]: (deleted_keys, {failed_key: error_message})
+
+        Raises:
+            RuntimeError: If the endpoint rejects the credentials (HTTP 401/403)
+        """
+        keys = list(dict.fromkeys(keys))
+        deleted = []
+        failed = {}
+        for start in range(0, len(keys), self.MAX_DELETE_BATCH):
+            batch = keys[start:start + self.MAX_DELETE_BATCH]
+            result = None
+            if self.batch_delete_supported:
+                result = self._delete_batch(bucket, batch)
+            if result is None:
+                result = self._delete_parallel(bucket, batch)
+            deleted.extend(result[0])
+            failed.update(result[1])
+        return deleted, failed
+
+    def _delete_batch(self, bucket, keys):
+        """Delete up to MAX_DELETE_BATCH keys with one DeleteObjects request
+
+        Returns:
+            tuple[list[str], dict] or None: Result, or None if the endpoint
+                rejected the request and the caller should fall back
+
+        Raises:
+            RuntimeError: If the request is not authorized (HTTP 401/403)
+        """
+        body = "".join(
+            ['<?xml version="1.0" encoding="UTF-8"?>\n<Delete><Quiet>true</Quiet>']
+            + ["<Object><Key>%s</Key></Object>" % xml_escape(k) for k in keys]
+            + ["</Delete>"]
+        ).encode("utf-8")
+        content_md5 = base64.b64encode(hashlib.md5(body).digest()).decode()
+
+        status, response = self._make_request(
+            "POST", bucket, "", body, "application/xml",
+            extra_headers={"content-md5": content_md5}, query={"delete": ""},
+        )
+        if status in (401, 403):
+            # A signing or permission problem, not a missing API: per-object
+            # deletes would fail the same way
+            raise RuntimeError("Delete failed (HTTP %s): %s" % (status, response[:200]))
+        if status != 200:
+            if status in (405, 501) or (
+                status == 400 and _s3_error_code(response) in self.BATCH_DELETE_UNSUPPORTED
+            ):
+                self.batch_delete_supported = False
+            return None
+
+        try:
+            root = ElementTree.fromstring(response)
+        except ElementTree.ParseError:
+            return None
+
+        # Quiet mode only reports errors; everything else was deleted
+        failed = {}
+        for el in root:
+            if _xml_tag(el) == "Error":
+                fields = {_xml_tag(child): child.text or "" for child in el}
+                failed[fields.get("Key", "")] = "%s: %s" % (
+                    fields.get("Code", "Error"), fields.get("Message", "")
+                )
+        deleted = [k for k in keys if k not in failed]
+        return deleted, failed
+
+    def _delete_parallel(self, bucket, keys):
+        """Delete keys one request each, in parallel
+
+        Returns:
+            tuple[list[str], dict]: (deleted_keys, {failed_key: error_message})
+        """
+        deleted = []
+        failed = {}
+        with ThreadPoolExecutor(max_workers=self.pool.max_per_host) as pool:
+            for key, ok in zip(keys, pool.map(lambda k: self.delete_object(bucket, k), keys)):
+                if ok:
+                    deleted.append(key)
+                else:
+                    failed[key] = "DELETE failed"
+        return deleted, failed
+
     def create_bucket(self, bucket):
         """Create bucket in region"""
         bucket_config = (
@@ -618,10 +2009,7 @@ class TelnyxS3Client:
         host = "%s.telnyxcloudstorage.com" % self.region
         path = "/%s" % bucket
 
-        t = datetime.datetime.utcnow()
-        amz_date = t.strftime("%Y%m%dT%H%M%SZ")
-        date_stamp = t.strftime("%Y%m%d")
-
+        amz_date = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         payload = bucket_config.encode()
         payload_hash = hashlib.sha256(payload).hexdigest()
 
@@ -633,45 +2021,18 @@ class TelnyxS3Client:
             "content-length": str(len(payload)),
         }
 
-        canonical_headers = "".join("%s:%s\n" % (k, v) for k, v in sorted(headers.items()))
-        signed_headers = ";".join(sorted(headers.keys()))
-
-        canonical_request = "PUT\n%s\n\n%s\n%s\n%s" % (
-            path, canonical_headers, signed_headers, payload_hash
-        )
-
-        algorithm = "AWS4-HMAC-SHA256"
-        credential_scope = "%s/%s/s3/aws4_request" % (date_stamp, self.region)
-        string_to_sign = "%s\n%s\n%s\n%s" % (
-            algorithm,
-            amz_date,
-            credential_scope,
-            hashlib.sha256(canonical_request.encode()).hexdigest(),
-        )
-
-        signing_key = self._get_signature_key(date_stamp)
-        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
-
-        auth = "%s Credential=%s/%s, SignedHeaders=%s, Signature=%s" % (
-            algorithm, self.api_key, credential_scope, signed_headers, signature
-        )
-
         request_headers = {
             "x-amz-date": amz_date,
             "x-amz-content-sha256": payload_hash,
-            "Authorization": auth,
+            "Authorization": self.signer.sign("PUT", path, headers, payload_hash),
             "Content-Type": "application/xml",
             "Content-Length": str(len(payload)),
         }
 
         url = "https://%s%s" % (host, path)
-        req = urllib.request.Request(url, data=payload, headers=request_headers, method="PUT")
 
         try:
-            with urllib.request.urlopen(req, timeout=30) as response:
-                status = response.status
-        except urllib.error.HTTPError as e:
-            status = e.code
+            status, _ = self.pool.request("PUT", url, body=payload, headers=request_headers)
         except Exception:
             status = 0
 
@@ -714,16 +2075,50 @@ def load_credentials():
     return None
 
 
+# Files at least this large are memory-mapped and hashed in a single call
+_HASH_MMAP_THRESHOLD = 8 * 1024 * 1024
+_HASH_BUFFER_SIZE = 1024 * 1024
+
+
 def calculate_file_hash(filepath):
-    """Calculate SHA-256 hash of file contents"""
+    """Calculate SHA-256 hash of file contents
+
+    Small files are read in 1 MiB blocks into a reused buffer; large files
+    are memory-mapped so hashing needs no copies into Python.
+    """
     hash_sha256 = hashlib.sha256()
     try:
         with open(filepath, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
+            if os.fstat(f.fileno()).st_size >= _HASH_MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hash_sha256.update(mm)
+            else:
+                buf = bytearray(_HASH_BUFFER_SIZE)
+                view = memoryview(buf)
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    hash_sha256.update(view[:n])
         return hash_sha256.hexdigest()
-    except IOError:
+    except (IOError, ValueError):
+        return None
+
+
+def file_stat_signature(filepath):
+    """Get the (size, mtime_ns, inode) tuple used to detect unchanged files
+
+    Args:
+        filepath (Path): Local file path
+
+    Returns:
+        tuple or None: Stat signature, or None if the file cannot be stat'ed
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
         return None
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
 
 
 def get_files_to_sync(config):
@@ -762,13 +2157,11 @@ def make_api_request(method, endpoint, payload=None):
         "Content-Type": "application/json",
     }
 
-    req = urllib.request.Request(url, data=data, headers=headers, method=method)
-
     try:
-        with urllib.request.urlopen(req, timeout=60) as response:
-            return response.status, json.loads(response.read().decode())
-    except urllib.error.HTTPError as e:
-        return e.code, e.read().decode("utf-8", errors="ignore")
+        status, body = get_http_pool().request(method, url, body=data, headers=headers, timeout=60)
+        if status >= 400:
+            return status, body.decode("utf-8", errors="ignore")
+        return status, json.loads(body.decode())
     except Exception as e:
         return 0, str(e)
 
@@ -788,37 +2181,379 @@ def show_progress(current, total, prefix="Progress"):
 # Sync logic
 # ---------------------------------------------------------------------------
 
-def _delete_old_chunks(client, bucket, state, s3_key, quiet=False):
-    """Delete previously uploaded chunks for a source file
+def _uploaded_hashes(state, s3_key):
+    """Get {object_key: content_hash} last uploaded for a source file
+
+    State written before content hashes were tracked only has the chunk
+    key list; those keys map to None so they are treated as changed.
+
+    Args:
+        state (SyncState): Sync state
+        s3_key (str): Source file key
+
+    Returns:
+        dict[str, str or None]: Object key -> content hash
+    """
+    hashes = state.get_chunk_hashes(s3_key)
+    if hashes:
+        return hashes
+    return {ck: None for ck in state.get_chunk_keys(s3_key)}
+
+
+def chunking_fingerprint(config, max_tokens):
+    """Fingerprint the settings that decide chunk boundaries
+
+    Covers the chunk size, overlap, the active token counter (with a hash of
+    its vocab) and Slack grouping. Files are only re-chunked when their
+    content changes, so a sync whose fingerprint differs from the recorded
+    one treats every file as changed.
+
+    Args:
+        config (dict): Configuration
+        max_tokens (int): Effective chunk size
+
+    Returns:
+        str: Hex digest
+    """
+    counter = get_token_counter()
+    settings = {
+        "chunk_size": max_tokens,
+        "chunk_overlap": config.get("chunk_overlap", 0),
+        "tokenizer": counter.name,
+        "vocab": getattr(counter, "vocab_hash", None),
+        "slack_grouping": config.get("slack_grouping", "arrival"),
+        "slack_time_gap": slack_thread_gap(config),
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+
+def _check_file(local_path, s3_key, stored_hash, stored_stat=None, verify=False):
+    """Stat and hash a single file to decide whether it needs syncing
+
+    Args:
+        local_path (Path): Local file path
+        s3_key (str): Source file key
+        stored_hash (str or None): Hash recorded by the last successful sync
+        stored_stat (tuple or None): (size, mtime_ns, inode) recorded with stored_hash
+        verify (bool): Always rehash, even when the stat signature is unchanged
+
+    Returns:
+        dict: Result with status "changed", "skipped" or "failed"
+    """
+    result = {
+        "s3_key": s3_key,
+        "status": "failed",
+        "hash": None,
+        "stat": None,
+        "chunk_hashes": {},
+        "chunked": False,
+        "uploaded": [],
+        "unchanged": 0,
+        "deleted": [],
+        "failed_keys": [],
+        "reason": "",
+    }
+
+    # Stat before hashing so a write racing with the hash shows up next run
+    result["stat"] = file_stat_signature(local_path)
+    if not verify and stored_hash and result["stat"] and result["stat"] == stored_stat:
+        result["hash"] = stored_hash
+        result["status"] = "skipped"
+        return result
+
+    current_hash = calculate_file_hash(local_path)
+    if not current_hash:
+        result["reason"] = "could not read"
+        return result
+    result["hash"] = current_hash
+
+    if stored_hash == current_hash:
+        result["status"] = "skipped"
+        return result
+
+    result["status"] = "changed"
+    return result
+
+
+def _hashed_chunks(chunks):
+    """Turn (chunk_key, content, title) into (chunk_key, content, content_hash)"""
+    for ck, content, _ in chunks:
+        yield ck, content, _content_hash(content)
+
+
+def _prepare_file(local_path, s3_key, stored_hash, max_tokens, stored_stat=None, verify=False,
+                  thread_gap=None, overlap=0):
+    """Stat, hash and chunk a single file (pure CPU and disk, no network)
+
+    Takes and returns only picklable values so it can run in a worker
+    process as well as on a thread.
+
+    Args:
+        local_path (Path): Local file path
+        s3_key (str): Source file key
+        stored_hash (str or None): Hash recorded by the last successful sync
+        max_tokens (int): Target max tokens per chunk
+        stored_stat (tuple or None): (size, mtime_ns, inode) recorded with stored_hash
+        verify (bool): Always rehash, even when the stat signature is unchanged
+        thread_gap (float or None): Slack grouping, see chunk_slack_json
+        overlap (int): Markdown chunk overlap in tokens, see chunk_markdown
+
+    Returns:
+        dict: Result with status "changed", "skipped" or "failed"; "changed"
+            results carry (chunk_key, content, content_hash) tuples in "chunks"
+    """
+    result = _check_file(local_path, s3_key, stored_hash, stored_stat, verify)
+    result["chunks"] = []
+    if result["status"] == "changed":
+        result["chunks"] = list(_hashed_chunks(
+            chunk_file(local_path, s3_key, max_tokens, thread_gap, overlap)))
+    return result
+
+
+def _upload_chunks(client, bucket, result, old_hashes, chunks):
+    """Upload a file's chunks, diffing against what is already uploaded
+
+    Only chunks whose content hash differs from the last sync are uploaded,
+    and only keys that no longer exist are deleted. Chunks are consumed
+    lazily, so a streaming chunker keeps one chunk in memory at a time.
 
     Args:
         client (TelnyxS3Client): S3 client
         bucket (str): Bucket name
-        state (SyncState): Sync state
+        result (dict): "changed" result from _check_file (updated in place)
+        old_hashes (dict): Object key -> content hash from the last successful sync
+        chunks (iterable): (chunk_key, content, content_hash) tuples
+
+    Returns:
+        dict: The result with status "synced" or "failed"
+    """
+    for ck, content, content_hash in chunks:
+        result["chunk_hashes"][ck] = content_hash
+        if old_hashes.get(ck) == content_hash:
+            result["unchanged"] += 1
+        elif client.put_object(bucket, ck, content):
+            result["uploaded"].append(ck)
+        else:
+            result["failed_keys"].append(ck)
+    result["chunked"] = len(result["chunk_hashes"]) > 1
+
+    if not result["chunk_hashes"]:
+        result["status"] = "failed"
+        result["reason"] = "empty or unreadable"
+        return result
+
+    if result["failed_keys"]:
+        result["status"] = "failed"
+        return result
+
+    # Remove keys that disappeared only once the new chunks are in place
+    stale = [k for k in old_hashes if k not in result["chunk_hashes"]]
+    if stale:
+        try:
+            result["deleted"], failed = client.delete_objects(bucket, stale)
+        except RuntimeError as e:
+            result["reason"] = "could not delete old chunks: %s" % e
+            result["status"] = "failed"
+            return result
+        if failed:
+            result["failed_keys"].extend(sorted(failed))
+            result["reason"] = "could not delete %d old chunks" % len(failed)
+            result["status"] = "failed"
+            return result
+
+    result["status"] = "synced"
+    return result
+
+
+def _sync_one_file(client, bucket, local_path, s3_key, stored_hash, old_hashes, max_tokens,
+                   stored_stat=None, verify=False, thread_gap=None, overlap=0):
+    """Hash, chunk and upload a single file (runs on a worker thread)
+
+    Workers never touch SyncState; they return a result that the caller
+    applies, so state updates stay single-threaded and per-file atomic.
+    Large JSON array exports are chunked and uploaded as they stream in.
+
+    Args:
+        client (TelnyxS3Client): S3 client
+        bucket (str): Bucket name
+        local_path (Path): Local file path
         s3_key (str): Source file key
-        quiet (bool): Suppress output
+        stored_hash (str or None): Hash recorded by the last successful sync
+        old_hashes (dict): Object key -> content hash from the last successful sync
+        max_tokens (int): Target max tokens per chunk
+        stored_stat (tuple or None): (size, mtime_ns, inode) recorded with stored_hash
+        verify (bool): Always rehash, even when the stat signature is unchanged
+        thread_gap (float or None): Slack grouping, see chunk_slack_json
+        overlap (int): Markdown chunk overlap in tokens, see chunk_markdown
 
     Returns:
-        int: Number of chunks deleted
+        dict: Result with status ("synced", "skipped" or "failed") and details
     """
-    old_chunks = state.get_chunk_keys(s3_key)
-    deleted = 0
-    for ck in old_chunks:
-        if client.delete_object(bucket, ck):
-            deleted += 1
-            if not quiet:
-                print("  🗑️  %s" % ck)
-    return deleted
+    result = _check_file(local_path, s3_key, stored_hash, stored_stat, verify)
+    if result["status"] != "changed":
+        return result
+
+    if _streams_as_json_array(local_path, max_tokens):
+        streamed = _hashed_chunks(
+            iter_json_array_chunks(local_path, s3_key, max_tokens, thread_gap))
+        try:
+            return _upload_chunks(client, bucket, result, old_hashes, streamed)
+        except (ValueError, IOError):
+            # Not a plain message array after all. Chunk it the way chunk_file
+            # does, and treat anything the aborted pass uploaded as stale.
+            old_hashes = dict(old_hashes)
+            for ck in result["uploaded"]:
+                old_hashes.setdefault(ck, None)
+            result.update(chunk_hashes={}, uploaded=[], unchanged=0, failed_keys=[])
+
+    chunks = _hashed_chunks(chunk_file(local_path, s3_key, max_tokens, thread_gap, overlap))
+    return _upload_chunks(client, bucket, result, old_hashes, chunks)
+
+
+def _ordered_map(executor, fn, jobs, window):
+    """Like executor.map, but keeps at most `window` jobs in flight
+
+    Results are yielded in job order, so memory is bounded by the window
+    instead of by how far the workers run ahead of the consumer.
+
+    Args:
+        executor (Executor): Executor to run jobs on
+        fn (callable): Function to call
+        jobs (iterable[tuple]): Positional arguments for each call
+        window (int): Maximum jobs submitted but not yet consumed
 
+    Yields:
+        object: fn(*job) for each job, in order
+    """
+    pending = collections.deque()
+    jobs = iter(jobs)
+    for job in jobs:
+        pending.append(executor.submit(fn, *job))
+        if len(pending) >= window:
+            break
+    while pending:
+        result = pending.popleft().result()
+        job = next(jobs, None)
+        if job is not None:
+            pending.append(executor.submit(fn, *job))
+        yield result
+
+
+def _iter_process_chunked(pool, upload_workers, client, bucket, state, files, max_tokens,
+                          verify, chunk_workers, thread_gap=None, overlap=0, rechunk=False):
+    """Chunk files on a process pool and upload them on the thread pool
+
+    Files are hashed and chunked across cores and handed to the uploader in
+    file order. Uploads are throttled to the upload pool's capacity so chunk
+    contents do not pile up in memory. Runs on the main thread, which is the
+    only one that reads SyncState.
+
+    Args:
+        pool (ThreadPoolExecutor): Upload thread pool
+        upload_workers (int): Number of threads in the upload pool
+        client (TelnyxS3Client): S3 client
+        bucket (str): Bucket name
+        state (SyncState): Sync state (read only)
+        files (list[tuple[Path, str]]): (local_path, s3_key) pairs
+        max_tokens (int): Target max tokens per chunk
+        verify (bool): Always rehash
+        chunk_workers (int): Number of chunking processes
+        thread_gap (float or None): Slack grouping, see chunk_slack_json
+        overlap (int): Markdown chunk overlap in tokens, see chunk_markdown
+        rechunk (bool): Treat every file as changed (chunking settings changed)
+
+    Yields:
+        dict: Per-file results, as they finish
+    """
+    jobs = (
+        (local_path, s3_key, None if rechunk else state.get_file_hash(s3_key), max_tokens,
+         state.get_file_stat(s3_key), verify, thread_gap, overlap)
+        for local_path, s3_key in files
+    )
+    max_uploads = upload_workers * 2
+    uploads = set()
+
+    counter = get_token_counter()
+    with ProcessPoolExecutor(
+        max_workers=chunk_workers,
+        initializer=configure_token_counter,
+        initargs=(counter.name, getattr(counter, "ranks_file", None)),
+    ) as procs:
+        for prepared in _ordered_map(procs, _prepare_file, jobs, chunk_workers * 4):
+            if prepared["status"] != "changed":
+                yield prepared
+                continue
+            uploads.add(pool.submit(
+                _upload_chunks, client, bucket, prepared,
+                _uploaded_hashes(state, prepared["s3_key"]), prepared.pop("chunks"),
+            ))
+            done, uploads = wait(
+                uploads,
+                timeout=None if len(uploads) >= max_uploads else 0,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                yield future.result()
+
+    for future in as_completed(uploads):
+        yield future.result()
+
+
+def _apply_sync_result(state, result):
+    """Record a successful file sync in SyncState
+
+    Args:
+        state (SyncState): Sync state
+        result (dict): Result from _sync_one_file with status "synced"
+    """
+    s3_key = result["s3_key"]
+    # One transaction per file, so an interrupted sync keeps every file
+    # that finished and never records half of one
+    with state.transaction():
+        state.set_file_hash(s3_key, result["hash"])
+        if result["stat"]:
+            state.set_file_stat(s3_key, result["stat"])
+        if result["chunked"]:
+            state.set_chunk_keys(s3_key, sorted(result["chunk_hashes"]))
+        else:
+            # Single file, no chunk mapping needed — clear any old mapping
+            state.remove_chunks(s3_key)
+        state.set_chunk_hashes(s3_key, result["chunk_hashes"])
+
+
+def _invalidate_search_cache(bucket, quiet=False):
+    """Drop cached similarity search results for a bucket whose objects changed
+
+    Args:
+        bucket (str): Bucket name
+        quiet (bool): Suppress output
+    """
+    if not invalidate_bucket(bucket) and not quiet:
+        print("\n\u26a0\ufe0f  Could not invalidate cached search results for %s" % bucket)
 
-def sync_files(config, quiet=False, show_progress_bar=True, chunk_size_override=None):
+
+def sync_files(config, quiet=False, show_progress_bar=True, chunk_size_override=None,
+               concurrency=None, verify=False, chunk_workers=None):
     """Sync all configured files to the bucket with incremental updates and chunking
 
+    Files are processed by a bounded pool of worker threads, so hashing,
+    chunking, deletes and uploads of different files overlap. With more
+    than one chunk worker, hashing and chunking move to a process pool so
+    they use every core. SyncState is only updated for files whose chunks
+    all uploaded successfully. When the chunking settings differ from those
+    of the last complete sync (see chunking_fingerprint), every file is
+    re-chunked; chunks whose content is unchanged are still not uploaded.
+    If any object in the bucket was uploaded or deleted, the bucket's cached
+    search results are invalidated.
+
     Args:
         config (dict): Configuration
         quiet (bool): Suppress output
         show_progress_bar (bool): Show progress
         chunk_size_override (int or None): Override chunk size in tokens
+        concurrency (int or None): Override number of parallel file workers
+        verify (bool): Rehash every file instead of trusting unchanged size/mtime/inode
+        chunk_workers (int or None): Override number of chunking processes
 
     Returns:
         tuple[int, int]: (success_count, failed_count)
@@ -830,83 +2565,119 @@ def sync_files(config, quiet=False, show_progress_bar=True, chunk_size_override=
             print("Set TELNYX_API_KEY environment variable or create .env file")
         return 0, 0
 
-    client = TelnyxS3Client(api_key, config["region"])
+    client = TelnyxS3Client(
+        api_key, config["region"], get_http_pool(config.get("max_connections_per_host", 8))
+    )
     state = SyncState()
     files = get_files_to_sync(config)
     max_tokens = chunk_size_override or config.get("chunk_size", 800)
+    workers = max(1, concurrency or config.get("concurrency", 8))
+    chunk_workers = max(1, chunk_workers or config.get("workers", 1))
+    thread_gap = slack_thread_gap(config)
+    overlap = config.get("chunk_overlap", 0)
+    configure_token_counter(*tokenizer_settings(config))
+    fingerprint = chunking_fingerprint(config, max_tokens)
+    rechunk = state.get_chunking_fingerprint() != fingerprint
 
     if not quiet:
-        print("\n\U0001f504 Syncing %d files to %s (chunk size: %d tokens)" % (
-            len(files), config["bucket"], max_tokens))
+        print("\n\U0001f504 Syncing %d files to %s (chunk size: %d tokens, workers: %d)" % (
+            len(files), config["bucket"], max_tokens, workers))
+        if chunk_workers > 1:
+            print("   Chunking on %d processes" % chunk_workers)
         if not files:
             print("No files match the configured patterns.")
+            state.close()
             return 0, 0
+        if rechunk and state.get_tracked_files():
+            print("   Chunking settings changed: re-chunking every file")
         print()
 
     success = 0
     failed = 0
     skipped = 0
+    done = 0
+    uploaded_chunks = 0
+    unchanged_chunks = 0
+    bucket_changed = False
 
-    for i, (local_path, s3_key) in enumerate(files, 1):
-        if show_progress_bar and not quiet:
-            show_progress(i - 1, len(files), "Checking")
+    def _record(result):
+        nonlocal success, failed, skipped, done, uploaded_chunks, unchanged_chunks, bucket_changed
+        done += 1
+        s3_key = result["s3_key"]
 
-        current_hash = calculate_file_hash(local_path)
-        if not current_hash:
-            failed += 1
-            if not quiet:
-                print("\n  \u2717 %s (could not read)" % s3_key)
-            continue
+        if show_progress_bar and not quiet:
+            show_progress(done, len(files), "Syncing")
 
-        stored_hash = state.get_file_hash(s3_key)
-        if stored_hash == current_hash:
+        if result["status"] == "skipped":
             skipped += 1
-            continue
+            # Content unchanged but stat differs (e.g. touched): record the
+            # new signature so the next run can skip hashing
+            if result["stat"] and result["stat"] != state.get_file_stat(s3_key):
+                state.set_file_stat(s3_key, result["stat"])
+            return
+
+        if result["uploaded"] or result["deleted"]:
+            bucket_changed = True
+        if not quiet:
+            for ck in result["deleted"]:
+                print("\n  \U0001f5d1\ufe0f  %s" % ck)
 
-        # File changed or new — chunk and upload
-        chunks = chunk_file(local_path, s3_key, max_tokens)
-        if not chunks:
+        if result["status"] == "failed":
             failed += 1
             if not quiet:
-                print("\n  \u2717 %s (empty or unreadable)" % s3_key)
-            continue
-
-        # Delete old chunks first
-        _delete_old_chunks(client, config["bucket"], state, s3_key, quiet)
-
-        # Upload chunks (or the single file if no chunking needed)
-        chunk_keys = []
-        all_ok = True
-        for ck, content, title in chunks:
-            if client.put_object(config["bucket"], ck, content):
-                chunk_keys.append(ck)
-            else:
-                all_ok = False
-                if not quiet:
+                if result["reason"]:
+                    print("\n  \u2717 %s (%s)" % (s3_key, result["reason"]))
+                for ck in result["failed_keys"]:
                     print("\n  \u2717 %s" % ck)
+            return
 
-        if all_ok:
-            success += 1
-            state.set_file_hash(s3_key, current_hash)
-            if len(chunks) > 1:
-                state.set_chunk_keys(s3_key, chunk_keys)
-                if not quiet:
-                    print("\n  \u2713 %s (%d chunks)" % (s3_key, len(chunks)))
+        success += 1
+        uploaded_chunks += len(result["uploaded"])
+        unchanged_chunks += result["unchanged"]
+        _apply_sync_result(state, result)
+        if not quiet:
+            if result["chunked"]:
+                print("\n  \u2713 %s (%d chunks, %d uploaded)" % (
+                    s3_key, len(result["chunk_hashes"]), len(result["uploaded"])))
             else:
-                # Single file, no chunk mapping needed — clear any old mapping
-                state.remove_chunks(s3_key)
-                if not quiet:
-                    print("\n  \u2713 %s" % s3_key)
+                print("\n  \u2713 %s" % s3_key)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if chunk_workers > 1:
+            for result in _iter_process_chunked(
+                pool, workers, client, config["bucket"], state, files, max_tokens,
+                verify, chunk_workers, thread_gap, overlap, rechunk,
+            ):
+                _record(result)
         else:
-            failed += 1
+            futures = [
+                pool.submit(
+                    _sync_one_file, client, config["bucket"], local_path, s3_key,
+                    None if rechunk else state.get_file_hash(s3_key),
+                    _uploaded_hashes(state, s3_key), max_tokens,
+                    state.get_file_stat(s3_key), verify, thread_gap, overlap,
+                )
+                for local_path, s3_key in files
+            ]
+            for future in as_completed(futures):
+                _record(future.result())
 
     if show_progress_bar and not quiet:
         print()  # Final newline
 
+    # A failed file keeps its old chunks, so only a complete run may record
+    # that everything matches the current settings
+    if not failed:
+        state.set_chunking_fingerprint(fingerprint)
     state.save_state()
+    state.close()
+    if bucket_changed:
+        _invalidate_search_cache(config["bucket"], quiet)
 
     if not quiet:
         print("\n\u2705 Synced: %d | Skipped: %d | Failed: %d" % (success, skipped, failed))
+        if uploaded_chunks or unchanged_chunks:
+            print("   Chunks uploaded: %d | unchanged: %d" % (uploaded_chunks, unchanged_chunks))
 
     return success, failed
 
@@ -923,18 +2694,23 @@ def prune_orphaned_files(config, quiet=False):
     state = SyncState()
 
     local_files = set(s3_key for _, s3_key in get_files_to_sync(config))
+    # Keys still backed by a local file: the files themselves and their chunks
+    live_keys = set(local_files)
+    for k in local_files:
+        live_keys.update(state.get_chunk_keys(k))
 
-    bucket_files = set(client.list_objects(config["bucket"]))
     tracked_files = state.get_tracked_files()
 
-    orphaned = (bucket_files & tracked_files) - local_files
+    # Stream the bucket listing instead of materialising it
+    orphaned = set()
+    for obj in client.iter_objects(config["bucket"]):
+        if obj["key"] in tracked_files and obj["key"] not in live_keys:
+            orphaned.add(obj["key"])
     # Also include chunk keys whose source no longer exists
-    all_chunk_keys = state.get_all_chunk_keys()
-    orphaned = orphaned | (all_chunk_keys - set().union(
-        *(set(state.get_chunk_keys(k)) for k in local_files if state.get_chunk_keys(k))
-    ) if all_chunk_keys else set())
+    orphaned.update(state.get_all_chunk_keys() - live_keys)
 
     if not orphaned:
+        state.close()
         if not quiet:
             print("No orphaned files to remove.")
         return 0
@@ -942,18 +2718,28 @@ def prune_orphaned_files(config, quiet=False):
     if not quiet:
         print("\n\U0001f5d1\ufe0f  Removing %d orphaned files:" % len(orphaned))
 
-    removed = 0
-    for file_key in orphaned:
-        if client.delete_object(config["bucket"], file_key):
-            removed += 1
+    deleted, failed = client.delete_objects(config["bucket"], sorted(orphaned))
+    with state.transaction():
+        for file_key in deleted:
             state.remove_file(file_key)
             if not quiet:
                 print("  \u2713 Removed %s" % file_key)
-        else:
+        for file_key, error in sorted(failed.items()):
             if not quiet:
-                print("  \u2717 Failed to remove %s" % file_key)
+                print("  \u2717 Failed to remove %s (%s)" % (file_key, error))
+
+        # Forget chunk mappings of deleted sources once all their chunks are gone
+        for source_key in state.get_chunked_sources():
+            if source_key not in local_files and not any(
+                ck in failed for ck in state.get_chunk_keys(source_key)
+            ):
+                state.remove_chunks(source_key)
 
     state.save_state()
+    state.close()
+    removed = len(deleted)
+    if removed:
+        _invalidate_search_cache(config["bucket"], quiet)
 
     if not quiet:
         print("\n\u2705 Removed %d orphaned files" % removed)
@@ -971,6 +2757,8 @@ def trigger_embedding(config, quiet=False):
     })
 
     if status in [200, 201, 202]:
+        # Re-embedding changes what similarity search returns
+        _invalidate_search_cache(config["bucket"], quiet)
         if not quiet:
             print("\u2705 Embedding triggered successfully")
             if isinstance(response, dict) and "data" in response:
@@ -1023,12 +2811,19 @@ def list_bucket_files(config, quiet=False):
         return []
 
     client = TelnyxS3Client(api_key, config["region"])
-    files = client.list_objects(config["bucket"])
 
     if not quiet:
-        print("\n\U0001f4c1 Files in %s (%d):" % (config["bucket"], len(files)))
-        for f in sorted(files):
-            print("  %s" % f)
+        print("\n\U0001f4c1 Files in %s:" % config["bucket"])
+
+    # Keys arrive in sorted order, one page at a time
+    files = []
+    for obj in client.iter_objects(config["bucket"]):
+        files.append(obj["key"])
+        if not quiet:
+            print("  %s" % obj["key"])
+
+    if not quiet:
+        print("  (%d files)" % len(files))
 
     return files
 
@@ -1078,9 +2873,9 @@ def check_status(config, quiet=False):
             print("  \u2717 Bucket not found")
         return
 
-    files = client.list_objects(config["bucket"])
+    file_count = sum(1 for _ in client.iter_objects(config["bucket"]))
     if not quiet:
-        print("  \U0001f4c1 Files indexed: %d" % len(files))
+        print("  \U0001f4c1 Files indexed: %d" % file_count)
 
     if not quiet:
         print("  \U0001f9e0 Testing embeddings...")
@@ -1100,77 +2895,456 @@ def check_status(config, quiet=False):
             print("  \u2753 Embedding status unclear: %s" % test_status)
 
 
-def watch_files(config, quiet=False):
-    """Watch for file changes and sync in real-time"""
+# ---------------------------------------------------------------------------
+# Watch mode
+# ---------------------------------------------------------------------------
+
+# inotify event flags (see <sys/inotify.h>)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_WATCH_MASK = (
+    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+    | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Directory watcher backed by Linux inotify (through ctypes)
+
+    Raises:
+        OSError: If inotify is unavailable on this system
+    """
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, "inotify_init1 failed: %s" % os.strerror(err))
+        self._wd_dirs = {}  # watch descriptor -> directory
+        self._dir_wds = {}  # directory -> watch descriptor
+
+    def set_dirs(self, dirs):
+        """Watch exactly the given directories
+
+        Args:
+            dirs (set[Path]): Directories to watch
+        """
+        for d in set(self._dir_wds) - dirs:
+            wd = self._dir_wds.pop(d)
+            self._wd_dirs.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+        for d in dirs - set(self._dir_wds):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(d)), _IN_WATCH_MASK)
+            if wd >= 0:
+                self._dir_wds[d] = wd
+                self._wd_dirs[wd] = d
+
+    def wait(self, timeout):
+        """Block until events arrive or timeout expires
+
+        Args:
+            timeout (float): Max seconds to wait
+
+        Returns:
+            tuple[set[Path], bool]: (changed file paths, rescan needed). A
+                rescan is requested when directories appear or vanish, or
+                when the kernel event queue overflowed.
+        """
+        ready, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not ready:
+            return set(), False
+
+        data = os.read(self._fd, 64 * 1024)
+        changed = set()
+        rescan = False
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = data[offset:offset + length].split(b"\0", 1)[0]
+            offset += length
+
+            if mask & (_IN_Q_OVERFLOW | _IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                rescan = True
+                continue
+            directory = self._wd_dirs.get(wd)
+            if directory is None or not name:
+                continue
+            if mask & _IN_ISDIR:
+                rescan = True
+            else:
+                changed.add(directory / os.fsdecode(name))
+        return changed, rescan
+
+    def close(self):
+        """Release the inotify file descriptor"""
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Portable watcher that stats directories instead of re-globbing
+
+    Only directories whose mtime changed are re-listed; files in unchanged
+    directories are checked with a single stat each, so in-place edits are
+    still noticed.
+    """
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._dir_mtimes = {}  # directory -> mtime_ns
+        self._entries = {}  # directory -> ({file_name: (mtime_ns, size)}, {subdir names})
+
+    def _list(self, directory):
+        """Snapshot a directory's files and subdirectories"""
+        files = {}
+        subdirs = set()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            subdirs.add(entry.name)
+                        elif entry.is_file():
+                            st = entry.stat()
+                            files[entry.name] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files, subdirs
+
+    def set_dirs(self, dirs):
+        """Watch exactly the given directories
+
+        Args:
+            dirs (set[Path]): Directories to watch
+        """
+        for d in set(self._dir_mtimes) - dirs:
+            self._dir_mtimes.pop(d)
+            self._entries.pop(d, None)
+        for d in dirs - set(self._dir_mtimes):
+            try:
+                self._dir_mtimes[d] = os.stat(d).st_mtime_ns
+            except OSError:
+                continue
+            self._entries[d] = self._list(d)
+
+    def wait(self, timeout):
+        """Sleep, then report what changed since the last call
+
+        Args:
+            timeout (float): Max seconds to wait (capped at the poll interval)
+
+        Returns:
+            tuple[set[Path], bool]: (changed file paths, rescan needed)
+        """
+        time.sleep(max(0.05, min(timeout, self.interval)))
+        changed = set()
+        rescan = False
+
+        for d, old_mtime in list(self._dir_mtimes.items()):
+            old_files, old_subdirs = self._entries[d]
+            try:
+                mtime = os.stat(d).st_mtime_ns
+            except OSError:
+                rescan = True
+                continue
+
+            if mtime != old_mtime:
+                # Entries were added, removed or renamed: re-list this directory
+                self._dir_mtimes[d] = mtime
+                files, subdirs = self._list(d)
+                if subdirs != old_subdirs:
+                    rescan = True
+            else:
+                files = {}
+                for name in old_files:
+                    try:
+                        st = os.stat(d / name)
+                    except OSError:
+                        continue
+                    files[name] = (st.st_mtime_ns, st.st_size)
+                subdirs = old_subdirs
+
+            for name, sig in files.items():
+                if old_files.get(name) != sig:
+                    changed.add(d / name)
+            self._entries[d] = (files, subdirs)
+
+        return changed, rescan
+
+    def close(self):
+        """Nothing to release"""
+
+
+def _watch_dirs(config):
+    """Directories that can contain files matching the configured patterns
+
+    Includes the ancestors of those directories (up to the workspace) so
+    newly created sibling directories are noticed.
+
+    Args:
+        config (dict): Configuration
+
+    Returns:
+        set[Path]: Directories to watch
+    """
+    workspace = Path(config["workspace"])
+    dirs = {workspace}
+
+    def _add(d):
+        dirs.add(d)
+        for ancestor in d.relative_to(workspace).parents:
+            dirs.add(workspace / ancestor)
+
+    for pattern in config["patterns"]:
+        parent = os.path.dirname(pattern)
+        if not parent:
+            continue
+        static = []
+        for part in Path(parent).parts:
+            if any(c in part for c in "*?["):
+                break
+            static.append(part)
+        base = workspace.joinpath(*static)
+        if base.is_dir():
+            _add(base)
+        for d in workspace.glob(parent):
+            if d.is_dir():
+                _add(d)
+    return dirs
+
+
+_glob_regexes = {}
+
+
+def _glob_segment_regex(segment):
+    """Translate one path segment of a glob (*, ?, [...]) to a regex"""
+    out = []
+    i = 0
+    while i < len(segment):
+        c = segment[i]
+        i += 1
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = segment.find("]", i + 1 if segment[i:i + 1] in ("!", "]") else i)
+            if end < 0:
+                out.append(re.escape(c))
+                continue
+            body = segment[i:end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[%s]" % body)
+            i = end + 1
+        else:
+            out.append(re.escape(c))
+    return "".join(out)
+
+
+def _glob_regex(pattern):
+    """Compile a workspace glob with the semantics of Path.glob
+
+    A "**" segment matches zero or more directories; "*", "?" and "[...]"
+    never cross a "/". The match is anchored at the workspace root. A
+    pattern ending in "**" only matches directories, so it matches no file.
+
+    Returns:
+        re.Pattern or None: Compiled regex, or None if no file can match
+    """
+    if pattern not in _glob_regexes:
+        parts = PurePosixPath(pattern).parts
+        regex = None
+        if parts and parts[-1] != "**":
+            pieces = []
+            for part in parts[:-1]:
+                pieces.append("(?:[^/]+/)*" if part == "**" else _glob_segment_regex(part) + "/")
+            pieces.append(_glob_segment_regex(parts[-1]))
+            regex = re.compile("".join(pieces) + r"\Z")
+        _glob_regexes[pattern] = regex
+    return _glob_regexes[pattern]
+
+
+def _matches_patterns(rel_path, config):
+    """Check a workspace-relative path against patterns and excludes
+
+    Patterns match like get_files_to_sync's workspace.glob; excludes, like
+    there, match the end of the path.
+
+    Args:
+        rel_path (str): Path relative to the workspace
+        config (dict): Configuration
+
+    Returns:
+        bool: True if the file should be synced
+    """
+    path = PurePosixPath(rel_path)
+    for pattern in config["patterns"]:
+        regex = _glob_regex(pattern)
+        if regex is not None and regex.match(path.as_posix()):
+            return not any(path.match(excl) for excl in config.get("exclude", []))
+    return False
+
+
+def watch_files(config, quiet=False, use_polling=False, concurrency=None,
+                debounce=0.5, max_delay=5.0):
+    """Watch for file changes and sync in real-time
+
+    Uses inotify where available (falling back to directory polling). Bursts
+    of events are coalesced: changed paths are collected until no new event
+    has arrived for `debounce` seconds (or `max_delay` seconds have passed
+    since the first one), then synced through the normal chunk/upload path.
+    Each flush that changes the bucket invalidates its cached search results.
+
+    Args:
+        config (dict): Configuration
+        quiet (bool): Suppress output
+        use_polling (bool): Force the portable polling watcher
+        concurrency (int or None): Override number of parallel file workers
+        debounce (float): Quiet period before syncing a burst of changes
+        max_delay (float): Max seconds a change waits while events keep coming
+    """
+    api_key = load_credentials()
+    if not api_key:
+        if not quiet:
+            print("ERROR: No Telnyx API key found.")
+        return
+
+    watcher = None
+    if not use_polling:
+        try:
+            watcher = InotifyWatcher()
+        except (OSError, AttributeError):
+            watcher = None
+    backend = "inotify"
+    if watcher is None:
+        watcher = PollingWatcher()
+        backend = "polling"
+
     if not quiet:
-        print("\n\U0001f441\ufe0f Watching for changes in %s" % config["workspace"])
+        print("\n\U0001f441\ufe0f Watching for changes in %s (%s)" % (config["workspace"], backend))
         print("   Press Ctrl+C to stop\n")
 
+    workspace = Path(config["workspace"])
+    client = TelnyxS3Client(
+        api_key, config["region"], get_http_pool(config.get("max_connections_per_host", 8))
+    )
     state = SyncState()
-    last_check = {}
     max_tokens = config.get("chunk_size", 800)
+    thread_gap = slack_thread_gap(config)
+    overlap = config.get("chunk_overlap", 0)
+    configure_token_counter(*tokenizer_settings(config))
+    workers = max(1, concurrency or config.get("concurrency", 8))
+    watcher.set_dirs(_watch_dirs(config))
+    if not quiet and state.get_chunking_fingerprint() != chunking_fingerprint(config, max_tokens):
+        print("   Chunking settings changed since the last sync: run sync to re-chunk "
+              "unchanged files\n")
+
+    pending = set()
+    first_event = last_event = 0.0
+
+    def _flush():
+        files = []
+        for path in sorted(pending):
+            try:
+                rel = str(path.relative_to(workspace))
+            except ValueError:
+                continue
+            if path.is_file() and _matches_patterns(rel, config):
+                files.append((path, rel))
+        pending.clear()
+        if not files:
+            return
+
+        bucket_changed = False
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _sync_one_file, client, config["bucket"], local_path, s3_key,
+                    state.get_file_hash(s3_key), _uploaded_hashes(state, s3_key), max_tokens,
+                    state.get_file_stat(s3_key), thread_gap=thread_gap, overlap=overlap,
+                )
+                for local_path, s3_key in files
+            ]
+            for (local_path, s3_key), future in zip(files, futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not quiet:
+                        print("  \u2717 %s (%s)" % (s3_key, e))
+                    continue
+
+                if result["status"] == "synced":
+                    _apply_sync_result(state, result)
+                elif result["status"] == "skipped" and result["stat"]:
+                    state.set_file_stat(s3_key, result["stat"])
+                if result["uploaded"] or result["deleted"]:
+                    bucket_changed = True
+                if not quiet:
+                    for ck in result["uploaded"]:
+                        print("  \u2191 %s" % ck)
+                    for ck in result["deleted"]:
+                        print("  \U0001f5d1\ufe0f  %s" % ck)
+                    for ck in result["failed_keys"]:
+                        print("  \u2717 %s" % ck)
+        state.save_state()
+        if bucket_changed:
+            _invalidate_search_cache(config["bucket"], quiet)
 
     try:
         while True:
-            files = get_files_to_sync(config)
-            changed = []
+            if pending:
+                timeout = min(last_event + debounce, first_event + max_delay) - time.monotonic()
+            else:
+                timeout = 2.0
+            changed, rescan = watcher.wait(timeout)
+            now = time.monotonic()
 
-            for local_path, s3_key in files:
-                try:
-                    mtime = local_path.stat().st_mtime
-                    if s3_key not in last_check or last_check[s3_key] != mtime:
-                        if s3_key in last_check:
-                            changed.append((local_path, s3_key))
-                        last_check[s3_key] = mtime
-                except OSError:
-                    continue
+            if rescan:
+                # Directory layout changed or events were lost: re-resolve
+                # watched directories and re-check every matching file
+                watcher.set_dirs(_watch_dirs(config))
+                changed |= {local_path for local_path, _ in get_files_to_sync(config)}
 
             if changed:
-                api_key = load_credentials()
-                if api_key:
-                    client = TelnyxS3Client(api_key, config["region"])
-                    for local_path, s3_key in changed:
-                        try:
-                            chunks = chunk_file(local_path, s3_key, max_tokens)
-                            if not chunks:
-                                continue
-
-                            # Delete old chunks
-                            _delete_old_chunks(client, config["bucket"], state, s3_key, quiet)
-
-                            chunk_keys = []
-                            for ck, content, title in chunks:
-                                if client.put_object(config["bucket"], ck, content):
-                                    chunk_keys.append(ck)
-                                    if not quiet:
-                                        print("  \u2191 %s" % ck)
-                                else:
-                                    if not quiet:
-                                        print("  \u2717 %s" % ck)
-
-                            current_hash = calculate_file_hash(local_path)
-                            if current_hash:
-                                state.set_file_hash(s3_key, current_hash)
-                            if len(chunks) > 1:
-                                state.set_chunk_keys(s3_key, chunk_keys)
-                            else:
-                                state.remove_chunks(s3_key)
-                        except Exception as e:
-                            if not quiet:
-                                print("  \u2717 %s (%s)" % (s3_key, e))
-
-                    if changed:
-                        state.save_state()
-
-            time.sleep(2)
+                if not pending:
+                    first_event = now
+                last_event = now
+                pending |= changed
+
+            if pending and (now - last_event >= debounce or now - first_event >= max_delay):
+                _flush()
     except KeyboardInterrupt:
         if not quiet:
             print("\n\n\U0001f44b Stopped watching")
+    finally:
+        watcher.close()
+        state.close()
 
 
 def main():
     parser = argparse.ArgumentParser(description="Telnyx RAG Memory Sync")
     parser.add_argument("--watch", "-w", action="store_true", help="Watch for changes")
+    parser.add_argument(
+        "--poll", action="store_true",
+        help="With --watch, use directory polling instead of inotify"
+    )
     parser.add_argument("--list", "-l", action="store_true", help="List bucket files")
     parser.add_argument("--create-bucket", action="store_true", help="Create the bucket")
     parser.add_argument("--status", "-s", action="store_true", help="Check status")
@@ -1182,6 +3356,18 @@ def main():
         "--chunk-size", type=int, default=None,
         help="Override chunk size in tokens (default: from config, approx 800)"
     )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Processes used to hash and chunk files (default: config 'workers' or 1)"
+    )
+    parser.add_argument(
+        "--verify", action="store_true",
+        help="Rehash every file instead of skipping files with unchanged size/mtime"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=None,
+        help="Number of files synced in parallel (default: from config, 8)"
+    )
 
     args = parser.parse_args()
     config = load_config()
@@ -1203,11 +3389,16 @@ def main():
         elif args.embed_status:
             check_embed_status(args.embed_status, args.quiet)
         elif args.watch:
-            sync_files(config, args.quiet, chunk_size_override=args.chunk_size)
-            watch_files(config, args.quiet)
+            sync_files(config, args.quiet, chunk_size_override=args.chunk_size,
+                       concurrency=args.concurrency, verify=args.verify,
+                       chunk_workers=args.workers)
+            watch_files(config, args.quiet, use_polling=args.poll,
+                        concurrency=args.concurrency)
         else:
             success, failed = sync_files(
-                config, args.quiet, chunk_size_override=args.chunk_size
+                config, args.quiet, chunk_size_override=args.chunk_size,
+                concurrency=args.concurrency, verify=args.verify,
+                chunk_workers=args.workers,
             )
             if args.embed and success > 0:
                 trigger_embedding(config, args.quiet)
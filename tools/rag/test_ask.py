@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the ask.py retrieval pipeline.
+
+Usage:
+  python3 -m unittest test_ask      # from tools/rag
+"""
+
+import asyncio
+import unittest
+
+import ask
+
+
+def _chunk(source, content, certainty):
+    return {"source": source, "content": content, "certainty": certainty}
+
+
+def _gather(jobs, results, enough=8, min_certainty=None):
+    """Run gather_speculative with fetch returning results[(bucket, query)]"""
+    def fetch(job):
+        outcome = results[(job["bucket"], job["query"])]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return [dict(c) for c in outcome]
+
+    return asyncio.run(ask.gather_speculative(jobs, fetch, enough, min_certainty))
+
+
+class GatherSpeculativeTest(unittest.TestCase):
+
+    def test_keeps_every_chunk_of_one_source_in_a_job(self):
+        jobs = [{"bucket": "memory", "query": "porting", "weight": 1.0}]
+        results = {("memory", "porting"): [
+            _chunk("docs/porting.md", "Porting needs a letter of authorization.", 0.9),
+            _chunk("docs/porting.md", "Porting takes five business days.", 0.85),
+            _chunk("docs/voice.md", "Voice calls use SIP trunks.", 0.8),
+        ]}
+        chunks = _gather(jobs, results)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sum(1 for c in chunks if c["source"] == "docs/porting.md"), 2)
+        self.assertEqual(jobs[0]["chunks"], 3)
+
+    def test_collapses_same_chunk_across_jobs(self):
+        jobs = [{"bucket": "memory", "query": "porting", "weight": 1.0},
+                {"bucket": "slack", "query": "porting", "weight": 0.5}]
+        text = "Porting needs a letter of authorization."
+        results = {
+            ("memory", "porting"): [_chunk("docs/porting.md", text, 0.8)],
+            ("slack", "porting"): [_chunk("docs/porting.md", text, 0.9),
+                                   _chunk("docs/porting.md", "Other passage.", 0.9)],
+        }
+        chunks = _gather(jobs, results)
+        self.assertEqual(len(chunks), 2)
+        same = [c for c in chunks if c["content"] == text]
+        self.assertEqual(len(same), 1)
+        self.assertEqual(same[0]["bucket"], "memory")
+        self.assertAlmostEqual(same[0]["certainty"], 0.8)
+
+    def test_malformed_response_fails_only_its_job(self):
+        jobs = [{"bucket": "memory", "query": "porting", "weight": 1.0},
+                {"bucket": "broken", "query": "porting", "weight": 1.0}]
+        results = {
+            ("memory", "porting"): [_chunk("docs/porting.md", "Porting.", 0.9)],
+            ("broken", "porting"): ValueError("Expecting value: line 1 column 1"),
+        }
+        chunks = _gather(jobs, results)
+        self.assertEqual([c["source"] for c in chunks], ["docs/porting.md"])
+        self.assertIn("Expecting value", jobs[1]["error"])
+
+
+class PackContextTest(unittest.TestCase):
+
+    def test_chunks_of_one_file_stay_separate_in_rank_order(self):
+        chunks = [
+            _chunk("docs/porting__chunk-0000000b.md", "Porting takes five business days.", 0.9),
+            _chunk("docs/voice.md", "Voice calls use SIP trunks.", 0.8),
+            _chunk("docs/porting__chunk-0000000a.md", "Porting needs a letter of authorization.", 0.7),
+        ]
+        stats = {}
+        blocks = ask.pack_context("porting", chunks, 1000, stats=stats)
+        self.assertEqual([b["source"] for b in blocks],
+                         ["docs/porting.md", "docs/voice.md", "docs/porting.md"])
+        self.assertEqual([b["content"] for b in blocks], [c["content"] for c in chunks])
+        self.assertEqual(blocks[2]["chunk"], "docs/porting__chunk-0000000a.md")
+        self.assertEqual(stats["chunks_packed"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
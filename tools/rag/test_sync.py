@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for sync.py.
+
+Usage:
+  python3 -m unittest test_sync      # from tools/rag
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import sync
+
+
+class MatchesPatternsTest(unittest.TestCase):
+
+    FILES = [
+        "MEMORY.md",
+        "docs/a.md",
+        "docs/x/y/z.md",
+        "docs/x/notes.txt",
+        "other/docs/a/b.md",
+        "memory/2024-01-01.md",
+        "memory/old/2023.md",
+        "skills/voice/SKILL.md",
+        "skills/voice/extra/SKILL.md",
+        "knowledge/data.json",
+        "knowledge/data.tmp",
+    ]
+
+    PATTERNS = [
+        "docs/**/*.md",
+        "**/*.md",
+        "memory/*.md",
+        "skills/*/SKILL.md",
+        "knowledge/*.json",
+        "knowledge/*.[jt]*",
+        "MEMORY.md",
+        "docs/**",
+    ]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workspace = Path(self.tmp.name)
+        for rel in self.FILES:
+            path = self.workspace / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_double_star(self):
+        config = {"patterns": ["docs/**/*.md"], "exclude": []}
+        self.assertTrue(sync._matches_patterns("docs/a.md", config))
+        self.assertTrue(sync._matches_patterns("docs/x/y/z.md", config))
+        self.assertFalse(sync._matches_patterns("other/docs/a/b.md", config))
+        self.assertFalse(sync._matches_patterns("docs/x/notes.txt", config))
+
+    def test_agrees_with_get_files_to_sync(self):
+        for pattern in self.PATTERNS:
+            config = {"workspace": str(self.workspace), "patterns": [pattern],
+                      "exclude": ["*.tmp"]}
+            globbed = sorted(rel.replace(os.sep, "/")
+                             for _, rel in sync.get_files_to_sync(config))
+            matched = sorted(rel for rel in self.FILES if sync._matches_patterns(rel, config))
+            self.assertEqual(matched, globbed, pattern)
+
+
+class _FakeS3Client:
+    """Stands in for TelnyxS3Client, recording uploaded keys"""
+
+    def __init__(self, *args, **kwargs):
+        self.uploaded = []
+
+    def put_object(self, bucket, key, data, content_type=None):
+        self.uploaded.append(key)
+        return True
+
+    def delete_objects(self, bucket, keys):
+        return list(keys), {}
+
+
+class _SyncTestCase(unittest.TestCase):
+    """Runs sync_files in a temporary workspace against _FakeS3Client"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)  # SyncState lives in the working directory
+        Path("memory").mkdir()
+        paragraphs = ["Paragraph %d about porting numbers. " % i * 12 for i in range(40)]
+        Path("memory/notes.md").write_text("# Notes\n\n" + "\n\n".join(paragraphs))
+        self.config = {
+            "bucket": "test", "region": "us-central-1", "workspace": ".",
+            "patterns": ["memory/*.md"], "exclude": [], "chunk_size": 200,
+            "tokenizer": "heuristic", "concurrency": 1,
+        }
+        patches = [
+            mock.patch.object(sync, "TelnyxS3Client", _FakeS3Client),
+            mock.patch.object(sync, "load_credentials", return_value="key"),
+            mock.patch.object(sync, "_invalidate_search_cache"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def _sync(self, **overrides):
+        return sync.sync_files(dict(self.config, **overrides), quiet=True,
+                               show_progress_bar=False)
+
+
+class ChunkingFingerprintTest(_SyncTestCase):
+
+    def test_unchanged_settings_skip_files(self):
+        self.assertEqual(self._sync(), (1, 0))
+        self.assertEqual(self._sync(), (0, 0))
+
+    def test_changed_settings_rechunk_files(self):
+        self.assertEqual(self._sync(), (1, 0))
+        self.assertEqual(self._sync(chunk_overlap=50), (1, 0))
+        self.assertEqual(self._sync(chunk_overlap=50), (0, 0))
+        self.assertEqual(self._sync(chunk_overlap=50, chunk_size=300), (1, 0))
+        self.assertEqual(self._sync(chunk_overlap=50, chunk_size=300,
+                                    slack_grouping="threads"), (1, 0))
+
+
+class SlackGroupingRechunkTest(_SyncTestCase):
+
+    def setUp(self):
+        super().setUp()
+        messages = []
+        for i in range(60):
+            ts = 1700000000 + i * 60
+            thread = "%d.000" % (1700000000 + (i % 3) * 60)
+            messages.append({"ts": "%d.000" % ts, "thread_ts": thread, "user": "u%d" % (i % 4),
+                             "text": "Message %d about number porting and invoices" % i})
+        Path("memory/slack.json").write_text(json.dumps(messages))
+        self.config["patterns"] = ["memory/*.json"]
+
+    def test_switching_grouping_rechunks_export(self):
+        self.assertEqual(self._sync(), (1, 0))
+        self.assertEqual(self._sync(slack_grouping="threads"), (1, 0))
+        self.assertEqual(self._sync(slack_grouping="threads"), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
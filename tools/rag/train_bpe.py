@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Telnyx RAG Memory - Train a BPE vocab for chunk sizing
+
+Learns BPE merge ranks from a text corpus and writes them in tiktoken's
+"<base64 token> <rank>" format, for sync.py's "tokenizer_file" setting.
+Text is split with sync.py's pre-tokenizer. Merging starts from whole
+characters, as BPETokenCounter counts them, and the 256 single bytes are
+always ranked first.
+
+The bundled bpe_ranks.tiktoken (16,384 ranks) was trained with this
+algorithm on about 24M characters, read in this order until the budget ran
+out:
+
+  1. Prose: Python 3.11's pydoc_data/topics.py, /usr/share/common-licenses/*,
+     and Debian package changelogs (/usr/share/doc/*/changelog*.gz, shuffled
+     with seed 1, about 14M characters)
+  2. This repository's .md/.py/.json/.sh/.txt/.yaml/.yml/.js/.ts files
+  3. Python 3.11 standard library sources (shuffled with seed 0)
+
+That corpus depends on the build machine's system files, so the bundled
+file cannot be reproduced byte for byte elsewhere. It is a generic vocab,
+not any embedding model's, which is why sync.py counts tokens with the
+heuristic unless a model's vocab is configured. Prefer exporting the
+embedding model's own tiktoken file over training one.
+
+Usage:
+  ./train_bpe.py -o vocab.tiktoken docs/ notes.md          # 16,384 ranks
+  ./train_bpe.py -o small.tiktoken --vocab-size 8192 --max-chars 5000000 corpus/
+"""
+
+import argparse
+import base64
+import collections
+import gzip
+import heapq
+import os
+import sys
+import time
+from pathlib import Path
+
+from sync import _BPE_PRETOKENIZE
+
+TEXT_SUFFIXES = (".md", ".py", ".json", ".sh", ".txt", ".yaml", ".yml", ".js", ".ts")
+
+
+def iter_corpus_files(paths):
+    """Expand files and directories into corpus files, in a stable order
+
+    Args:
+        paths (list[str]): Files (plain or .gz) and directories; directories
+            contribute their TEXT_SUFFIXES files, sorted
+
+    Yields:
+        Path: Corpus file
+    """
+    for path in map(Path, paths):
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and child.suffix in TEXT_SUFFIXES:
+                    yield child
+        elif path.is_file():
+            yield path
+
+
+def read_corpus(paths, max_chars):
+    """Read corpus text until max_chars characters have been collected
+
+    Returns:
+        list[str]: File contents (files that are not UTF-8 are skipped)
+    """
+    texts = []
+    total = 0
+    for path in iter_corpus_files(paths):
+        try:
+            opener = gzip.open if path.suffix == ".gz" else open
+            with opener(path, "rb") as f:
+                text = f.read().decode("utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        texts.append(text)
+        total += len(text)
+        if total > max_chars:
+            break
+    return texts
+
+
+def train(texts, vocab_size):
+    """Learn BPE merges from texts
+
+    Pre-tokenized pieces are counted once. The most frequent adjacent pair
+    is then merged repeatedly, with pair counts kept in a lazy max-heap and
+    an index from each pair to the pieces containing it, so each merge only
+    revisits the pieces it changes. Ties go to the smaller pair, which
+    keeps training deterministic.
+
+    Args:
+        texts (list[str]): Corpus
+        vocab_size (int): Total ranks wanted, including the 256 single bytes
+
+    Returns:
+        list[bytes]: Merged tokens in rank order
+    """
+    counts = collections.Counter()
+    for text in texts:
+        counts.update(_BPE_PRETOKENIZE.findall(text))
+
+    words = [[ch.encode("utf-8", "surrogatepass") for ch in piece] for piece in counts]
+    freqs = list(counts.values())
+    pair_counts = collections.Counter()
+    index = collections.defaultdict(set)
+    for wi, word in enumerate(words):
+        for pair in zip(word, word[1:]):
+            pair_counts[pair] += freqs[wi]
+            index[pair].add(wi)
+
+    heap = [(-count, pair) for pair, count in pair_counts.items()]
+    heapq.heapify(heap)
+    merges = []
+    seen = set(bytes([b]) for b in range(256))
+    while len(seen) < vocab_size and heap:
+        negative, pair = heapq.heappop(heap)
+        if pair_counts.get(pair, 0) != -negative:
+            continue  # stale heap entry
+        if -negative < 2:
+            break
+        a, b = pair
+        merged = a + b
+        if merged not in seen:
+            seen.add(merged)
+            merges.append(merged)
+        for wi in index.pop(pair, ()):
+            word, freq = words[wi], freqs[wi]
+            for old in zip(word, word[1:]):
+                pair_counts[old] -= freq
+            new_word = []
+            i = 0
+            while i < len(word):
+                if i + 1 < len(word) and word[i] == a and word[i + 1] == b:
+                    new_word.append(merged)
+                    i += 2
+                else:
+                    new_word.append(word[i])
+                    i += 1
+            words[wi] = new_word
+            changed = set()
+            for new in zip(new_word, new_word[1:]):
+                pair_counts[new] += freq
+                index[new].add(wi)
+                changed.add(new)
+            for new in changed:
+                heapq.heappush(heap, (-pair_counts[new], new))
+        pair_counts.pop(pair, None)
+    return merges
+
+
+def write_ranks(merges, output):
+    """Write single bytes then merges as a tiktoken ranks file"""
+    with open(output, "w") as f:
+        tokens = [bytes([b]) for b in range(256)] + merges
+        for rank, token in enumerate(tokens):
+            f.write("%s %d\n" % (base64.b64encode(token).decode(), rank))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a BPE vocab for sync.py chunk sizing")
+    parser.add_argument("paths", nargs="+", help="Corpus files (.gz allowed) and directories")
+    parser.add_argument("--output", "-o", required=True, help="Ranks file to write")
+    parser.add_argument("--vocab-size", type=int, default=16384,
+                        help="Total ranks including the 256 single bytes (default: 16384)")
+    parser.add_argument("--max-chars", type=int, default=24000000,
+                        help="Stop reading the corpus after this many characters")
+    args = parser.parse_args()
+
+    start = time.time()
+    texts = read_corpus(args.paths, args.max_chars)
+    if not texts:
+        print("ERROR: No readable corpus files", file=sys.stderr)
+        sys.exit(1)
+    print("Corpus: %d files, %d characters" % (len(texts), sum(map(len, texts))))
+    merges = train(texts, args.vocab_size)
+    write_ranks(merges, args.output)
+    print("Wrote %d ranks to %s (%d bytes) in %.1fs" % (
+        256 + len(merges), args.output, os.path.getsize(args.output), time.time() - start))
+
+
+if __name__ == "__main__":
+    main()